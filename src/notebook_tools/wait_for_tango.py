@@ -2,12 +2,21 @@
 
 """ Helper functions to make checking device status and state neater."""
 
-from queue import Empty, Queue
-from time import sleep, time
-from typing import Any
+import itertools
+from typing import Any, Literal
 
 from tango import DeviceProxy, EventType
 
+from ska_mid_jupyter_notebooks.monitoring.waiting import (
+    ConditionsResult,
+    EventError,
+    Transition,
+    WaitResult,
+    get_hub,
+    wait_for_conditions,
+    wait_for_value,
+)
+
 spinner = ["⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷"]
 
 allowed_states = [
@@ -25,13 +34,19 @@ allowed_states = [
 ]
 
 
-def wait_for_state(device: DeviceProxy, desired_state: str | int, break_on_error=True) -> None:
-    """Poll a tango device until either the given observation state is reached, or it throws
-    an error.
+def wait_for_state(
+    device: DeviceProxy,
+    desired_state: str | int,
+    break_on_error=True,
+    timeout: float | None = None,
+) -> WaitResult:
+    """Wait on obsState change events of a tango device until either the given observation
+    state is reached, or it throws an error.
     Arguments:
     device -- Tango Device to check
     desired_state -- The state which to break upon getting (number or state)
     break_on_error -- If set to False, will keeping running when getting an error status.
+    timeout -- The maximum time to wait in seconds, None to wait forever
     """
     if isinstance(desired_state, int):
         if desired_state < 0 or desired_state > 10:
@@ -41,50 +56,57 @@ def wait_for_state(device: DeviceProxy, desired_state: str | int, break_on_error
 
     if desired_state not in allowed_states:
         raise TypeError("desired_state provided is not an known state.")
-    spinL = 0
-    poll = 1
-    while desired_state not in str(device.obsState.name):
-        if spinL < len(spinner) - 1:
-            spinL += 1
-        else:
-            spinL = 0
-        sleep(0.5)
+    transitions = itertools.count(1)
+
+    def print_transition(transition: Transition):
         print(
             "\r",
-            f"{spinner[spinL]} Poll# {poll}: {device.obsState.name}, \
+            f"{spinner[next(transitions) % len(spinner)]} {allowed_states[transition.value]}, \
             waiting for {desired_state}...",
             end="",
         )
-        if device.obsState == 9 and break_on_error:
-            break
-        poll += 1
+
+    def is_done(obs_state: int) -> bool:
+        return allowed_states[obs_state] == desired_state or (obs_state == 9 and break_on_error)
+
+    result = wait_for_value(
+        device, "obsState", is_done, timeout, poll_interval=0.5, on_transition=print_transition
+    )
     print("\r", "---------------------------------------------", end="")
-    print(f"\nFinished with: {device.obsState.name}")
+    print(f"\nFinished with: {allowed_states[result.trace[-1].value]}")
+    return result
 
 
-def wait_for_status(device: DeviceProxy, desired_status: str) -> None:
-    """Poll a tango device to wait until a desired status is reached, eg.ON
+def wait_for_status(
+    device: DeviceProxy, desired_status: str, timeout: float | None = None
+) -> WaitResult:
+    """Wait until a desired status is reached, eg.ON
     Arguments:
     device -- Tango Device to check
     desired_state -- The status which to break upon getting (number or state)
+    timeout -- The maximum time to wait in seconds, None to wait forever
     """
-    spinL = 0
-    poll = 1
-    while desired_status not in str(device.status()):
-        if spinL < len(spinner) - 1:
-            spinL += 1
-        else:
-            spinL = 0
-        sleep(0.5)
+    transitions = itertools.count(1)
+
+    def print_transition(transition: Transition):
         print(
             "\r",
-            f"{spinner[spinL]} Poll {poll}: Device is currently {device.status()},\
+            f"{spinner[next(transitions) % len(spinner)]} Device is currently {transition.value},\
             waiting for {desired_status}...",
             end="",
         )
-        poll += 1
+
+    result = wait_for_value(
+        device,
+        "Status",
+        lambda status: desired_status in str(status),
+        timeout,
+        poll_interval=0.5,
+        on_transition=print_transition,
+    )
     print("\r", "-------------------------------------", end="")
-    print(f"\nFinished with: {device.status()}")
+    print(f"\nFinished with: {result.trace[-1].value}")
+    return result
 
 
 class EventWaitTimeout(Exception):
@@ -114,39 +136,69 @@ def wait_for_event(
     :type timeout: float, optional
     :param print_event_details: Toggle printing of event data structure, defaults to False
     :type print_event_details: bool, optional
+    :raises EventWaitTimeout: if the attribute does not change as desired within the timeout
+    :raises EventError: as soon as an error event is received, the error event is kept on the
+        exception
     :return: Success or failure flag indicating whether the attribute changed as desired or not
     :rtype: Bool
     """
-    result = False
-
-    event_queue = Queue()
-
-    event_id = device_proxy.subscribe_event(attr_name, event_type, event_queue.put)
-
-    time_start = time()
-    while (time() - time_start) < timeout:
-        if not event_queue.empty():
-            try:
-                event = event_queue.get(timeout=2)
-                if print_event_details:
-                    print(f"Received event: {event}")
-                assert not event.err, "Event error"
-
-                value = event.attr_value.value
-                if value == desired_value:
-                    print(
-                        f"Device {device_proxy.name()} attribute {attr_name} changed "
-                        f"to the following desired value: {desired_value}"
-                    )
-                    result = True
-                    break
-            except Empty:
-                print("Event queue empty")
-
-    device_proxy.unsubscribe_event(event_id)
-
-    if not result:
+    wait_for_events(
+        [(device_proxy, attr_name, desired_value)],
+        event_type=event_type,
+        timeout=timeout,
+        print_event_details=print_event_details,
+    )
+    print(
+        f"Device {device_proxy.name()} attribute {attr_name} changed "
+        f"to the following desired value: {desired_value}"
+    )
+    return True
+
+
+def wait_for_events(
+    conditions: list[tuple[DeviceProxy, str, Any]],
+    mode: Literal["all", "any"] = "all",
+    event_type: EventType = EventType.CHANGE_EVENT,
+    timeout: float = 150.0,
+    print_event_details: bool = False,
+) -> ConditionsResult:
+    """Wait for attributes of one or more devices to change to specific values.
+
+    The calling thread sleeps until events arrive, and each attribute is subscribed to only
+    once however many conditions (or concurrent waits) are on it.
+
+    :param conditions: (device proxy, attribute, desired value) conditions to wait for
+    :type conditions: list[tuple[DeviceProxy, str, Any]]
+    :param mode: "all" to wait for every condition, "any" for the first one, defaults to "all"
+    :type mode: str, optional
+    :param event_type: Tango event type to wait for
+    :type event_type: EventType
+    :param timeout: Maximum period in [s] to wait for the desired events, defaults to 150.0
+    :type timeout: float, optional
+    :param print_event_details: Toggle printing of event data structure, defaults to False
+    :type print_event_details: bool, optional
+    :raises EventWaitTimeout: if the conditions are not met within the timeout
+    :raises EventError: as soon as an error event is received, the error event is kept on the
+        exception
+    :return: the time each condition was met, for latency analysis
+    :rtype: ConditionsResult
+    """
+    result = wait_for_conditions(
+        conditions,
+        mode,
+        timeout,
+        get_hub(event_type),
+        on_event=(
+            (lambda event: print(f"Received event: {event}")) if print_event_details else None
+        ),
+        break_on_error=True,
+    )
+    if not result.satisfied:
+        pending = ", ".join(
+            f"{condition.device.name()}/{condition.attr}={condition.value}"
+            for condition in result.pending()
+        )
         raise EventWaitTimeout(
-            "Desired event did not occur within the" f"timeout period of {timeout}s"
+            f"Desired event did not occur within the timeout period of {timeout}s: {pending}"
         )
     return result
@@ -3,7 +3,8 @@ import enum
 import pathlib
 import re
 import subprocess
-from typing import Any, Dict, List
+from threading import Lock
+from typing import Any, Callable, Dict, List, NamedTuple, TypeVar, Union
 
 from ska_control_model import AdminMode, ControlMode, HealthState, ObsState
 from ska_ser_config_inspector_client import (
@@ -18,11 +19,85 @@ from ska_ser_config_inspector_client.models.release_response import ReleaseRespo
 from tango import Database, DeviceProxy
 
 
+class DeviceClassMetadata(NamedTuple):
+    """The attributes and commands of a tango device class."""
+
+    dev_class: str
+    attributes: frozenset[str]
+    commands: frozenset[str]
+
+
+# the metadata per tango device class and the class per device, shared by every wrapper and
+# keyed by the tango host so that deployments with the same device names do not mix
+_class_metadata: dict[tuple[str, str], DeviceClassMetadata] = {}
+_device_classes: dict[str, str] = {}
+_metadata_lock = Lock()
+
+
+def get_device_metadata(device_proxy: Any) -> DeviceClassMetadata:
+    """
+    Get the attributes and commands of the class of a device, introspecting each device class
+    only once per tango host. Devices with dynamic attributes are assumed to share them with
+    their class.
+    :param device_proxy: the device proxy
+    :return: DeviceClassMetadata
+    """
+    tango_host = f"{device_proxy.get_db_host()}:{device_proxy.get_db_port()}"
+    device_key = f"{tango_host}/{device_proxy.dev_name()}"
+    if (dev_class := _device_classes.get(device_key)) is None:
+        dev_class = _device_classes[device_key] = device_proxy.info().dev_class
+    class_key = (tango_host, dev_class)
+    if (metadata := _class_metadata.get(class_key)) is None:
+        with _metadata_lock:
+            if (metadata := _class_metadata.get(class_key)) is None:
+                metadata = _class_metadata[class_key] = DeviceClassMetadata(
+                    dev_class,
+                    frozenset(device_proxy.get_attribute_list()),
+                    frozenset(device_proxy.get_command_list()),
+                )
+    return metadata
+
+
+# the members (methods, properties) of the python classes of the proxies
+_proxy_members: dict[type, frozenset[str]] = {}
+# names resolved by the wrapper itself, never forwarded to the proxy
+_WRAPPER_NAMES = frozenset({"_device_proxy", "_metadata", "metadata"})
+
+
+def _members_of(proxy_class: type) -> frozenset[str]:
+    if (members := _proxy_members.get(proxy_class)) is None:
+        members = _proxy_members[proxy_class] = frozenset(dir(proxy_class))
+    return members
+
+
+def clear_device_metadata():
+    """
+    Forget the introspected device classes, e.g. after devices have been redeployed
+    :return: None
+    """
+    with _metadata_lock:
+        _class_metadata.clear()
+        _device_classes.clear()
+
+
 class TangoDeviceProxy:
     def __init__(self, device_proxy: Any):
         self._device_proxy = device_proxy
-        self._attributes = {attr for attr in self._device_proxy.get_attribute_list()}
-        self._commands = {cmd for cmd in self._device_proxy.get_command_list()}
+        self._metadata: Union[DeviceClassMetadata, None] = None
+
+    @property
+    def metadata(self) -> DeviceClassMetadata:
+        if self._metadata is None:
+            self._metadata = get_device_metadata(self._device_proxy)
+        return self._metadata
+
+    @property
+    def _attributes(self) -> frozenset[str]:
+        return self.metadata.attributes
+
+    @property
+    def _commands(self) -> frozenset[str]:
+        return self.metadata.commands
 
     @property
     def health_state(self) -> HealthState:
@@ -41,9 +116,31 @@ class TangoDeviceProxy:
         return ObsState(self._device_proxy.obsState)
 
     def __getattr__(self, name: str):
-        if name in dir(self._device_proxy):
-            return getattr(self._device_proxy, name)
-        return self.__getattribute__(name)
+        # only called for names the wrapper does not have, resolved against the cached members
+        # of the proxy class and the metadata of the device class instead of dir() of the proxy
+        # (which introspects the device on every call). Methods and commands are bound on the
+        # wrapper so that later accesses do not get here at all.
+        device_proxy = self.__dict__.get("_device_proxy")
+        if device_proxy is None or name in _WRAPPER_NAMES:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        if name in _members_of(type(device_proxy)) or name in getattr(
+            device_proxy, "__dict__", {}
+        ):
+            value = getattr(device_proxy, name)
+            if callable(value):
+                self.__dict__[name] = value
+            return value
+        metadata = self.metadata
+        if name in metadata.commands:
+            command = self.__dict__[name] = getattr(device_proxy, name)
+            return command
+        if name in metadata.attributes:
+            # read on every access
+            return getattr(device_proxy, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+
+TangoDeviceProxyT = TypeVar("TangoDeviceProxyT", bound=TangoDeviceProxy)
 
 
 class TangoDeployment:
@@ -77,6 +174,7 @@ class TangoDeployment:
         self.tango_api = TangoDevicesAndTheirDeploymentStatusApi(self.cia_client)
         self._release: ReleaseResponse = None
         self._devices: List[str] = None
+        self._device_wrappers: dict[type, TangoDeviceProxy] = {}
 
     def __str__(self) -> str:
         return f"namespace={self.namespace}; tango_host={self.tango_host}; cluster_domain={self._cluster_domain}; cia_url={self.cia_url}"
@@ -87,6 +185,29 @@ class TangoDeployment:
     def dp(self, name: str) -> Any:
         return DeviceProxy(self.tango_fqdn(name))
 
+    def cached_device(
+        self,
+        wrapper_class: type[TangoDeviceProxyT],
+        build: Union[Callable[[], TangoDeviceProxyT], None] = None,
+    ) -> TangoDeviceProxyT:
+        """
+        Get the device wrapper of a class, built once per deployment
+        :param wrapper_class: the wrapper class, built with the deployment by default
+        :param build: builds the wrapper if it does not take the deployment
+        :return: the wrapper
+        """
+        if (wrapper := self._device_wrappers.get(wrapper_class)) is None:
+            wrapper = build() if build else wrapper_class(self)  # type: ignore[call-arg]
+            self._device_wrappers[wrapper_class] = wrapper
+        return wrapper  # type: ignore[return-value]
+
+    def clear_device_cache(self):
+        """
+        Forget the device wrappers built so far, e.g. after devices have been redeployed
+        :return: None
+        """
+        self._device_wrappers.clear()
+
     def ignore(self, device: str):
         """
         Devices to ignore
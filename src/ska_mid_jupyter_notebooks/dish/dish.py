@@ -1,5 +1,6 @@
 # pylint: disable=C,R
 import time
+from typing import Union
 
 from ska_mid_jupyter_notebooks.cluster.cluster import (
     Environment,
@@ -14,6 +15,7 @@ from ska_mid_jupyter_notebooks.dish.enum import (
     SPFOperatingMode,
     SPFRxOperatingMode,
 )
+from ska_mid_jupyter_notebooks.monitoring.waiting import wait_for_value
 
 
 class DishDeviceProxy(TangoDeviceProxy):
@@ -91,38 +93,49 @@ class TangoDishDeployment(TangoDeployment):
     def spfrx_in_the_loop(self) -> bool:
         return f"{self.dish_id}/spfrxpu/controller" in self.devices
 
-    def reset_dish(self):
+    def reset_dish(self, timeout: Union[float, None] = None):
+        """
+        Abort the dish operation, stow the dish and put it in standbyLP mode
+        :param timeout: the maximum time in seconds to wait for each dish mode, None to wait forever
+        :raises WaitTimeout: if a dish mode is not reached within the timeout
+        :return: None
+        """
         dish_manager = self.dish_manager
         print(f"{self.dish_id}: aborting dish operation")
         dish_manager.AbortCommands()
-        while dish_manager.dish_mode != DishMode.OPERATE:
-            time.sleep(1)
+        wait_for_value(
+            dish_manager, "dishMode", lambda mode: DishMode(mode) == DishMode.OPERATE, timeout
+        )
         print(f"{self.dish_id}: stowing dish")
         dish_manager.SetStowMode()
-        while dish_manager.dish_mode != DishMode.STOW:
-            time.sleep(1)
+        wait_for_value(
+            dish_manager, "dishMode", lambda mode: DishMode(mode) == DishMode.STOW, timeout
+        )
         print(f"{self.dish_id}: setting standbyLP mode")
         dish_manager.SetStandbyLPMode()
         print(f"{self.dish_id}: {dish_manager.Status()}")
 
     @property
     def dish_manager(self) -> DishManager:
-        return DishManager(self)
+        return self.cached_device(DishManager)
 
     @property
     def spfc_simulator(self) -> SPFC:
         # TODO: Update this to grab the real SPFC if it is connected.
-        return SPFC(self)
+        return self.cached_device(SPFC)
 
     @property
     def spfrx(self) -> SPFRx:
-        if self.spfrx_in_the_loop:
-            return SPFRx(self.dp(f"{self.dish_id}/spfrxpu/controller"))
-        return SPFRx(self.dp(f"mid-dish/simulator-spfrx/{self.dish_id}"))
+        def build() -> SPFRx:
+            if self.spfrx_in_the_loop:
+                return SPFRx(self.dp(f"{self.dish_id}/spfrxpu/controller"))
+            return SPFRx(self.dp(f"mid-dish/simulator-spfrx/{self.dish_id}"))
+
+        return self.cached_device(SPFRx, build)
 
     @property
     def ds_manager(self) -> DSManager:
-        return DSManager(self)
+        return self.cached_device(DSManager)
 
     def print_diagnostics(self):
         dm = self.dish_manager
@@ -0,0 +1,683 @@
+# pylint: disable=C,R
+"""An asyncio variant of MonState running subscriptions, polling and reductions on one loop."""
+
+import asyncio
+import inspect
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Generic, Literal, Union, cast
+
+from tango import DevFailed, EventType
+from tango import asyncio as tango_asyncio
+from tango.time_val import TimeVal
+
+from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
+    ACTION,
+    STATE,
+    SUB_ID,
+    VALUE,
+    ActionProducer,
+    ActionReducerFunction,
+    ActionsReducer,
+    BaseSubscription,
+    EventData,
+    EventsReducerFunction,
+    GenericEvent,
+    ObserveFunction,
+    Publisher,
+    Reducer,
+    Selector,
+    UnableToStartSubscription,
+    event_key,
+    is_connection_error,
+    to_event_data,
+)
+
+
+async def _resolve(result: Any) -> Any:
+    # depending on the PyTango version green mode methods return awaitables or values
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class AsyncDeviceFactory:
+    def __init__(self, db_host: str) -> None:
+        """
+        Initialises AsyncDeviceFactory class
+
+        Asyncio green mode proxies are cached by FQDN, concurrent requests for the same device
+        share a single proxy creation.
+
+        :param db_host: database host
+        :return: None
+        """
+        self._db_host = db_host
+        self._proxies: dict[str, Any] = {}
+        self._pending: dict[str, asyncio.Future[Any]] = {}
+
+    async def get_device(self, device_name: str) -> Any:
+        """
+        Get (or create) the asyncio device proxy
+        :param device_name: name of the device
+        :return: asyncio DeviceProxy
+        """
+        fqdn = f"tango://{self._db_host}/{device_name}"
+        if proxy := self._proxies.get(fqdn):
+            return proxy
+        if pending := self._pending.get(fqdn):
+            return await asyncio.shield(pending)
+        pending = asyncio.ensure_future(_resolve(tango_asyncio.DeviceProxy(fqdn)))
+        self._pending[fqdn] = pending
+        try:
+            proxy = await asyncio.shield(pending)
+        finally:
+            self._pending.pop(fqdn, None)
+        self._proxies[fqdn] = proxy
+        return proxy
+
+    def invalidate(self, device_name: str):
+        """
+        Drop the cached proxy of a device
+        :param device_name: name of the device
+        :return: None
+        """
+        self._proxies.pop(f"tango://{self._db_host}/{device_name}", None)
+
+    def invalidate_on_connection_error(self, device_name: str, exception: DevFailed):
+        """
+        Drop the cached proxy of a device if the exception was caused by a broken connection
+        :param device_name: name of the device
+        :param exception: the exception
+        :return: None
+        """
+        if is_connection_error(exception):
+            self.invalidate(device_name)
+
+
+class AsyncAttrPoller:
+    def __init__(
+        self, dev_factory: AsyncDeviceFactory, poll_rate: float = 2, read_timeout: float = 3.0
+    ) -> None:
+        """
+        Initialises AsyncAttrPoller class
+
+        Attributes are polled by one task per polling period, reading all attributes of a device
+        in one call and all devices concurrently. Only changed values are pushed.
+
+        :param dev_factory: the device factory
+        :param poll_rate: the default polling period in seconds
+        :param read_timeout: the maximum time in seconds to wait for a device read
+        :return: None
+        """
+        self._dev_factory = dev_factory
+        self._poll_rate = poll_rate
+        self._read_timeout = read_timeout
+        self._index = itertools.count(1)
+        self._subscriptions: dict[SUB_ID, tuple[str, str, float, Any]] = {}
+        self._periods: dict[float, set[SUB_ID]] = defaultdict(set)
+        self._tasks: dict[float, asyncio.Task[None]] = {}
+        self._values: dict[str, Any] = {}
+
+    async def add_subscription(
+        self, device_name: str, attr: str, pusher: Any, period: Union[float, None] = None
+    ) -> SUB_ID:
+        """
+        Poll an attribute, pushing its current value onto the pusher first
+        :param device_name: name of the device
+        :param attr: name of the attribute
+        :param pusher: the object (with a push_event method) to push changes onto
+        :param period: the polling period in seconds, defaults to the poll rate
+        :return: the subscription id
+        """
+        period = period if period is not None else self._poll_rate
+        await self._push_current_value(device_name, attr, pusher)
+        sub_id = next(self._index)
+        self._subscriptions[sub_id] = (device_name, attr, period, pusher)
+        self._periods[period].add(sub_id)
+        if period not in self._tasks:
+            self._tasks[period] = asyncio.get_running_loop().create_task(self._poll(period))
+        return sub_id
+
+    def remove_subscription(self, sub_id: SUB_ID):
+        """
+        Stop polling for a subscription
+        :param sub_id: the subscription id
+        :return: None
+        """
+        if (subscription := self._subscriptions.pop(sub_id, None)) is None:
+            return
+        device_name, attr, period, _ = subscription
+        if not self._pushers(device_name, attr):
+            # a new subscriber gets the current value, no need to remember the last one
+            self._values.pop(event_key(device_name, attr), None)
+        self._periods[period].discard(sub_id)
+        if not self._periods[period]:
+            self._periods.pop(period)
+            if task := self._tasks.pop(period, None):
+                task.cancel()
+
+    async def _poll(self, period: float):
+        loop = asyncio.get_running_loop()
+        while self._periods.get(period):
+            deadline = math.ceil(loop.time() / period) * period
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            per_device: dict[str, dict[str, list[Any]]] = defaultdict(lambda: defaultdict(list))
+            for sub_id in self._periods.get(period, ()):
+                device_name, attr, _, pusher = self._subscriptions[sub_id]
+                per_device[device_name][attr].append(pusher)
+            results = await asyncio.gather(
+                *[
+                    self._poll_device(device_name, attrs)
+                    for device_name, attrs in per_device.items()
+                ],
+                return_exceptions=True,
+            )
+            for device_name, result in zip(per_device, results):
+                # keep polling the other devices (and this one on the next period)
+                if isinstance(result, Exception):
+                    logging.error("Polling %s failed: %r", device_name, result, exc_info=result)
+
+    def _pushers(self, device_name: str, attr: str) -> list[Any]:
+        return [
+            pusher
+            for subscribed_device, subscribed_attr, _, pusher in self._subscriptions.values()
+            if subscribed_device == device_name and subscribed_attr == attr
+        ]
+
+    async def _read(self, device_name: str, names: list[str]) -> Union[tuple[Any, Any], None]:
+        try:
+            proxy = await self._dev_factory.get_device(device_name)
+            results = await asyncio.wait_for(
+                _resolve(proxy.read_attributes(names)), self._read_timeout
+            )
+        except DevFailed as exception:
+            self._dev_factory.invalidate_on_connection_error(device_name, exception)
+            logging.warning("Unable to poll %s: %s", device_name, exception.args)
+            return None
+        except asyncio.TimeoutError:
+            logging.warning("Timed out polling %s", device_name)
+            return None
+        return proxy, results
+
+    async def _push_current_value(self, device_name: str, attr: str, pusher: Any):
+        try:
+            read = await self._read(device_name, [attr])
+        except Exception as exception:
+            # the subscription is polled regardless, the next poll pushes the value
+            logging.error("Reading %s failed: %r", device_name, exception, exc_info=exception)
+            return
+        if read is None or getattr(read[1][0], "has_failed", False):
+            return
+        proxy, (result,) = read
+        key = event_key(device_name, attr)
+        pushers = [pusher]
+        if self._values.get(key, self) != result.value:
+            # the existing subscribers have not seen this value yet either
+            self._values[key] = result.value
+            pushers.extend(self._pushers(device_name, attr))
+        event = EventData(attr, result, proxy, False, [], "", reception_date=TimeVal.now())
+        for subscriber in pushers:
+            subscriber.push_event(event)
+
+    async def _poll_device(self, device_name: str, attrs: dict[str, list[Any]]):
+        names = list(attrs.keys())
+        if (read := await self._read(device_name, names)) is None:
+            return
+        proxy, results = read
+        for attr, result in zip(names, results):
+            if getattr(result, "has_failed", False):
+                continue
+            key = event_key(device_name, attr)
+            if self._values.get(key, self) != result.value:
+                self._values[key] = result.value
+                event = EventData(attr, result, proxy, False, [], "", reception_date=TimeVal.now())
+                for pusher in attrs[attr]:
+                    pusher.push_event(event)
+
+    def stop(self):
+        """
+        Stop all polling
+        :return: None
+        """
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._periods.clear()
+        self._subscriptions.clear()
+        self._values.clear()
+
+
+class AsyncEventsSubscription:
+    """A running tango change event subscription (or poll) started on the event loop."""
+
+    def __init__(
+        self, device_name: str, attr: str, poll_period: Union[float, None] = None
+    ) -> None:
+        """
+        Initialise the object.
+        :param device_name: The tango device FQD name
+        :param attr: The attribute of that device to be subscribed to for change events.
+        :param poll_period: The period in seconds at which the attribute needs to be polled
+        :return: None
+        """
+        self.device_name = device_name
+        self.attr = attr
+        self._poll_period = poll_period
+        self._sub_id: Union[int, None] = None
+        self._proxy: Any = None
+        self._poller: Union[AsyncAttrPoller, None] = None
+
+    async def start(self, monitor: "AsyncMonState[Any]"):
+        """
+        Subscribe to change events (or poll when USE_POLLING is set), falling back to setting up
+        polling on the device server if the device does not push change events itself.
+        :param monitor: the monitor to push events onto
+        :return: None
+        """
+        if os.getenv("USE_POLLING"):
+            self._poller = monitor.poller
+            self._sub_id = await self._poller.add_subscription(
+                self.device_name, self.attr, monitor, self._poll_period
+            )
+            return
+        try:
+            self._proxy = await monitor.dev_factory.get_device(self.device_name)
+        except DevFailed as exception:
+            raise UnableToStartSubscription(
+                self.device_name, self.attr, cast(Exception, exception).args
+            ) from exception
+        try:
+            self._sub_id = await _resolve(
+                self._proxy.subscribe_event(self.attr, EventType.CHANGE_EVENT, monitor.push_event)
+            )
+        except DevFailed:
+            poll_period_ms = int(self._poll_period * 1000) if self._poll_period else 100
+            try:
+                await _resolve(self._proxy.poll_attribute(self.attr, poll_period_ms))
+                self._sub_id = await _resolve(
+                    self._proxy.subscribe_event(
+                        self.attr, EventType.CHANGE_EVENT, monitor.push_event
+                    )
+                )
+            except DevFailed as exception:
+                monitor.dev_factory.invalidate_on_connection_error(self.device_name, exception)
+                raise UnableToStartSubscription(
+                    self.device_name, self.attr, cast(Exception, exception).args
+                ) from exception
+
+    async def stop(self):
+        """
+        Stop the subscription.
+        :return: None
+        """
+        assert (
+            self._sub_id
+        ), "You can not stop a subscription that has not been started, did you call start()?."
+        if self._poller:
+            self._poller.remove_subscription(self._sub_id)
+            return
+        await _resolve(self._proxy.unsubscribe_event(self._sub_id))
+
+
+class AsyncEventsReducer(Reducer[STATE], Generic[STATE]):
+    """Reducer for Tango Device change events subscribed to on the event loop."""
+
+    def __init__(
+        self,
+        device_name: str,
+        attr_name: str,
+        reduce_function: EventsReducerFunction[STATE],
+        poll_period: Union[float, None] = None,
+    ) -> None:
+        """Initialise the object.
+
+        :param device_name: The FQD name of the tango device
+        :param attr_name: The attribute of the device to listen to for events
+        :param reduce_function: The user provided reduce function for tango events
+        :param poll_period: The period in seconds at which the attribute needs to be polled
+        :return: None
+        """
+        self.device_name = device_name
+        self.attr_name = attr_name
+        self._reduce_function = reduce_function
+        self._poll_period = poll_period
+
+    def reduce(self, state: STATE, event_or_action: GenericEvent) -> STATE:
+        """
+        Effects the reduction of the system by running the user provided reduce function.
+        :param state: The current state of the system
+        :param event_or_action: The event to be used as input to the reduce function
+        :return: The updated state
+        """
+        return self._reduce_function(state, cast(EventData, event_or_action))
+
+    def generate_subscription(self) -> BaseSubscription:
+        """
+        Generate a subscription to be started (awaited) on the event loop.
+        :return: AsyncEventsSubscription
+        """
+        return cast(
+            BaseSubscription,
+            AsyncEventsSubscription(self.device_name, self.attr_name, self._poll_period),
+        )
+
+    @property
+    def key(self) -> str:
+        """
+        Generate a unique key to identify the reducer in a dictionary.
+        :return: the key
+        """
+        return event_key(self.device_name, self.attr_name)
+
+
+class AsyncMonState(Generic[STATE]):
+    """An asyncio variant of MonState.
+
+    Reducers, selectors and publishers are used in the same way as for MonState but events are
+    queued on an asyncio queue and reduced (in batches) by a task on the running loop, tango
+    subscriptions and polling use asyncio green mode proxies so that no threads are needed:
+
+    .. code-block::
+       monitor = AsyncMonState(init_state, deployment)
+       monitor.add_events_reducer("mid-csp/control/0", "state", reduce_state)
+       await monitor.start_subscriptions()
+       monitor.start_listening()
+       await monitor.wait_for(select_csp_state, "ON", timeout=10)
+    """
+
+    def __init__(
+        self,
+        initState: STATE,
+        deployment: TangoDeployment,
+        max_batch_size: int = 1000,
+        dev_factory: Union[AsyncDeviceFactory, None] = None,
+        poller: Union[AsyncAttrPoller, None] = None,
+    ) -> None:
+        """
+        Initialise the object
+        :param initState: the initial state of the system
+        :param deployment: the tango deployment to monitor
+        :param max_batch_size: the maximum number of events reduced before publishing
+        :param dev_factory: the device factory, defaults to a new factory for the deployment
+        :param poller: the poller used when polling instead of subscribing (USE_POLLING),
+            defaults to a new poller using the device factory
+        :return: None
+        """
+        self.state = initState
+        self._max_batch_size = max_batch_size
+        self._dev_factory = dev_factory or AsyncDeviceFactory(deployment.tango_host)
+        self._poller = poller or AsyncAttrPoller(self._dev_factory)
+        self.subscriptions: dict[str, Any] = {}
+        self._reducers: dict[str, list[Reducer[STATE]]] = defaultdict(lambda: [])
+        self._publishers: list[Publisher[STATE, Any]] = []
+        self._waiters: list[tuple[Selector[STATE, Any], Any, asyncio.Future[Any]]] = []
+        self._events: asyncio.Queue[GenericEvent] = asyncio.Queue()
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self._loop_thread: Union[int, None] = None
+        self._task: Union[asyncio.Task[None], None] = None
+        self._last_handled = time.time()
+        self._dropped_count = 0
+
+    @property
+    def dev_factory(self) -> AsyncDeviceFactory:
+        return self._dev_factory
+
+    @property
+    def poller(self) -> AsyncAttrPoller:
+        return self._poller
+
+    def push_event(self, event: GenericEvent):
+        """
+        Push a new event onto the system, safe to be called from any thread (e.g. tango callbacks).
+        :param event: The event that needs to be pushed.
+        :return: None
+        """
+        if (event_data := to_event_data(event)) is None:
+            self._dropped_count += 1
+            return
+        if self._loop is None or threading.get_ident() == self._loop_thread:
+            self._events.put_nowait(event_data)
+        else:
+            self._loop.call_soon_threadsafe(self._events.put_nowait, event_data)
+
+    def _add_generic_reducer(self, reducer: Reducer[STATE]):
+        if self._reducers[reducer.key] == []:
+            self.subscriptions[reducer.key] = reducer.generate_subscription()
+        self._reducers[reducer.key].append(reducer)
+
+    def add_events_reducer(
+        self,
+        device_name: str,
+        attr_name: str,
+        reduce_function: EventsReducerFunction[STATE],
+        poll_period: Union[float, None] = None,
+    ):
+        """Add a reducer function operating on tango device attribute change events.
+
+        :param device_name: The FDQ device name
+        :param attr_name: The device attribute
+        :param reduce_function: The function to update the state of the system when the attribute changes
+        :param poll_period: The period in seconds at which the attribute needs to be polled
+        :return: None
+        """
+        self._add_generic_reducer(
+            AsyncEventsReducer(device_name, attr_name, reduce_function, poll_period)
+        )
+
+    def add_action_reducer(
+        self,
+        producer: ActionProducer[ACTION],
+        reduce_function: ActionReducerFunction[STATE, ACTION],
+    ):
+        """Add a reducer function operating on action events occurring on the application.
+
+        :param producer: The action producer to be subscribed to for a particular event.
+        :param reduce_function: The reduce function to be called by the provided producer.
+        :return: None
+        """
+        self._add_generic_reducer(ActionsReducer(producer, reduce_function))
+
+    def add_reducers(self, reducers: list[Reducer[STATE]]):
+        """Add a list of predefined reducers to the monitor.
+
+        :param reducers: The list of reducers to be added
+        :return: None
+        """
+        for reducer in reducers:
+            self._add_generic_reducer(reducer)
+
+    def add_observer(
+        self, observe_function: ObserveFunction[VALUE], selector: Selector[STATE, VALUE]
+    ):
+        """Add an observe function to a provided selector function.
+
+        :param observe_function: The function to be called when the selector function calculation changed.
+        :param selector: The selector object to be used for calculating a new value
+        :return: None
+        """
+        self._publishers.append(Publisher(selector, observe_function))
+
+    def add_publishers(self, publishers: list[Publisher[STATE, Any]]):
+        """Add a list of publishers to the existing list of publishers.
+
+        :param publishers: The list of publishers
+        :return: None
+        """
+        self._publishers.extend(publishers)
+
+    async def start_subscriptions(self):
+        """
+        Start all subscriptions concurrently on the running loop.
+
+        Note an unsuccessful subscription that can not be started will cause the subscription and reducer to
+        be removed.
+        :return: None
+        """
+        self._bind_loop()
+        keys = list(self.subscriptions.keys())
+        results = await asyncio.gather(
+            *[_resolve(self.subscriptions[key].start(self)) for key in keys],
+            return_exceptions=True,
+        )
+        for key, result in zip(keys, results):
+            if isinstance(result, UnableToStartSubscription):
+                logging.warning(
+                    "Unable to start subscription on %s for %s", result.device_name, result.attr
+                )
+            elif isinstance(result, BaseException):
+                logging.error("Unable to start subscription for %s: %s", key, result)
+            else:
+                continue
+            self.subscriptions.pop(key)
+            self._reducers.pop(key)
+
+    async def stop_subscriptions(self):
+        """
+        Stop all subscriptions.
+        :return: None
+        """
+        await asyncio.gather(
+            *[_resolve(subscription.stop()) for subscription in self.subscriptions.values()],
+            return_exceptions=True,
+        )
+        self._poller.stop()
+
+    def _bind_loop(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+    def _reduce(self, state: STATE, event: GenericEvent) -> STATE:
+        reducers_to_remove: list[int] = []
+        if reducers := self._reducers.get(event.key):
+            for index, reducer in enumerate(reducers):
+                try:
+                    state = reducer.reduce(state, event)
+                # pylint: disable-next=broad-except
+                except Exception as exception:
+                    logging.exception(exception.args)
+                    reducers_to_remove.append(index)
+            for index in reversed(reducers_to_remove):
+                reducers.pop(index)
+        return state
+
+    def _publish(self, state: STATE):
+        publishers_to_remove: list[int] = []
+        for index, publisher in enumerate(self._publishers):
+            try:
+                publisher.publish(state)
+            # pylint: disable-next=broad-except
+            except Exception as exception:
+                logging.exception(exception.args)
+                publishers_to_remove.append(index)
+        for index in reversed(publishers_to_remove):
+            self._publishers.pop(index)
+        for waiter in list(self._waiters):
+            selector, value, future = waiter
+            if future.done():
+                continue
+            try:
+                if selector.select(state) == value:
+                    future.set_result(value)
+            # pylint: disable-next=broad-except
+            except Exception as exception:
+                future.set_exception(exception)
+
+    async def _listening_loop(self):
+        while True:
+            events = [await self._events.get()]
+            while len(events) < self._max_batch_size:
+                try:
+                    events.append(self._events.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            state = self.state
+            for event in events:
+                state = self._reduce(state, event)
+            self._publish(state)
+            self.state = state
+            for _ in events:
+                self._events.task_done()
+            self._last_handled = time.time()
+
+    def start_listening(self):
+        """
+        Start reducing and publishing incoming events on the running loop.
+        :return: None
+        """
+        self._bind_loop()
+        self._task = asyncio.get_running_loop().create_task(self._listening_loop())
+
+    async def stop_listening(self):
+        """
+        Stop reducing and publishing events.
+        :return: None
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def listening_state(self) -> Literal["Running", "Aborted", "Not Started"]:
+        """
+        The state of the listening task
+        :return: The state of the listening task
+        """
+        if self._task:
+            return "Aborted" if self._task.done() else "Running"
+        return "Not Started"
+
+    def get_last_poll_latency(self) -> float:
+        """
+        Get the time since the last batch of events was handled
+        :return: last poll latency
+        """
+        return time.time() - self._last_handled
+
+    def get_dropped_count(self) -> int:
+        return self._dropped_count
+
+    async def block_until_empty(self):
+        """
+        Wait until all events have been handled.
+        :return: None
+        """
+        await self._events.join()
+
+    async def wait_for(
+        self,
+        selector: Union[Selector[STATE, VALUE], Callable[[STATE], VALUE]],
+        value: VALUE,
+        timeout: Union[float, None] = None,
+    ) -> VALUE:
+        """
+        Wait until a selector selects a given value from the state.
+        :param selector: the selector (or selector function)
+        :param value: the value to wait for
+        :param timeout: the maximum time in seconds to wait, defaults to waiting forever
+        :raises TimeoutError: if the value was not selected in time
+        :return: the value
+        """
+        if not isinstance(selector, Selector):
+            selector = Selector(selector)
+        if selector.select(self.state) == value:
+            return value
+        future: asyncio.Future[VALUE] = asyncio.get_running_loop().create_future()
+        waiter = (cast(Selector[STATE, Any], selector), value, future)
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(cast(Awaitable[VALUE], future), timeout)
+        except asyncio.TimeoutError as exception:
+            # not the builtin TimeoutError before python 3.11
+            raise TimeoutError(f"{value!r} was not selected within {timeout}s") from exception
+        finally:
+            self._waiters.remove(waiter)
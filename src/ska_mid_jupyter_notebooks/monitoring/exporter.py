@@ -0,0 +1,182 @@
+# pylint: disable=C,R
+"""A lightweight HTTP endpoint exposing the metrics of a MonState in OpenMetrics text format."""
+
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Union
+
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import explode_from_key
+
+if TYPE_CHECKING:
+    from ska_mid_jupyter_notebooks.monitoring.statemonitoring import MonState
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Family:
+    """The lines of a single metric family."""
+
+    def __init__(self, name: str, metric_type: str, help_text: str) -> None:
+        self._name = name
+        self.lines = [f"# TYPE {name} {metric_type}", f"# HELP {name} {help_text}"]
+
+    def add(self, value: Union[int, float], suffix: str = "", **labels: str):
+        self.lines.append(f"{self._name}{suffix}{_labels(**labels)} {value}")
+
+
+class MetricsExporter:
+    def __init__(self, monitor: "MonState[Any]", host: str = "0.0.0.0", port: int = 0) -> None:
+        """
+        Initialises MetricsExporter class
+        :param monitor: the monitor to expose the metrics of
+        :param host: the interface to listen on
+        :param port: the port to listen on, 0 picks a free port
+        :return: None
+        """
+        self._monitor = monitor
+        self._host = host
+        self._port = port
+        self._server: Union[ThreadingHTTPServer, None] = None
+        self._thread: Union[Thread, None] = None
+        self._lock = Lock()
+        self._last_scrape = (time.monotonic(), monitor.get_handled_count())
+
+    @property
+    def port(self) -> int:
+        if self._server:
+            return self._server.server_address[1]
+        return self._port
+
+    @property
+    def url(self) -> str:
+        host = "localhost" if self._host in ("", "0.0.0.0") else self._host
+        return f"http://{host}:{self.port}/metrics"
+
+    def _events_per_second(self, handled: int) -> float:
+        # the rate since the previous scrape
+        now = time.monotonic()
+        with self._lock:
+            last_time, last_handled = self._last_scrape
+            self._last_scrape = (now, handled)
+        elapsed = now - last_time
+        return (handled - last_handled) / elapsed if elapsed > 0 else 0.0
+
+    def render(self) -> str:
+        """
+        Render the current metrics
+        :return: the metrics in OpenMetrics text format
+        """
+        monitor = self._monitor
+        prefix = "ska_mid_monitor"
+        families: list[_Family] = []
+
+        def family(name: str, metric_type: str, help_text: str) -> _Family:
+            families.append(_Family(f"{prefix}_{name}", metric_type, help_text))
+            return families[-1]
+
+        handled = monitor.get_handled_count()
+        family("queue_depth", "gauge", "Events waiting to be handled").add(
+            monitor.get_queue_depth()
+        )
+        family("queue_high_water_mark", "gauge", "Most events ever waiting to be handled").add(
+            monitor.get_high_water_mark()
+        )
+        family("events", "counter", "Events handled").add(handled, "_total")
+        family("events_per_second", "gauge", "Events handled per second since last scrape").add(
+            self._events_per_second(handled)
+        )
+        family("dropped_events", "counter", "Events dropped without being queued").add(
+            monitor.get_dropped_count(), "_total"
+        )
+        family("overflowed_events", "counter", "Events dropped because the queue was full").add(
+            monitor.get_overflow_count(), "_total"
+        )
+        family("coalesced_events", "counter", "Events replaced by a newer pending event").add(
+            monitor.get_coalesced_count(), "_total"
+        )
+        family("reducer_errors", "counter", "Reducers removed after raising").add(
+            monitor.get_reducer_error_count(), "_total"
+        )
+        family("publisher_errors", "counter", "Publishers removed after raising").add(
+            monitor.get_publisher_error_count(), "_total"
+        )
+        if (cycle_time := monitor.poller.get_last_cycle_time()) is not None:
+            family("poll_cycle_seconds", "gauge", "Wall time of the last poll cycle").add(
+                cycle_time
+            )
+        staleness = family(
+            "attribute_staleness_seconds", "gauge", "Time since the last update of an attribute"
+        )
+        for key, seconds in sorted(monitor.get_staleness().items()):
+            device, attr = (explode_from_key(key) + [""])[:2]
+            staleness.add(seconds, device=device, attribute=attr)
+        if liveness := monitor.get_liveness():
+            family(
+                "stale_attributes", "gauge", "Attributes silent for longer than their heartbeat"
+            ).add(sum(attribute.stale for attribute in liveness.values()))
+            family(
+                "failed_over_attributes", "gauge", "Attributes polled instead of subscribed"
+            ).add(sum(attribute.polling for attribute in liveness.values()))
+        report = monitor.metrics()
+        if report.stages:
+            latency = family("latency_seconds", "summary", "Latency of the event handling stages")
+            for stage, summary in report.stages.items():
+                for quantile, value in [
+                    ("0.5", summary.p50),
+                    ("0.95", summary.p95),
+                    ("0.99", summary.p99),
+                ]:
+                    latency.add(value, stage=stage, quantile=quantile)
+                latency.add(summary.count, "_count", stage=stage)
+                latency.add(summary.mean * summary.count, "_sum", stage=stage)
+        lines = [line for metric_family in families for line in metric_family.lines]
+        return "\n".join([*lines, "# EOF", ""])
+
+    def start(self) -> "MetricsExporter":
+        """
+        Start serving the metrics on a background thread
+        :return: self
+        """
+        exporter = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any):
+                pass
+
+        self._server = ThreadingHTTPServer((self._host, self._port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving the metrics
+        :return: None
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
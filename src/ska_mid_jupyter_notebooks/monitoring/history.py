@@ -0,0 +1,322 @@
+# pylint: disable=C,R
+"""Fixed memory ring buffers keeping the recent history of monitored attribute values."""
+
+import logging
+import math
+import sys
+from threading import Lock
+from typing import Any, NamedTuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+# the values of numeric attributes are stored as floats, those of numeric array attributes
+# (e.g. pointing) as rows of floats and those of other attributes (enums, DevState, strings)
+# as codes into the labels interned by the history store
+NUMERIC = "numeric"
+ARRAY = "array"
+STATE = "state"
+
+
+def _is_numeric(value: Any) -> bool:
+    # DevState and other enums are ints as well but are better kept as states
+    return type(value) in (int, float, bool) or isinstance(value, (np.integer, np.floating))
+
+
+def _array_width(value: Any) -> Union[int, None]:
+    """
+    Get the width of a one dimensional numeric array value
+    :param value: the value
+    :return: the number of elements or None if the value is not a numeric array
+    """
+    if isinstance(value, np.ndarray):
+        if value.ndim == 1 and value.size and np.issubdtype(value.dtype, np.number):
+            return int(value.size)
+        return None
+    if isinstance(value, (list, tuple)) and value and all(_is_numeric(item) for item in value):
+        return len(value)
+    return None
+
+
+class HistoryView(NamedTuple):
+    """The values of an attribute over a time range.
+
+    times and values are read only views on the ring buffer (no copy is made). Once the buffer
+    is full every append overwrites its oldest entry, which is also the first entry of any view
+    starting at it, so copy them to keep them beyond the next append.
+    """
+
+    key: str
+    times: npt.NDArray[np.float64]
+    values: npt.NDArray[Any]
+    labels: Union[list[str], None]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def decoded(self) -> list[Any]:
+        """
+        Get the values with state codes replaced by their labels
+        :return: the values
+        """
+        if self.labels is None:
+            return self.values.tolist()
+        return [self.labels[code] for code in self.values]
+
+    def durations(self, end: Union[float, None] = None) -> dict[Any, float]:
+        """
+        Get the time spent in each value, each value lasting until the next one
+        :param end: the time the last value lasts until, defaults to the time of the last value
+        :return: the time in seconds per value
+        """
+        result: dict[Any, float] = {}
+        if not len(self):
+            return result
+        ends = np.append(self.times[1:], self.times[-1] if end is None else end)
+        for value, duration in zip(self.decoded(), ends - self.times):
+            result[value] = result.get(value, 0.0) + float(duration)
+        return result
+
+
+class AttributeHistory:
+    def __init__(
+        self, key: str, capacity: int, kind: str, labels: list[str], width: int = 1
+    ) -> None:
+        """
+        Initialises AttributeHistory class
+
+        Every entry is written twice, at its ring position and at that position plus capacity,
+        so that the latest capacity entries are always contiguous and any time range of them
+        can be returned as a view. Appends are O(1) and memory is fixed at allocation.
+
+        :param key: the event key (device:attr)
+        :param capacity: the number of entries kept
+        :param kind: NUMERIC, ARRAY or STATE
+        :param labels: the labels of the state codes (shared by the store)
+        :param width: (ARRAY) the number of elements of a value
+        :return: None
+        """
+        self.key = key
+        self.capacity = capacity
+        self.kind = kind
+        self.width = width
+        self._labels = labels
+        self._times = np.zeros(2 * capacity, dtype=np.float64)
+        if kind == ARRAY:
+            self._values = np.zeros((2 * capacity, width), dtype=np.float64)
+        else:
+            self._values = np.zeros(
+                2 * capacity, dtype=np.float64 if kind == NUMERIC else np.int32
+            )
+        self._next = 0
+        self._count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._times.nbytes + self._values.nbytes
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: Any):
+        """
+        Append a value (a value for STATE attributes is a code, for ARRAY attributes a row)
+        :param timestamp: the time of the value in seconds since the epoch
+        :param value: the value
+        :return: None
+        """
+        if self._count and timestamp < (last := self._times[self._next + self.capacity - 1]):
+            # keep the time column sorted for searching
+            timestamp = last
+        index = self._next
+        self._times[index] = self._times[index + self.capacity] = timestamp
+        self._values[index] = self._values[index + self.capacity] = value
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _window(self) -> slice:
+        # the latest entries, oldest first, as one contiguous slice of the doubled buffers
+        end = self._next + self.capacity
+        return slice(end - self._count, end)
+
+    def view(self, start: float = -math.inf, end: float = math.inf) -> HistoryView:
+        """
+        Get the values with a time in [start, end]
+        :param start: the start of the time range in seconds since the epoch
+        :param end: the end of the time range in seconds since the epoch
+        :return: HistoryView
+        """
+        window = self._window()
+        times = self._times[window]
+        values = self._values[window]
+        first = int(np.searchsorted(times, start, side="left"))
+        last = int(np.searchsorted(times, end, side="right"))
+        times = times[first:last]
+        values = values[first:last]
+        times.flags.writeable = False
+        values.flags.writeable = False
+        return HistoryView(self.key, times, values, self._labels if self.kind == STATE else None)
+
+    def latest(self) -> Union[tuple[float, Any], None]:
+        """
+        Get the latest entry
+        :return: (time, value) or None when empty
+        """
+        if not self._count:
+            return None
+        index = self._next + self.capacity - 1
+        value = self._values[index]
+        if self.kind == NUMERIC:
+            return float(self._times[index]), float(value)
+        if self.kind == ARRAY:
+            return float(self._times[index]), value.tolist()
+        return float(self._times[index]), self._labels[value]
+
+
+class HistoryStore:
+    def __init__(
+        self,
+        capacity: int = 4096,
+        capacities: Union[dict[str, int], None] = None,
+        memory_budget: int = 64 * 1024 * 1024,
+        max_labels: int = 256,
+    ) -> None:
+        """
+        Initialises HistoryStore class
+
+        A ring buffer is allocated for an attribute on its first value. Attributes that would
+        take the store over its memory budget are not recorded (and counted as rejected). The
+        labels of state values count against the budget as well, and an attribute with more
+        than max_labels distinct values (e.g. free text) stops being recorded.
+
+        :param capacity: the default number of entries kept per attribute
+        :param capacities: the number of entries kept for specific attributes (event keys)
+        :param memory_budget: the maximum number of bytes allocated for the ring buffers and
+            labels
+        :param max_labels: the maximum number of distinct values of a state attribute
+        :return: None
+        """
+        self._capacity = capacity
+        self._capacities = capacities or {}
+        self._memory_budget = memory_budget
+        self._max_labels = max_labels
+        self._histories: dict[str, AttributeHistory] = {}
+        self._rejected: set[str] = set()
+        self._labels: list[str] = []
+        self._codes: dict[str, int] = {}
+        # event key -> the codes of its values
+        self._key_codes: dict[str, set[int]] = {}
+        self._nbytes = 0
+        self._lock = Lock()
+
+    def _reject(self, key: str, reason: str):
+        # needs to be called with the lock held
+        if key not in self._rejected:
+            logging.warning("%s, not recording %s", reason, key)
+            self._rejected.add(key)
+        if history := self._histories.pop(key, None):
+            self._nbytes -= history.nbytes
+        self._key_codes.pop(key, None)
+
+    def _code(self, key: str, value: Any) -> Union[int, None]:
+        label = str(value)
+        if (codes := self._key_codes.get(key)) is None:
+            # rejected in the meantime
+            return None
+        if (code := self._codes.get(label)) is not None and code in codes:
+            return code
+        with self._lock:
+            if key in self._rejected:
+                return None
+            if len(codes) >= self._max_labels:
+                self._reject(key, f"More than {self._max_labels} distinct values")
+                return None
+            if (code := self._codes.get(label)) is None:
+                size = sys.getsizeof(label)
+                if self._nbytes + size > self._memory_budget:
+                    self._reject(key, "History memory budget exhausted")
+                    return None
+                code = len(self._labels)
+                self._labels.append(label)
+                self._codes[label] = code
+                self._nbytes += size
+            codes.add(code)
+        return code
+
+    def _allocate(self, key: str, kind: str, width: int) -> Union[AttributeHistory, None]:
+        with self._lock:
+            if history := self._histories.get(key):
+                return history
+            if key in self._rejected:
+                return None
+            capacity = self._capacities.get(key, self._capacity)
+            # time and value columns of 8 bytes (at most) per element, doubled
+            if self._nbytes + 2 * capacity * 8 * (1 + width) > self._memory_budget:
+                self._reject(key, "History memory budget exhausted")
+                return None
+            history = AttributeHistory(key, capacity, kind, self._labels, width)
+            self._nbytes += history.nbytes
+            self._histories[key] = history
+            if kind == STATE:
+                self._key_codes[key] = set()
+            return history
+
+    def record(self, key: str, value: Any, timestamp: float):
+        """
+        Record the value of an attribute
+        :param key: the event key (device:attr)
+        :param value: the value
+        :param timestamp: the time of the value in seconds since the epoch
+        :return: None
+        """
+        if (history := self._histories.get(key)) is None:
+            if key in self._rejected:
+                return
+            if _is_numeric(value):
+                history = self._allocate(key, NUMERIC, 1)
+            elif width := _array_width(value):
+                history = self._allocate(key, ARRAY, width)
+            else:
+                history = self._allocate(key, STATE, 1)
+            if history is None:
+                return
+        if history.kind == STATE:
+            if (code := self._code(key, value)) is not None:
+                history.append(timestamp, code)
+        elif history.kind == ARRAY:
+            if _array_width(value) == history.width:
+                history.append(timestamp, value)
+            else:
+                history.append(timestamp, math.nan)
+        elif _is_numeric(value):
+            history.append(timestamp, value)
+        else:
+            history.append(timestamp, math.nan)
+
+    def keys(self) -> list[str]:
+        return list(self._histories)
+
+    def get(self, key: str) -> Union[AttributeHistory, None]:
+        return self._histories.get(key)
+
+    def view(self, key: str, start: float = -math.inf, end: float = math.inf) -> HistoryView:
+        """
+        Get the recorded values of an attribute with a time in [start, end]
+        :param key: the event key (device:attr)
+        :param start: the start of the time range in seconds since the epoch
+        :param end: the end of the time range in seconds since the epoch
+        :return: HistoryView (empty if the attribute has not been recorded)
+        """
+        if history := self._histories.get(key):
+            return history.view(start, end)
+        empty = np.zeros(0, dtype=np.float64)
+        empty.flags.writeable = False
+        return HistoryView(key, empty, empty, None)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    @property
+    def rejected_keys(self) -> list[str]:
+        return sorted(self._rejected)
@@ -0,0 +1,308 @@
+# pylint: disable=C,R
+"""An append only binary journal of the tango events going through a monitor and its replay."""
+
+import logging
+import struct
+import time
+from collections import deque
+from threading import Event, Lock, Thread
+from typing import Any, BinaryIO, Iterator, NamedTuple, Union
+
+from tango import DevState
+from tango.time_val import TimeVal
+
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
+    DeviceAttribute,
+    EventData,
+    EventsPusher,
+    GenericEvent,
+)
+
+MAGIC = b"SKAMONJ1"
+
+# a record is a little endian uint32 length followed by:
+#   float64 source time, float64 enqueue time,
+#   uint16 length + utf-8 device name, uint16 length + utf-8 attribute name,
+#   uint16 length + utf-8 attribute type, uint8 value tag + value
+# where the items of an array value are each a uint32 length followed by a tagged value
+_LENGTH = struct.Struct("<I")
+_TIMES = struct.Struct("<dd")
+_SHORT = struct.Struct("<H")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+
+_NONE, _FALSE, _TRUE, _INTEGER, _REAL, _TEXT, _DEV_STATE, _ARRAY = range(8)
+
+
+def _encode_text(text: str) -> bytes:
+    data = text.encode()
+    return _SHORT.pack(len(data)) + data
+
+
+def _encode_value(value: Any) -> bytes:
+    if value is None:
+        return bytes([_NONE])
+    if isinstance(value, bool):
+        return bytes([_TRUE if value else _FALSE])
+    if isinstance(value, DevState):
+        return bytes([_DEV_STATE, int(value)])
+    if isinstance(value, int) and -(2**63) <= value < 2**63:
+        return bytes([_INTEGER]) + _INT.pack(value)
+    if isinstance(value, float):
+        return bytes([_REAL]) + _FLOAT.pack(value)
+    if isinstance(value, str):
+        data = value.encode()
+        return bytes([_TEXT]) + _LENGTH.pack(len(data)) + data
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        items = [_encode_value(item) for item in value]
+        return bytes([_ARRAY]) + b"".join(_LENGTH.pack(len(item)) + item for item in items)
+    raise TypeError(f"unable to journal a value of type {type(value).__name__}")
+
+
+def _decode_value(data: memoryview) -> Any:
+    tag = data[0]
+    if tag == _NONE:
+        return None
+    if tag in (_FALSE, _TRUE):
+        return tag == _TRUE
+    if tag == _DEV_STATE:
+        return DevState(data[1])
+    if tag == _INTEGER:
+        return _INT.unpack_from(data, 1)[0]
+    if tag == _REAL:
+        return _FLOAT.unpack_from(data, 1)[0]
+    if tag == _TEXT:
+        start = 1 + _LENGTH.size
+        end = start + _LENGTH.unpack_from(data, 1)[0]
+        return bytes(data[start:end]).decode()
+    if tag == _ARRAY:
+        items: list[Any] = []
+        offset = 1
+        while offset < len(data):
+            start = offset + _LENGTH.size
+            end = start + _LENGTH.unpack_from(data, offset)[0]
+            items.append(_decode_value(data[start:end]))
+            offset = end
+        return items
+    raise ValueError(f"unknown value tag {tag}")
+
+
+class JournalRecord(NamedTuple):
+    """A tango event as recorded in a journal, times are seconds since the epoch."""
+
+    device_name: str
+    attr_name: str
+    attr_type: str
+    value: Any
+    source: float
+    enqueued: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.device_name}:{self.attr_name}"
+
+    def to_event(self) -> EventData:
+        """
+        Recreate the event
+        :return: EventData
+        """
+        reception_date = TimeVal.fromtimestamp(self.source)
+        return EventData(
+            self.attr_name,
+            DeviceAttribute(self.value, reception_date, self.attr_type, self.attr_name),
+            _ReplayedDevice(self.device_name),
+            False,
+            [],
+            "change",
+            reception_date,
+        )
+
+
+class _ReplayedDevice:
+    """Stands in for the DeviceProxy of a replayed event."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+
+def encode_record(event: EventData, enqueued: float) -> bytes:
+    """
+    Encode a tango event as a length prefixed journal record
+    :param event: the event
+    :param enqueued: the time the event was queued
+    :return: the record
+    """
+    totime = getattr(event.reception_date, "totime", None)
+    source = totime() if totime else enqueued
+    payload = b"".join(
+        [
+            _TIMES.pack(source, enqueued),
+            _encode_text(event.device.name()),
+            _encode_text(event.attr_name),
+            _encode_text(str(getattr(event.attr_value, "type", ""))),
+            _encode_value(event.attr_value.value),
+        ]
+    )
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def decode_record(payload: bytes) -> JournalRecord:
+    """
+    Decode the payload (without length prefix) of a journal record
+    :param payload: the payload
+    :return: JournalRecord
+    """
+    data = memoryview(payload)
+    source, enqueued = _TIMES.unpack_from(data, 0)
+    offset = _TIMES.size
+    texts: list[str] = []
+    for _ in range(3):
+        start = offset + _SHORT.size
+        end = start + _SHORT.unpack_from(data, offset)[0]
+        texts.append(bytes(data[start:end]).decode())
+        offset = end
+    device_name, attr_name, attr_type = texts
+    value = _decode_value(data[offset:])
+    return JournalRecord(device_name, attr_name, attr_type, value, source, enqueued)
+
+
+def read_journal(path: str) -> Iterator[JournalRecord]:
+    """
+    Read the records of a journal, a truncated last record (e.g. after a crash) is ignored
+    :param path: the path of the journal
+    :return: iterator of JournalRecord
+    """
+    with open(path, "rb") as journal:
+        if journal.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an event journal")
+        while header := journal.read(_LENGTH.size):
+            if len(header) < _LENGTH.size:
+                return
+            length = _LENGTH.unpack(header)[0]
+            payload = journal.read(length)
+            if len(payload) < length:
+                return
+            yield decode_record(payload)
+
+
+class EventJournal:
+    def __init__(self, path: str, flush_interval: float = 0.5) -> None:
+        """
+        Initialises EventJournal class
+
+        Events are appended to an in memory queue (an O(1) call that never blocks) and encoded
+        and written to the file by a background thread every flush_interval seconds. Actions
+        are application specific and not journaled. Events whose value is not None, a number,
+        a string, a DevState or a sequence of them are not journaled either but counted in
+        records_failed.
+
+        :param path: the path of the journal, appended to if it exists
+        :param flush_interval: the time in seconds between writes
+        :return: None
+        """
+        self.path = path
+        self._flush_interval = flush_interval
+        self._pending: deque[tuple[EventData, float]] = deque()
+        self._file: BinaryIO = open(path, "ab")  # pylint: disable=consider-using-with
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._written = 0
+        self._failed = 0
+        # the writer thread and flush both drain the queue, one at a time to keep the order
+        self._write_lock = Lock()
+        self._closed = Event()
+        self._thread = Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def append(self, event: GenericEvent, enqueued: float):
+        """
+        Queue an event to be written
+        :param event: the event
+        :param enqueued: the time the event was queued on the monitor
+        :return: None
+        """
+        if isinstance(event, EventData):
+            self._pending.append((event, enqueued))
+
+    def _write_pending(self):
+        with self._write_lock:
+            records: list[bytes] = []
+            while self._pending:
+                event, enqueued = self._pending.popleft()
+                try:
+                    records.append(encode_record(event, enqueued))
+                # pylint: disable-next=broad-except
+                except Exception as exception:
+                    self._failed += 1
+                    logging.warning("Unable to journal %s: %s", event.attr_name, exception)
+            if records:
+                self._file.write(b"".join(records))
+                self._file.flush()
+                self._written += len(records)
+
+    def _writer(self):
+        while not self._closed.wait(self._flush_interval):
+            self._write_pending()
+
+    def flush(self):
+        """
+        Write all pending events (from the calling thread)
+        :return: None
+        """
+        self._write_pending()
+
+    @property
+    def records_written(self) -> int:
+        return self._written
+
+    @property
+    def records_failed(self) -> int:
+        return self._failed
+
+    def close(self):
+        """
+        Write all pending events and close the journal
+        :return: None
+        """
+        self._closed.set()
+        self._thread.join()
+        self._write_pending()
+        self._file.close()
+
+
+def replay_journal(
+    path: str,
+    pusher: EventsPusher,
+    speed: Union[float, None] = 1.0,
+    stop: Union[Event, None] = None,
+) -> int:
+    """
+    Push the events of a journal onto a (fresh) monitor, e.g. to profile or regression test
+    reducers and selectors against recorded traffic.
+    :param path: the path of the journal
+    :param pusher: the monitor (or any events pusher) to push the events onto
+    :param speed: 1.0 replays at the recorded speed, N at N times the recorded speed and
+        None as fast as possible
+    :param stop: an event to set in order to stop the replay early
+    :return: the number of events pushed
+    """
+    count = 0
+    start = time.monotonic()
+    first: Union[float, None] = None
+    for record in read_journal(path):
+        if stop and stop.is_set():
+            break
+        if speed:
+            if first is None:
+                first = record.enqueued
+            delay = (record.enqueued - first) / speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        pusher.push_event(record.to_event())
+        count += 1
+    return count
@@ -0,0 +1,192 @@
+# pylint: disable=C,R
+"""Fixed memory latency histograms for the stages events go through in a monitor."""
+
+import math
+from threading import Lock
+from typing import Literal, NamedTuple, Union
+
+# source: tango (reception date or poll time) -> enqueued
+# queue: enqueued -> reduce start
+# reduce: reduce start -> reduce end
+# publish: reduce end -> published (includes waiting on the rest of the batch)
+# end_to_end: source (or enqueued when unknown) -> published
+Stage = Literal["source", "queue", "reduce", "publish", "end_to_end"]
+STAGES: tuple[Stage, ...] = ("source", "queue", "reduce", "publish", "end_to_end")
+
+
+class LatencySummary(NamedTuple):
+    """Summary of a latency histogram, all values in seconds."""
+
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class LatencyHistogram:
+    """A histogram of latencies with logarithmic buckets.
+
+    Memory use is fixed regardless of the number of recorded values. Percentiles are reported
+    as the upper bound of their bucket so they are accurate to within the bucket width (about
+    12% with the default of 20 buckets per decade).
+    """
+
+    def __init__(
+        self,
+        min_latency: float = 1e-6,
+        max_latency: float = 1e3,
+        buckets_per_decade: int = 20,
+    ) -> None:
+        """
+        Initialise the object.
+        :param min_latency: the upper bound of the first bucket in seconds
+        :param max_latency: the upper bound of the last bucket, larger values are counted in
+            an overflow bucket
+        :param buckets_per_decade: the resolution of the histogram
+        :return: None
+        """
+        self._log_min = math.log10(min_latency)
+        self._buckets_per_decade = buckets_per_decade
+        self._size = math.ceil((math.log10(max_latency) - self._log_min) * buckets_per_decade)
+        # the first bucket holds everything below min_latency, the last one the overflow
+        self._counts = [0] * (self._size + 2)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def _bucket(self, latency: float) -> int:
+        if latency <= 0:
+            return 0
+        index = math.ceil((math.log10(latency) - self._log_min) * self._buckets_per_decade)
+        return min(max(index, 0), self._size + 1)
+
+    def _upper_bound(self, bucket: int) -> float:
+        return 10 ** (self._log_min + bucket / self._buckets_per_decade)
+
+    def record(self, latency: float):
+        """
+        Record a latency
+        :param latency: the latency in seconds
+        :return: None
+        """
+        self._counts[self._bucket(latency)] += 1
+        self._count += 1
+        self._total += latency
+        if latency > self._max:
+            self._max = latency
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Get a percentile of the recorded latencies
+        :param percentile: the percentile (0-100)
+        :return: the latency in seconds (0 if nothing was recorded)
+        """
+        if not self._count:
+            return 0.0
+        rank = math.ceil(self._count * percentile / 100)
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= max(rank, 1):
+                return min(self._upper_bound(bucket), self._max)
+        return self._max
+
+    def summary(self) -> LatencySummary:
+        """
+        Summarise the histogram
+        :return: LatencySummary
+        """
+        return LatencySummary(
+            self._count,
+            self._total / self._count if self._count else 0.0,
+            self.percentile(50),
+            self.percentile(95),
+            self.percentile(99),
+            self._max,
+        )
+
+
+class LatencyReport(NamedTuple):
+    """Latency summaries per stage, overall and per event key."""
+
+    stages: dict[Stage, LatencySummary]
+    keys: dict[str, dict[Stage, LatencySummary]]
+
+    def slowest_keys(
+        self, stage: Stage = "end_to_end", count: int = 5
+    ) -> list[tuple[str, LatencySummary]]:
+        """
+        Get the event keys with the highest p95 latency for a stage
+        :param stage: the stage
+        :param count: the number of keys
+        :return: list of (event key, summary)
+        """
+        ranked = sorted(
+            ((key, stages[stage]) for key, stages in self.keys.items() if stage in stages),
+            key=lambda item: item[1].p95,
+            reverse=True,
+        )
+        return ranked[:count]
+
+
+class EventLatencyMetrics:
+    """Latency histograms per stage and per event key of the events handled by a monitor."""
+
+    def __init__(self) -> None:
+        self._stages = {stage: LatencyHistogram() for stage in STAGES}
+        self._keys: dict[str, dict[Stage, LatencyHistogram]] = {}
+        self._lock = Lock()
+
+    def _record(self, key: str, stage: Stage, latency: float):
+        self._stages[stage].record(latency)
+        if (histograms := self._keys.get(key)) is None:
+            # coarser histograms per key to keep memory in check with many keys
+            histograms = self._keys[key] = {
+                stage: LatencyHistogram(buckets_per_decade=10) for stage in STAGES
+            }
+        histograms[stage].record(latency)
+
+    def record(
+        self,
+        key: str,
+        source: Union[float, None],
+        enqueued: float,
+        reduce_start: float,
+        reduce_end: float,
+        published: float,
+    ):
+        """
+        Record the time stamps (as seconds since the epoch) of a handled event
+        :param key: the event key
+        :param source: the time the event occurred at the source (None if unknown)
+        :param enqueued: the time the event was queued
+        :param reduce_start: the time the event's reducers started
+        :param reduce_end: the time the event's reducers finished
+        :param published: the time the publishers finished after reducing the event
+        :return: None
+        """
+        with self._lock:
+            if source is not None:
+                self._record(key, "source", enqueued - source)
+            self._record(key, "queue", reduce_start - enqueued)
+            self._record(key, "reduce", reduce_end - reduce_start)
+            self._record(key, "publish", published - reduce_end)
+            self._record(key, "end_to_end", published - (enqueued if source is None else source))
+
+    def report(self) -> LatencyReport:
+        """
+        Summarise the recorded latencies
+        :return: LatencyReport
+        """
+        with self._lock:
+            keys: dict[str, dict[Stage, LatencySummary]] = {}
+            for key, histograms in self._keys.items():
+                summaries = {stage: histogram.summary() for stage, histogram in histograms.items()}
+                keys[key] = {
+                    stage: summary for stage, summary in summaries.items() if summary.count
+                }
+            return LatencyReport(
+                {stage: histogram.summary() for stage, histogram in self._stages.items()}, keys
+            )
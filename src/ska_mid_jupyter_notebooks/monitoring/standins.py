@@ -0,0 +1,179 @@
+# pylint: disable=C,R
+"""Stand ins for tango device proxies, used by the monitoring benchmark and the unit tests."""
+
+import itertools
+import time
+from typing import Any, Callable, NamedTuple, Union
+
+from tango.time_val import TimeVal
+
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
+    DeviceAttribute,
+    EventData,
+    RemoteDeviceFactory,
+)
+
+
+class SyntheticDevice:
+    """Stands in for a DeviceProxy as far as events are concerned."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+
+class StandInDevice(SyntheticDevice):
+    """Stands in for a DeviceProxy pushing change events to subscribers and serving reads."""
+
+    def __init__(self, name: str, read_delay: float = 0.0) -> None:
+        super().__init__(name)
+        self.values: dict[str, Any] = {}
+        self.on_read: Union[Callable[[str, str], Any], None] = None
+        self.read_attributes_calls: list[list[str]] = []
+        self._read_delay = read_delay
+        self._subscribers: dict[int, tuple[str, Any]] = {}
+        self._ids = itertools.count(1)
+
+    def _event(self, attr: str) -> EventData:
+        value = DeviceAttribute(self.values.get(attr, "ON"), TimeVal.now(), "DevString", attr)
+        return EventData(attr, value, self, False, [], "change", TimeVal.now())
+
+    def emit(self, attr: str, value: Any):
+        """
+        Change the value of an attribute and push a change event to its subscribers
+        :param attr: the attribute
+        :param value: the new value
+        :return: None
+        """
+        self.values[attr] = value
+        event = self._event(attr)
+        for sub_attr, callback in list(self._subscribers.values()):
+            if sub_attr == attr:
+                callback.push_event(event)
+
+    def subscribe_event(self, attr: str, _: Any, callback: Any) -> int:
+        sub_id = next(self._ids)
+        self._subscribers[sub_id] = (attr, callback)
+        # like tango, push the current value on subscription
+        callback.push_event(self._event(attr))
+        return sub_id
+
+    def unsubscribe_event(self, sub_id: int):
+        self._subscribers.pop(sub_id, None)
+
+    def poll_attribute(self, *_: Any):
+        pass
+
+    def _read(self, attrs: list[str]) -> list[DeviceAttribute]:
+        if self.on_read:
+            for attr in attrs:
+                self.values[attr] = self.on_read(self.name(), attr)
+        return [
+            DeviceAttribute(self.values.get(attr, "ON"), TimeVal.now(), "DevString", attr)
+            for attr in attrs
+        ]
+
+    def read_attribute(self, attr: str) -> DeviceAttribute:
+        # the read made on subscription is not delayed so that the poll cycles of the
+        # devices start together
+        return self._read([attr])[0]
+
+    def read_attributes(self, attrs: list[str]) -> list[DeviceAttribute]:
+        # only the reads of the poll cycles are recorded
+        self.read_attributes_calls.append(attrs)
+        if self._read_delay:
+            time.sleep(self._read_delay)
+        return self._read(attrs)
+
+
+class StandInDeviceFactory(RemoteDeviceFactory):
+    """A device factory creating stand in devices instead of tango device proxies."""
+
+    def __init__(
+        self, read_delay: float = 0.0, delays: Union[dict[str, float], None] = None
+    ) -> None:
+        """
+        Initialises StandInDeviceFactory class
+        :param read_delay: the time in seconds a read of a device takes
+        :param delays: create these devices up front with their own read delays
+        :return: None
+        """
+        super().__init__("stand-in")
+        self._read_delay = read_delay
+        self.devices: dict[str, StandInDevice] = {
+            name: StandInDevice(name, delay) for name, delay in (delays or {}).items()
+        }
+
+    def get_device(self, device_name: str) -> StandInDevice:  # type: ignore[override]
+        if (device := self.devices.get(device_name)) is None:
+            device = self.devices[device_name] = StandInDevice(device_name, self._read_delay)
+        return device
+
+    def get_polling_device(  # type: ignore[override]
+        self, device_name: str, timeout: float
+    ) -> StandInDevice:
+        return self.get_device(device_name)
+
+
+class _DeviceInfo(NamedTuple):
+    dev_class: str
+
+
+class StandInTangoProxy(StandInDevice):
+    """Stands in for a DeviceProxy resolving attributes and commands by name.
+
+    Like PyTango's, dir() of the proxy lists the attributes and commands of the device, so
+    every dir() introspects the device.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        attributes: list[str],
+        commands: list[str],
+        read_delay: float = 0.0,
+        tango_host: str = "databaseds:10000",
+        dev_class: str = "StandIn",
+    ) -> None:
+        super().__init__(name, read_delay)
+        self.attribute_names = list(attributes)
+        self.command_names = list(commands)
+        self.introspections = 0
+        self._db_host, self._db_port = tango_host.split(":")
+        self._dev_class = dev_class
+
+    def dev_name(self) -> str:
+        return self.name()
+
+    def get_db_host(self) -> str:
+        return self._db_host
+
+    def get_db_port(self) -> str:
+        return self._db_port
+
+    def info(self) -> _DeviceInfo:
+        return _DeviceInfo(self._dev_class)
+
+    def _introspect(self, names: list[str]) -> list[str]:
+        self.introspections += 1
+        if self._read_delay:
+            time.sleep(self._read_delay)
+        return list(names)
+
+    def get_attribute_list(self) -> list[str]:
+        return self._introspect(self.attribute_names)
+
+    def get_command_list(self) -> list[str]:
+        return self._introspect(self.command_names)
+
+    def __dir__(self) -> list[str]:
+        return [*super().__dir__(), *self.get_attribute_list(), *self.get_command_list()]
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self.__dict__.get("attribute_names", ()):
+            return self.values.get(name, "ON")
+        if name in self.__dict__.get("command_names", ()):
+            return lambda *args: name
+        raise AttributeError(name)
@@ -2,33 +2,142 @@
 """Helper classes and functions dealing with aggregation of state from tango dev."""
 
 import abc
-import functools
+import copy
+import heapq
+import itertools
+import json
 import logging
+import math
 import os
 import time
-from collections import defaultdict, deque
-from concurrent.futures import CancelledError
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Mapping
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
 from datetime import datetime
-from queue import Queue
-from threading import Event, Lock, Thread
-from typing import Any, Callable, Generic, Literal, NamedTuple, TypedDict, TypeVar, Union, cast
-
-from tango import AttributeProxy, DevFailed, DeviceProxy, EventType
+from functools import partial
+from queue import Empty, Queue
+from threading import Condition, Event, Lock, Thread
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    Literal,
+    NamedTuple,
+    TypedDict,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from tango import AttributeProxy, DevFailed, DeviceProxy, DevState, EventType
 from tango.time_val import TimeVal
 
 from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment
+from ska_mid_jupyter_notebooks.monitoring.history import HistoryStore
+from ska_mid_jupyter_notebooks.monitoring.metrics import EventLatencyMetrics, LatencyReport
+
+if TYPE_CHECKING:
+    from ska_mid_jupyter_notebooks.monitoring.journal import EventJournal
 
 # pylint: disable=W0107,W0237
 
 
+# DevFailed reasons indicating the connection behind a proxy is broken (rather than e.g. a
+# read of a particular attribute failing) so that the proxy should not be reused
+CONNECTION_ERROR_REASONS = {
+    "API_CantConnectToDatabase",
+    "API_CantConnectToDevice",
+    "API_CommunicationFailed",
+    "API_CorbaException",
+    "API_DeviceNotExported",
+    "API_DeviceTimedOut",
+    "API_ServerNotRunning",
+}
+
+
+def is_connection_error(exception: DevFailed) -> bool:
+    """
+    Check whether a DevFailed exception was caused by a broken connection
+    :param exception: the exception
+    :return: True if any of the errors in the stack is a connection error
+    """
+    return any(
+        getattr(error, "reason", None) in CONNECTION_ERROR_REASONS
+        for error in cast(Exception, exception).args
+    )
+
+
+class ProxyCacheStats(NamedTuple):
+    """Statistics of the RemoteDeviceFactory proxy cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+
+
 class RemoteDeviceFactory:
-    def __init__(self, db_host: str) -> None:
+    def __init__(self, db_host: str, max_size: int = 512, max_idle: float = 600.0) -> None:
         """
         Initialises RemoteDeviceFactory class
+
+        Proxies are cached by FQDN so that subsequent calls do not pay for tango database
+        lookups and connection setup. The cache is thread safe, holds at most max_size proxies
+        (evicting the least recently used) and drops proxies that have not been used for
+        max_idle seconds.
+
         :param db_host: database host
+        :param max_size: the maximum number of cached proxies
+        :param max_idle: the time in seconds after which an unused proxy is evicted
         :return:  None
         """
         self._db_host = db_host
+        self._max_size = max_size
+        self._max_idle = max_idle
+        self._proxies: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _fqdn(self, name: str) -> str:
+        return f"tango://{self._db_host}/{name}"
+
+    def _evict_idle(self, now: float):
+        # entries are in least recently used order so we can stop at the first fresh one
+        while self._proxies:
+            fqdn, (_, last_used) = next(iter(self._proxies.items()))
+            if now - last_used < self._max_idle:
+                return
+            self._proxies.pop(fqdn)
+            self._evictions += 1
+
+    def _get_cached(
+        self, key: str, create: Callable[[str], Any], fqdn: Union[str, None] = None
+    ) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            if entry := self._proxies.get(key):
+                self._hits += 1
+                self._proxies[key] = (entry[0], now)
+                self._proxies.move_to_end(key)
+                return entry[0]
+            self._misses += 1
+        # creating a proxy involves network round trips so it is done outside of the lock
+        proxy = create(fqdn or key)
+        with self._lock:
+            if entry := self._proxies.get(key):
+                # another thread beat us to it
+                return entry[0]
+            self._proxies[key] = (proxy, now)
+            while len(self._proxies) > self._max_size:
+                self._proxies.popitem(last=False)
+                self._evictions += 1
+        return proxy
 
     def get_device(self, device_name: str) -> DeviceProxy:
         """
@@ -36,7 +145,7 @@ class RemoteDeviceFactory:
         :param: device_name: name of the device
         :return: Device Proxy
         """
-        return DeviceProxy(f"tango://{self._db_host}/{device_name}")
+        return self._get_cached(self._fqdn(device_name), DeviceProxy)
 
     def get_attr_proxy(self, att_name: str) -> AttributeProxy:
         """
@@ -44,7 +153,73 @@ class RemoteDeviceFactory:
         :param: att_name: name of the attribute
         :return: Attribute Proxy
         """
-        return AttributeProxy(f"tango://{self._db_host}/{att_name}")
+        return self._get_cached(self._fqdn(att_name), AttributeProxy)
+
+    def get_polling_device(self, device_name: str, timeout: float) -> DeviceProxy:
+        """
+        Get a device proxy dedicated to polling with the given timeout, the timeout is not
+        applied to the proxies shared with subscriptions and user code
+        :param device_name: name of the device
+        :param timeout: the maximum time in seconds a call on the proxy is allowed to take
+        :return: Device Proxy
+        """
+        timeout_millis = int(timeout * 1000)
+
+        def create(fqdn: str) -> DeviceProxy:
+            proxy = DeviceProxy(fqdn)
+            proxy.set_timeout_millis(timeout_millis)
+            return proxy
+
+        fqdn = self._fqdn(device_name)
+        return self._get_cached(f"{fqdn}#timeout={timeout_millis}", create, fqdn)
+
+    def invalidate(self, name: str):
+        """
+        Remove the cached proxies of a device or attribute so that they are recreated on next
+        use
+        :param name: the name of the device or attribute
+        :return: None
+        """
+        fqdn = self._fqdn(name)
+        with self._lock:
+            keys = [key for key in self._proxies if key == fqdn or key.startswith(f"{fqdn}#")]
+            for key in keys:
+                self._proxies.pop(key)
+            if keys:
+                self._invalidations += 1
+
+    def invalidate_on_connection_error(self, name: str, exception: DevFailed):
+        """
+        Invalidate the cached proxy of a device or attribute if the exception indicates a
+        broken connection
+        :param name: the name of the device or attribute
+        :param exception: the exception raised while using the proxy
+        :return: None
+        """
+        if is_connection_error(exception):
+            self.invalidate(name)
+
+    def clear(self):
+        """
+        Remove all cached proxies
+        :return: None
+        """
+        with self._lock:
+            self._proxies.clear()
+
+    def get_cache_stats(self) -> ProxyCacheStats:
+        """
+        Get the hit/miss statistics of the proxy cache
+        :return: ProxyCacheStats
+        """
+        with self._lock:
+            return ProxyCacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._invalidations,
+                len(self._proxies),
+            )
 
 
 class DeviceAttribute(NamedTuple):
@@ -129,17 +304,249 @@ class BaseAction(Generic[ACTION]):
 GenericEvent = Union[EventData, BaseAction[Any]]
 
 
+class StampedEvent:
+    """A queued event along with the times (seconds since the epoch) it went through the monitor."""
+
+    __slots__ = ("event", "enqueued", "reduce_start", "reduce_end")
+
+    def __init__(self, event: GenericEvent, enqueued: float) -> None:
+        self.event = event
+        self.enqueued = enqueued
+        self.reduce_start = enqueued
+        self.reduce_end = enqueued
+
+    @property
+    def key(self) -> str:
+        return self.event.key
+
+    @property
+    def source(self) -> Union[float, None]:
+        """
+        The time the event occurred at the source (tango reception date or poll time)
+        :return: the time or None for actions and events without a reception date
+        """
+        if isinstance(self.event, EventData):
+            if totime := getattr(self.event.reception_date, "totime", None):
+                return totime()
+        return None
+
+
+class CoalescingQueue(Queue):  # type: ignore
+    """A FIFO queue that only keeps the newest pending event for every event key.
+
+    A tango event for a key that is already pending replaces the pending event in place (i.e.
+    it keeps its position in the queue), so that the queue size is bounded by the number of
+    subscribed attributes instead of the event rate. Actions and cancellations are never
+    coalesced.
+    """
+
+    def _init(self, maxsize: int):
+        self.queue: OrderedDict[Union[str, int], Union[StampedEvent, None]] = OrderedDict()
+        self._sequence = itertools.count()
+        self.coalesced_count = 0
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _put(self, item: Union[StampedEvent, None]):
+        if item is not None and isinstance(item.event, EventData):
+            key: Union[str, int] = item.key
+            if key in self.queue:
+                self.queue[key] = item
+                self.coalesced_count += 1
+                # put() counts every item as a new task, but this one replaced a pending task
+                self.unfinished_tasks -= 1
+                return
+        else:
+            key = next(self._sequence)
+        self.queue[key] = item
+
+    def _get(self) -> Union[StampedEvent, None]:
+        return self.queue.popitem(last=False)[1]
+
+
+# what to do with a tango event pushed onto a full queue
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest", "coalesce"]
+
+
+class BoundedEventQueue(Queue):  # type: ignore
+    """A FIFO queue holding at most maxsize tango events, handling overflows with a policy.
+
+    - block: wait (at most block_timeout seconds) for room, then drop the new event
+    - drop_oldest: drop the oldest pending tango event to make room
+    - drop_newest: drop the new event
+    - coalesce: replace the pending event of the same key, or else drop the oldest one
+
+    Actions and cancellations are never dropped and always queued (even when full) so that
+    neither the application nor the tango callback threads block indefinitely on the queue.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        overflow: OverflowPolicy = "block",
+        block_timeout: float = 1.0,
+        coalesce: bool = False,
+    ) -> None:
+        """
+        Initialise the object.
+        :param maxsize: the maximum number of pending tango events
+        :param overflow: the overflow policy
+        :param block_timeout: (block) the maximum time in seconds a producer waits for room
+        :param coalesce: always replace the pending event of the same key (not only when full)
+        :return: None
+        """
+        super().__init__(maxsize)
+        self._overflow = overflow
+        self._block_timeout = block_timeout
+        self._coalesce = coalesce
+        self.overflow_count = 0
+        self.coalesced_count = 0
+
+    def _init(self, maxsize: int):
+        self.queue: OrderedDict[int, Union[StampedEvent, None]] = OrderedDict()
+        # event key -> sequence number of its pending event
+        self._pending: dict[str, int] = {}
+        self._events = 0
+        self._sequence = itertools.count()
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _put(self, item: Union[StampedEvent, None]):
+        sequence = next(self._sequence)
+        if item is not None and isinstance(item.event, EventData):
+            self._pending[item.key] = sequence
+            self._events += 1
+        self.queue[sequence] = item
+
+    def _get(self) -> Union[StampedEvent, None]:
+        sequence, item = self.queue.popitem(last=False)
+        if item is not None and isinstance(item.event, EventData):
+            self._forget(sequence, item)
+        return item
+
+    def _forget(self, sequence: int, item: StampedEvent):
+        self._events -= 1
+        if self._pending.get(item.key) == sequence:
+            self._pending.pop(item.key)
+
+    def _replace(self, item: StampedEvent) -> bool:
+        if (sequence := self._pending.get(item.key)) is None:
+            return False
+        self.queue[sequence] = item
+        self.coalesced_count += 1
+        return True
+
+    def _drop_oldest(self) -> bool:
+        for sequence, pending in self.queue.items():
+            if pending is not None and isinstance(pending.event, EventData):
+                del self.queue[sequence]
+                self._forget(sequence, pending)
+                self.unfinished_tasks -= 1
+                return True
+        return False
+
+    def _add(self, item: Union[StampedEvent, None]):
+        self._put(item)
+        self.unfinished_tasks += 1
+        self.not_empty.notify()
+
+    def put(
+        self,
+        item: Union[StampedEvent, None],
+        block: bool = True,
+        timeout: Union[float, None] = None,
+    ) -> bool:
+        """
+        Queue an item according to the overflow policy (block and timeout are ignored).
+        :param item: the item
+        :return: whether the item was queued (or replaced a pending one), False if dropped
+        """
+        with self.not_full:
+            if item is None or not isinstance(item.event, EventData):
+                self._add(item)
+                return True
+            if self._coalesce and self._replace(item):
+                return True
+            if self._events >= self.maxsize:
+                if self._overflow == "block":
+                    deadline = time.monotonic() + self._block_timeout
+                    while self._events >= self.maxsize:
+                        if (remaining := deadline - time.monotonic()) <= 0:
+                            self.overflow_count += 1
+                            return False
+                        self.not_full.wait(remaining)
+                elif self._overflow == "drop_newest":
+                    self.overflow_count += 1
+                    return False
+                elif self._overflow == "coalesce" and self._replace(item):
+                    return True
+                elif self._drop_oldest():
+                    self.overflow_count += 1
+            self._add(item)
+            return True
+
+    def put_nowait(self, item: Union[StampedEvent, None]) -> bool:
+        return self.put(item)
+
+
+def to_event_data(event: GenericEvent) -> Union[GenericEvent, None]:
+    """
+    Convert a tango pub/sub event to EventData, actions are returned as is.
+    :param event: the tango event or action event
+    :return: the event or None if the tango event carries no value (e.g. an error event)
+    """
+    if hasattr(event, "event"):
+        # then we know it is an tango event and convert to EventData
+        event = cast(EventData, event)
+        if event.attr_value:
+            return EventData(
+                event.attr_value.name.lower(),
+                event.attr_value,
+                event.device,
+                event.err,
+                event.errors,
+                event.event,
+                event.reception_date,
+            )
+        # TODO handle way to recognize error events  # pylint: disable=W0511
+        return None
+    return event
+
+
 class EventsPusher:
     """And controller object used to push new events onto the system."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        coalesce: bool = False,
+        max_queue_size: int = 0,
+        overflow: OverflowPolicy = "block",
+        block_timeout: float = 1.0,
+    ) -> None:
         """
         Initialise the object.
+        :param coalesce: only keep the newest pending event per event key (device:attr)
+        :param max_queue_size: the maximum number of pending tango events, 0 for unbounded
+        :param overflow: what to do with a tango event pushed onto a full queue, see
+            BoundedEventQueue
+        :param block_timeout: (block) the maximum time in seconds a producer waits for room
         :return: None
         """
-        self._events: Queue[Union[GenericEvent, None]] = Queue()
+        self._events: Queue[Union[StampedEvent, None]]
+        if max_queue_size > 0:
+            self._events = BoundedEventQueue(max_queue_size, overflow, block_timeout, coalesce)
+        elif coalesce:
+            self._events = CoalescingQueue()
+        else:
+            self._events = Queue()
+        self._high_water_mark = 0
         init_list: list[float] = []
         self._polling_keep_alive_timestamps = deque(init_list, maxlen=100)
+        self._dropped_count = 0
+        self._handled_count = 0
+        self._journal: Union["EventJournal", None] = None
 
     def push_event(self, event: GenericEvent):
         """
@@ -151,24 +558,25 @@ class EventsPusher:
         :param event: The event that needs to be pushed.
         :return: None
         """
-        if hasattr(event, "event"):
-            # then we know it is an tango event and convert to EventData
-            event = cast(EventData, event)
-            if event.attr_value:
-                event_data = EventData(
-                    event.attr_value.name.lower(),
-                    event.attr_value,
-                    event.device,
-                    event.err,
-                    event.errors,
-                    event.event,
-                    event.reception_date,
-                )
-            else:  # TODO handle way to recognize error events  # pylint: disable=W0511
-                return
-        else:
-            event_data = event
-        self._events.put_nowait(event_data)
+        if (event_data := to_event_data(event)) is None:
+            self._dropped_count += 1
+            return
+        stamped = StampedEvent(event_data, time.time())
+        # only a bounded queue drops events (returning False), the others return None
+        queued = self._events.put_nowait(stamped) is not False
+        if self._journal and queued:
+            self._journal.append(event_data, stamped.enqueued)
+        if (depth := self._events.qsize()) > self._high_water_mark:
+            self._high_water_mark = depth
+
+    def attach_journal(self, journal: Union["EventJournal", None]):
+        """
+        Record the pushed tango events in a journal (None to stop recording), events dropped
+        because the queue is full are not recorded
+        :param journal: the journal
+        :return: None
+        """
+        self._journal = journal
 
     def cancel_get(self):
         """
@@ -183,17 +591,69 @@ class EventsPusher:
         :param timeout: timeout in seconds
         :return: GenericEvent
         """
+        return self._get_stamped(timeout).event
 
-        if event := self._events.get(timeout=timeout):
-            return event
+    def _get_stamped(self, timeout: Union[float, None] = None) -> StampedEvent:
+        """
+        Get an event along with its time stamps
+        :param timeout: timeout in seconds
+        :return: StampedEvent
+        """
+        if stamped := self._events.get(timeout=timeout):
+            return stamped
         raise CancelledError
 
-    def _task_done(self):
+    def _get_batch(self, max_latency: float, max_size: int) -> list[GenericEvent]:
+        """
+        Get a batch of events, see _get_stamped_batch.
+        :param max_latency: maximum time in seconds to wait for more events after the first one
+        :param max_size: maximum number of events in a batch
+        :return: list of GenericEvent (never empty)
+        """
+        return [stamped.event for stamped in self._get_stamped_batch(max_latency, max_size)]
+
+    def _get_stamped_batch(self, max_latency: float, max_size: int) -> list[StampedEvent]:
+        """
+        Get a batch of events.
+
+        Blocks until at least one event is available and then drains the queue until it is
+        empty, holding on for at most max_latency seconds (measured from the first event)
+        for more events to arrive. Events already queued are always drained (up to max_size).
+
+        :param max_latency: maximum time in seconds to wait for more events after the first one
+        :param max_size: maximum number of events in a batch
+        :return: list of StampedEvent (never empty)
         """
-        Marking event as done
+        batch = [self._get_stamped()]
+        deadline = time.monotonic() + max_latency
+        while len(batch) < max_size:
+            try:
+                event = self._events.get_nowait()
+            except Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._events.get(timeout=remaining)
+                except Empty:
+                    break
+            if event is None:
+                # handle the current batch first and leave the cancellation for the next get
+                self._events.task_done()
+                self.cancel_get()
+                break
+            batch.append(event)
+        return batch
+
+    def _task_done(self, count: int = 1):
+        """
+        Marking event(s) as done
+        :param count: the number of events handled
         :return: None
         """
-        self._events.task_done()
+        for _ in range(count):
+            self._events.task_done()
+        self._handled_count += count
         self._polling_keep_alive_timestamps.append(datetime.now().timestamp())
 
     def get_last_poll_latency(self):
@@ -203,6 +663,52 @@ class EventsPusher:
         """
         return datetime.now().timestamp() - self._polling_keep_alive_timestamps[-1]
 
+    def get_coalesced_count(self) -> int:
+        """
+        Get the number of pending events that were replaced by a newer event for the same key
+        :return: coalesced count (always 0 when not coalescing)
+        """
+        if isinstance(self._events, (CoalescingQueue, BoundedEventQueue)):
+            return self._events.coalesced_count
+        return 0
+
+    def get_overflow_count(self) -> int:
+        """
+        Get the number of tango events dropped because the (bounded) queue was full
+        :return: overflow count (always 0 when unbounded)
+        """
+        if isinstance(self._events, BoundedEventQueue):
+            return self._events.overflow_count
+        return 0
+
+    def get_high_water_mark(self) -> int:
+        """
+        Get the largest number of events that were waiting to be handled at the same time
+        :return: high water mark
+        """
+        return self._high_water_mark
+
+    def get_dropped_count(self) -> int:
+        """
+        Get the number of events dropped without being queued (e.g. error events)
+        :return: dropped count
+        """
+        return self._dropped_count
+
+    def get_handled_count(self) -> int:
+        """
+        Get the number of events handled so far
+        :return: handled count
+        """
+        return self._handled_count
+
+    def get_queue_depth(self) -> int:
+        """
+        Get the number of events waiting to be handled
+        :return: queue depth
+        """
+        return self._events.qsize()
+
     def get_average_poll_latency(self):
         """
         Get the average poll latency
@@ -213,9 +719,8 @@ class EventsPusher:
             for index, current in enumerate(self._polling_keep_alive_timestamps)
             if index > 0
         ]
-        return functools.reduce(lambda x, y: x + y, latencies) / len(
-            self._polling_keep_alive_timestamps
-        )
+        # the average of the gaps between handled events (not of the number of time stamps)
+        return sum(latencies) / len(latencies) if latencies else 0.0
 
     def block_until_empty(self):
         """
@@ -374,15 +879,25 @@ class PolledAttribute:
     def __hash__(self) -> int:
         return hash(f"{self.device_name}/{self.attr}")
 
-    def get_state(self):
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PolledAttribute):
+            return NotImplemented
+        return (self.device_name, self.attr) == (other.device_name, other.attr)
+
+    def get_state(self, timeout: Union[float, None] = None):
         """
         Get the state of the attribute
+        :param timeout: the maximum time in seconds the read is allowed to take
         :return: None
         """
         try:
+            if timeout is not None:
+                device = self._dev_factory.get_polling_device(self.device_name, timeout)
+                return cast(DeviceAttribute, device.read_attribute(self.attr))
             dev = self._dev_factory.get_attr_proxy(self.name)
             return cast(DeviceAttribute, dev.read())  # type: ignore
         except DevFailed as exception:
+            self._dev_factory.invalidate_on_connection_error(self.name, exception)
             raise UnableToPollDevice(
                 self.device_name, self.attr, cast(Exception, exception).args
             ) from exception
@@ -395,6 +910,27 @@ class PolledAttribute:
         """
         return f"{self.device_name}/{self.attr}"
 
+    @property
+    def dev_factory(self) -> RemoteDeviceFactory:
+        """
+        Get the device factory used to create proxies for the attribute
+        :return: device factory
+        """
+        return self._dev_factory
+
+    def get_polling_device(self, timeout: float) -> DeviceProxy:
+        """
+        Get the device proxy dedicated to polling (see RemoteDeviceFactory.get_polling_device)
+        :param timeout: the maximum time in seconds a read is allowed to take
+        :return: device
+        """
+        try:
+            return self._dev_factory.get_polling_device(self.device_name, timeout)
+        except DevFailed as exception:
+            raise UnableToFindDevice(
+                self.device_name, cast(Exception, exception).args
+            ) from exception
+
     @property
     def device(self) -> DeviceProxy:  # type: ignore
         """
@@ -440,7 +976,7 @@ def _generate_event(name: str, new_value: DeviceAttribute, device: Any):  # type
         err=False,
         errors=[],
         event="",
-        reception_date=TimeVal(),
+        reception_date=TimeVal.now(),
     )
 
 
@@ -469,12 +1005,20 @@ class PollingState:
         """
         self._events_to_be_pushed.append(events_pushing)
 
-    def update_state(self, new_value: DeviceAttribute, device: DeviceProxy):  # type: ignore
+    @property
+    def is_empty(self) -> bool:
+        """
+        Whether there are no more subscribers for the polled attribute
+        :return: True if there are no subscribers
+        """
+        return not self._events_to_be_pushed
+
+    def update_state(self, new_value: DeviceAttribute, device: DeviceProxy) -> bool:  # type: ignore
         """
         Update state
         :param new_value:  Device Attributes
         :param device: Devices
-        :return: None
+        :return: whether the value changed
         """
         value = new_value.value
         if self._current_value != value:
@@ -482,6 +1026,76 @@ class PollingState:
             event = _generate_event(new_value.name, new_value, device)
             for event_to_be_pushed in self._events_to_be_pushed:
                 event_to_be_pushed.events_pusher.push_event(event)  # type: ignore
+            return True
+        return False
+
+
+class PollCycleReport(NamedTuple):
+    """Timing report of a single poll cycle (the reads of all attributes due at one deadline)."""
+
+    wall_time: float
+    read_times: dict[str, float]
+    timed_out: list[str]
+    failed: list[str]
+    schedule_lag: float = 0.0
+
+    def slowest(self, count: int = 5) -> list[tuple[str, float]]:
+        """
+        Get the slowest attribute reads of the cycle
+        :param count: the number of attributes to return
+        :return: list of (attribute name, read time in seconds), slowest first
+        """
+        return sorted(self.read_times.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+class DeviceReadResult(NamedTuple):
+    read_times: dict[str, float]
+    timed_out: list[str]
+    failed: list[str]
+
+
+class _PollCycle:
+    """Collects the results of the device reads dispatched for one deadline."""
+
+    def __init__(
+        self,
+        pending: int,
+        schedule_lag: float,
+        on_complete: Callable[[PollCycleReport], None],
+    ) -> None:
+        self._start = time.perf_counter()
+        self._pending = pending
+        self._schedule_lag = schedule_lag
+        self._on_complete = on_complete
+        self._lock = Lock()
+        self._read_times: dict[str, float] = {}
+        self._timed_out: list[str] = []
+        self._failed: list[str] = []
+
+    def device_done(self, names: list[str], future: "Future[DeviceReadResult]"):
+        try:
+            result = future.result()
+        # pylint: disable-next=broad-except
+        except BaseException as exception:
+            # the read of the device must always count or the cycle would never complete
+            logging.exception("Unable to poll %s: %s", names, exception)
+            result = DeviceReadResult({}, [], names)
+        with self._lock:
+            self._read_times.update(result.read_times)
+            self._timed_out.extend(result.timed_out)
+            self._failed.extend(result.failed)
+            self._pending -= 1
+            if self._pending:
+                return
+        self._on_complete(
+            PollCycleReport(
+                time.perf_counter() - self._start,
+                self._read_times,
+                self._timed_out,
+                self._failed,
+                self._schedule_lag,
+            )
+        )
 
 
 class DeviceAttrPoller:
@@ -489,25 +1103,94 @@ class DeviceAttrPoller:
         self,
         dev_factory: RemoteDeviceFactory,
         poll_rate: float = 2,
+        max_workers: int = 16,
+        read_timeout: float = 3.0,
+        adaptive: bool = False,
+        backoff_factor: float = 2.0,
+        max_period: float = 60.0,
     ) -> None:
         """
         Initialises DeviceAttrPoller class
-        :param poll_rate: poll rate
+
+        Each polled attribute has its own period (the shortest period requested by its
+        subscribers, poll_rate by default). A heap of next-due times is kept and the polling
+        thread sleeps exactly until the next deadline. Deadlines are aligned to multiples of
+        the period so that attributes with the same period become due together.
+
+        Due attributes are grouped per device and read with a single read_attributes call on
+        the device proxy cached by the device factory. Devices are read concurrently over a
+        bounded thread pool so that the duration of a poll cycle is determined by the slowest
+        device rather than the sum of all devices.
+
+        In adaptive mode the interval of an attribute grows geometrically (by backoff_factor, up
+        to max_period) for as long as its value does not change and falls back to its period as
+        soon as a change is seen or reset_backoff is called.
+
+        :param poll_rate: the default poll period in seconds
         :param dev_factory: device factory
+        :param max_workers: the maximum number of concurrent device reads
+        :param read_timeout: the maximum time in seconds a single device read may take
+        :param adaptive: back off polling of attributes that do not change
+        :param backoff_factor: (adaptive mode) the factor the interval grows with per unchanged read
+        :param max_period: (adaptive mode) the ceiling of the polling interval in seconds
         :return: None
         """
 
         self._poll_rate = poll_rate
+        self._read_timeout = read_timeout
+        self._adaptive = adaptive
+        self._backoff_factor = backoff_factor
+        self._max_period = max_period
         self._active = Event()
+        self._stopped = Event()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="DeviceAttrPoller")
         self._thread = Thread(target=self._polling_thread, daemon=True)
         self._index = 0
         self._dev_factory = dev_factory
         self.subscriptions: dict[SUB_ID, tuple[PolledAttribute, AttrEventsPusher]] = {}
+        self._subscription_periods: dict[SUB_ID, float] = {}
         self._device_attribute_pollings: dict[PolledAttribute, PollingState] = defaultdict(
             PollingState
         )
+        self._periods: dict[PolledAttribute, float] = {}
+        self._intervals: dict[PolledAttribute, float] = {}
+        self._due: dict[PolledAttribute, float] = {}
+        self._schedule: list[tuple[float, int, PolledAttribute]] = []
+        self._sequence = itertools.count()
+        self._in_flight: set[str] = set()
+        self._last_cycle: Union[PollCycleReport, None] = None
+        init_list: list[float] = []
+        self._schedule_lags = deque(init_list, maxlen=100)
         self._lock = Lock()
-        self._thread.start()
+        self._schedule_changed = Condition(self._lock)
+
+    @staticmethod
+    def _next_deadline(now: float, period: float) -> float:
+        return (math.floor(now / period) + 1) * period
+
+    def _reschedule(self, device_attribute: PolledAttribute, due: float):
+        # needs to be called with the lock held
+        self._due[device_attribute] = due
+        heapq.heappush(self._schedule, (due, next(self._sequence), device_attribute))
+        self._schedule_changed.notify()
+
+    def _update_period(self, device_attribute: PolledAttribute):
+        # needs to be called with the lock held
+        periods = [
+            self._subscription_periods[sub_id]
+            for sub_id, (attr, _) in self.subscriptions.items()
+            if attr == device_attribute
+        ]
+        if not periods:
+            self._periods.pop(device_attribute, None)
+            self._intervals.pop(device_attribute, None)
+            self._due.pop(device_attribute, None)
+            return
+        period = min(periods)
+        if self._periods.get(device_attribute) != period:
+            self._periods[device_attribute] = period
+            self._intervals[device_attribute] = period
+            self._reschedule(device_attribute, self._next_deadline(time.monotonic(), period))
 
     def add_subscription(
         self,
@@ -515,6 +1198,7 @@ class DeviceAttrPoller:
         attr: str,
         events_pusher: EventsPusher,
         dev_factory: RemoteDeviceFactory | None = None,
+        period: Union[float, None] = None,
     ) -> SUB_ID:
         """
         Add subscription
@@ -522,13 +1206,14 @@ class DeviceAttrPoller:
         :param attr: attribute
         :param events_pusher: events pusher
         :param dev_factory: device factory
+        :param period: the poll period in seconds for this subscription, defaults to poll_rate
         :return: sub_id
         """
         if dev_factory is None:
             dev_factory = self._dev_factory
         # first we get an updated state
         device_attribute = PolledAttribute(device_name, attr, dev_factory)
-        state = device_attribute.get_state()
+        state = device_attribute.get_state(self._read_timeout)
         # then we immediately push it as an event
         event = _generate_event(state.name, state, device_attribute.device)
         events_pusher.push_event(event)  # type: ignore
@@ -542,11 +1227,17 @@ class DeviceAttrPoller:
                 device_attribute,
                 atr_events_pusher,
             )
+            self._subscription_periods[self._index] = period or self._poll_rate
             self._device_attribute_pollings[device_attribute].append(atr_events_pusher)
+            self._update_period(device_attribute)
+            sub_id = self._index
         # we only start the thread once we have an active subscription
+        with self._lock:
+            if not self._thread.is_alive() and not self._stopped.is_set():
+                self._thread.start()
         if not self._active.is_set():
             self._active.set()
-        return self._index
+        return sub_id
 
     def remove_subscription(self, sub_id: SUB_ID):
         """
@@ -556,24 +1247,219 @@ class DeviceAttrPoller:
         """
         with self._lock:
             device_attribute, attr_events_pusher = self.subscriptions.pop(sub_id)
-            self._device_attribute_pollings[device_attribute].remove(attr_events_pusher)
+            self._subscription_periods.pop(sub_id)
+            polling_state = self._device_attribute_pollings[device_attribute]
+            polling_state.remove(attr_events_pusher)
+            if polling_state.is_empty:
+                self._device_attribute_pollings.pop(device_attribute)
+            self._update_period(device_attribute)
+
+    def _pop_due(self, now: float) -> tuple[list[PolledAttribute], float]:
+        """
+        Pop the attributes that are due and schedule their next deadline.
+
+        Needs to be called with the lock held.
+        :param now: the current (monotonic) time
+        :return: the due attributes and the schedule lag (how late the earliest one is)
+        """
+        due_attrs: list[PolledAttribute] = []
+        schedule_lag = 0.0
+        while self._schedule and self._schedule[0][0] <= now:
+            due, _, device_attribute = heapq.heappop(self._schedule)
+            if self._due.get(device_attribute) != due:
+                # stale entry of a removed or rescheduled attribute
+                continue
+            schedule_lag = max(schedule_lag, now - due)
+            due_attrs.append(device_attribute)
+            period = self._periods[device_attribute]
+            next_due = due + self._intervals.get(device_attribute, period)
+            if next_due <= now:
+                # we are more than a period late so skip the missed deadlines
+                next_due = self._next_deadline(now, period)
+            self._reschedule(device_attribute, next_due)
+        return due_attrs, schedule_lag
+
+    def _get_attr_to_poll(
+        self, due_attrs: list[PolledAttribute]
+    ) -> dict[str, list[tuple[PolledAttribute, PollingState]]]:
+        """
+        Get attributes to poll grouped by device name.
+
+        Devices for which a previous read is still in flight are skipped.
+        :param due_attrs: the attributes that are due
+        :return: attributes to poll per device name
+        """
+        attrs_to_poll: dict[str, list[tuple[PolledAttribute, PollingState]]] = defaultdict(list)
+        with self._lock:
+            for device_attr in due_attrs:
+                polling_state = self._device_attribute_pollings.get(device_attr)
+                if polling_state and device_attr.device_name not in self._in_flight:
+                    attrs_to_poll[device_attr.device_name].append((device_attr, polling_state))
+            self._in_flight.update(attrs_to_poll.keys())
+        return attrs_to_poll
+
+    def _poll_device(
+        self, device_name: str, attrs: list[tuple[PolledAttribute, PollingState]]
+    ) -> DeviceReadResult:
+        """
+        Read all due attributes of a device in one round trip and update their polling states
+        :param device_name: the name of the device
+        :param attrs: the attributes of the device to read along with their polling states
+        :return: DeviceReadResult
+        """
+        names = [device_attr.name for device_attr, _ in attrs]
+        try:
+            proxy = attrs[0][0].get_polling_device(self._read_timeout)
+            start = time.perf_counter()
+            try:
+                results = proxy.read_attributes([device_attr.attr for device_attr, _ in attrs])
+            except DevFailed as exception:
+                attrs[0][0].dev_factory.invalidate_on_connection_error(device_name, exception)
+                logging.warning("Unable to poll %s: %s", device_name, exception.args)
+                if any(
+                    getattr(error, "reason", None) == "API_DeviceTimedOut"
+                    for error in cast(Exception, exception).args
+                ):
+                    return DeviceReadResult({}, names, [])
+                return DeviceReadResult({}, [], names)
+            read_time = time.perf_counter() - start
+            read_times: dict[str, float] = {}
+            failed: list[str] = []
+            for (device_attr, polling_state), result in zip(attrs, results):
+                if getattr(result, "has_failed", False):
+                    failed.append(device_attr.name)
+                    continue
+                read_times[device_attr.name] = read_time
+                changed = polling_state.update_state(result, proxy)  # type: ignore
+                self._adapt_interval(device_attr, changed)
+            return DeviceReadResult(read_times, [], failed)
+        except UnableToFindDevice as exception:
+            logging.warning("Unable to poll %s: %s", device_name, exception.args)
+            return DeviceReadResult({}, [], names)
+        finally:
+            with self._lock:
+                self._in_flight.discard(device_name)
+
+    def _adapt_interval(self, device_attr: PolledAttribute, changed: bool):
+        """
+        Grow the polling interval of an unchanged attribute or reset it on a change
+        :param device_attr: the attribute that was read
+        :param changed: whether the value of the attribute changed
+        :return: None
+        """
+        if not self._adaptive:
+            return
+        with self._lock:
+            if (period := self._periods.get(device_attr)) is None:
+                return
+            interval = self._intervals.get(device_attr, period)
+            if changed:
+                if interval > period:
+                    self._reset_interval(device_attr, period, time.monotonic())
+            else:
+                self._intervals[device_attr] = max(
+                    period, min(interval * self._backoff_factor, self._max_period)
+                )
+
+    def _reset_interval(self, device_attr: PolledAttribute, period: float, now: float):
+        # needs to be called with the lock held
+        self._intervals[device_attr] = period
+        next_due = self._next_deadline(now, period)
+        if next_due < self._due.get(device_attr, math.inf):
+            self._reschedule(device_attr, next_due)
+
+    def reset_backoff(self):
+        """
+        Reset the polling interval of all attributes to their period (e.g. because a command
+        is about to be issued and changes are imminent).
 
-    def _get_attr_to_poll(self) -> list[tuple[PolledAttribute, PollingState]]:
+        Has no effect when the poller is not adaptive.
+        :return: None
+        """
+        if not self._adaptive:
+            return
+        with self._lock:
+            now = time.monotonic()
+            for device_attr, interval in self._intervals.items():
+                period = self._periods[device_attr]
+                if interval > period:
+                    self._reset_interval(device_attr, period, now)
+
+    def get_poll_intervals(self) -> dict[str, float]:
         """
-        Get attributes to poll
-        :return: attributes to poll
+        Get the current polling interval of every polled attribute
+        :return: the interval in seconds per attribute name
         """
         with self._lock:
-            return list(self._device_attribute_pollings.items())
+            return {
+                device_attr.name: interval for device_attr, interval in self._intervals.items()
+            }
 
-    def _update(self):
+    def _dispatch(self, due_attrs: list[PolledAttribute], schedule_lag: float):
         """
-        Update State
+        Dispatch the reads of the due attributes onto the thread pool without waiting for them
+        :param due_attrs: the attributes that are due
+        :param schedule_lag: how late (in seconds) the dispatch is compared to the deadline
         :return: None
         """
-        for device_attr, polling_state in self._get_attr_to_poll():
-            result = device_attr.get_state()
-            polling_state.update_state(result, device_attr.device)  # type: ignore
+        self._schedule_lags.append(schedule_lag)
+        attrs_to_poll = self._get_attr_to_poll(due_attrs)
+        if not attrs_to_poll:
+            return
+        cycle = _PollCycle(len(attrs_to_poll), schedule_lag, self._cycle_complete)
+        for device_name, attrs in attrs_to_poll.items():
+            names = [device_attr.name for device_attr, _ in attrs]
+            self._executor.submit(self._poll_device, device_name, attrs).add_done_callback(
+                partial(cycle.device_done, names)
+            )
+
+    def _cycle_complete(self, report: PollCycleReport):
+        self._last_cycle = report
+
+    @property
+    def last_cycle(self) -> Union[PollCycleReport, None]:
+        """
+        Get the timing report of the last poll cycle
+        :return: the report or None if no cycle has completed yet
+        """
+        return self._last_cycle
+
+    def get_last_cycle_time(self) -> Union[float, None]:
+        """
+        Get the wall time of the last poll cycle
+        :return: the wall time in seconds or None if no cycle has completed yet
+        """
+        if self._last_cycle:
+            return self._last_cycle.wall_time
+        return None
+
+    def get_slowest_attributes(self, count: int = 5) -> list[tuple[str, float]]:
+        """
+        Get the slowest attribute reads of the last poll cycle
+        :param count: the number of attributes to return
+        :return: list of (attribute name, read time in seconds), slowest first
+        """
+        if self._last_cycle:
+            return self._last_cycle.slowest(count)
+        return []
+
+    def get_last_schedule_lag(self) -> Union[float, None]:
+        """
+        Get the schedule lag (actual dispatch time minus due time) of the last poll cycle
+        :return: the lag in seconds or None if nothing has been dispatched yet
+        """
+        if self._schedule_lags:
+            return self._schedule_lags[-1]
+        return None
+
+    def get_average_schedule_lag(self) -> Union[float, None]:
+        """
+        Get the average schedule lag over the recent poll cycles
+        :return: the lag in seconds or None if nothing has been dispatched yet
+        """
+        if self._schedule_lags:
+            return sum(self._schedule_lags) / len(self._schedule_lags)
+        return None
 
     def start(self):
         """
@@ -581,22 +1467,41 @@ class DeviceAttrPoller:
         :return: None
         """
         self._active.set()
+        with self._schedule_changed:
+            self._schedule_changed.notify()
 
     def stop(self):
         """
-        Stop polling
+        Stop polling for good, ending the polling thread and shutting down its thread pool
+        (reads in progress are completed, pending ones are cancelled)
         :return: None
         """
-        self._active.clear()
+        with self._schedule_changed:
+            self._stopped.set()
+            # the polling thread shuts the thread pool down once it no longer dispatches
+            if not self._thread.is_alive():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._schedule_changed.notify()
+        # wake up the polling thread in case it waits to be activated
+        self._active.set()
 
     def _polling_thread(self):
         """
         Polling Thread
         :return: None
         """
-        while self._active:
-            self._update()
-            time.sleep(self._poll_rate)
+        while self._active.wait() and not self._stopped.is_set():
+            with self._schedule_changed:
+                due_attrs, schedule_lag = self._pop_due(time.monotonic())
+                if not due_attrs:
+                    timeout = None
+                    if self._schedule:
+                        timeout = max(0.0, self._schedule[0][0] - time.monotonic())
+                    self._schedule_changed.wait(timeout)
+                    continue
+            if self._active.is_set() and not self._stopped.is_set():
+                self._dispatch(due_attrs, schedule_lag)
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
 
 class UnableToStartSubscription(Exception):
@@ -613,83 +1518,431 @@ class UnableToStartSubscription(Exception):
         self.attr = attr
 
 
-class EventsSubscription(BaseSubscription):
-    """A concrete running subscription representing subscriptions to a Tango Device."""
-
-    attr: str
-    device_name: str
-
-    def __init__(
-        self,
-        device_name: str,
-        attr: str,
-        dev_factory: RemoteDeviceFactory,
-        poller: DeviceAttrPoller,
-    ) -> None:
-        """Initialise the object.
+class _EventChannel:
+    """A single tango change event subscription fanning events out to many pushers."""
 
-        :param device_name: The tango device FQD name
-        :param attr: The attribute of that device to be subscribed to for change events.
-        :param dev_factory: The device factory to use
-        :return: None
-        """
-        self.attr = attr
+    def __init__(self, device_name: str, attr: str) -> None:
         self.device_name = device_name
-        self._poller = poller
-        self._sub_id: Union[None, int] = None
-        self._dev_factory = dev_factory
-        self._device_proxy = dev_factory.get_device(self.device_name)
+        self.attr = attr
+        self.subscribers: dict[SUB_ID, EventsPusher] = {}
+        self._tango_sub_id: Union[int, None] = None
+        self._device_proxy: Any = None
+        self._last_event: Any = None
+        self._started = False
+        self._lock = Lock()
+        self.start_lock = Lock()
+        # why the subscription could not be started, raised to every subscriber waiting on it
+        self.failure: Union[UnableToStartSubscription, None] = None
+        # subscribers being added (guarded by the multiplexer lock)
+        self.joining = 0
 
-    def start(self, observer: EventsPusher):
-        """Start a subscription for a given subscriber on a tango device.
+    @property
+    def started(self) -> bool:
+        return self._started
 
-        :param pusher: the observer to listen for events.
-        :type pusher: EventsPusher
+    def start(self, dev_factory: RemoteDeviceFactory, poll_period: Union[float, None]):
+        """
+        Subscribe to change events on the device, falling back to setting up polling on the
+        device server if the device does not push change events itself.
+        :param dev_factory: the device factory
+        :param poll_period: the device server polling period in seconds for the fall back
         :return: None
         """
-        if os.getenv("USE_POLLING"):
-            try:
-                self._sub_id = self._poller.add_subscription(
-                    self.device_name, self.attr, observer, self._dev_factory
-                )
-                return
-            except UnableToPollDevice as exception:
-                raise UnableToStartSubscription(
-                    exception.device_name, exception.attr, exception.args
-                ) from exception
         try:
-            self._sub_id = self._device_proxy.subscribe_event(
-                self.attr, EventType.CHANGE_EVENT, observer
+            self._device_proxy = dev_factory.get_device(self.device_name)
+        except DevFailed as exception:
+            raise UnableToStartSubscription(
+                self.device_name, self.attr, cast(Exception, exception).args
+            ) from exception
+        try:
+            self._tango_sub_id = self._device_proxy.subscribe_event(
+                self.attr, EventType.CHANGE_EVENT, self
             )
         except DevFailed:
+            poll_period_ms = int(poll_period * 1000) if poll_period else 100
             print(
                 f"Warning: no polling setup for subscribing to {self.device_name} on {self.attr}, "
-                f"setting a polling of 100ms in order to implement subscription."
+                f"setting a polling of {poll_period_ms}ms in order to implement subscription."
             )
             try:
-                self._device_proxy.poll_attribute(self.attr, 100)
-                self._sub_id = self._device_proxy.subscribe_event(
-                    self.attr, EventType.CHANGE_EVENT, observer
+                self._device_proxy.poll_attribute(self.attr, poll_period_ms)
+                self._tango_sub_id = self._device_proxy.subscribe_event(
+                    self.attr, EventType.CHANGE_EVENT, self
                 )
             except DevFailed as exception:
+                dev_factory.invalidate_on_connection_error(self.device_name, exception)
                 raise UnableToStartSubscription(
                     self.device_name,
                     self.attr,
                     cast(Exception, exception).args,
                 ) from exception
+        self._started = True
 
     def stop(self):
         """
-        Stop a running subscription.
+        Unsubscribe from the device.
         :return: None
         """
-        assert (
-            self._sub_id
+        if self._started:
+            self._device_proxy.unsubscribe_event(self._tango_sub_id)
+            self._started = False
+
+    def add(self, sub_id: SUB_ID, pusher: EventsPusher):
+        """
+        Add a subscriber, replaying the last received event to it.
+        :param sub_id: the subscription id
+        :param pusher: the subscriber
+        :return: None
+        """
+        replayed = None
+        while True:
+            with self._lock:
+                if self._last_event is replayed:
+                    self.subscribers[sub_id] = pusher
+                    return
+                replayed = self._last_event
+            # outside the lock as the pusher may block, then again if an event came in meanwhile
+            pusher.push_event(replayed)
+
+    def remove(self, sub_id: SUB_ID):
+        with self._lock:
+            self.subscribers.pop(sub_id, None)
+
+    def push_event(self, event: Any):
+        """
+        Callback for tango events, fans the event out to every subscriber.
+        :param event: the tango event
+        :return: None
+        """
+        with self._lock:
+            self._last_event = event
+            pushers = list(self.subscribers.values())
+        # outside the lock so that a blocking pusher does not hold up (un)subscribing
+        for pusher in pushers:
+            pusher.push_event(event)
+
+
+class SubscriptionMultiplexer:
+    """Shares one tango change event subscription per device attribute among many pushers.
+
+    Subscribers are reference counted: the tango subscription is made for the first subscriber
+    of a device attribute and removed when the last one unsubscribes. A subscriber joining an
+    existing subscription immediately receives the last event received on it (as tango would
+    have sent for a new subscription).
+    """
+
+    def __init__(self, dev_factory: RemoteDeviceFactory) -> None:
+        """
+        Initialise the object.
+        :param dev_factory: the device factory used to create the device proxies
+        :return: None
+        """
+        self._dev_factory = dev_factory
+        self._channels: dict[str, _EventChannel] = {}
+        self._subscriptions: dict[SUB_ID, _EventChannel] = {}
+        self._index = 0
+        self._lock = Lock()
+
+    def subscribe(
+        self,
+        device_name: str,
+        attr: str,
+        pusher: EventsPusher,
+        poll_period: Union[float, None] = None,
+    ) -> SUB_ID:
+        """
+        Subscribe a pusher to change events of a device attribute.
+        :param device_name: the device name
+        :param attr: the attribute
+        :param pusher: the subscriber
+        :param poll_period: the device server polling period in seconds if the device does not
+            push change events itself
+        :raises UnableToStartSubscription: if the tango subscription could not be made (for
+            every subscriber waiting on it)
+        :return: the subscription id
+        """
+        key = event_key(device_name, attr)
+        with self._lock:
+            self._index += 1
+            sub_id = self._index
+            if (channel := self._channels.get(key)) is None:
+                channel = _EventChannel(device_name, attr)
+                self._channels[key] = channel
+            self._subscriptions[sub_id] = channel
+            channel.joining += 1
+        try:
+            channel.add(sub_id, pusher)
+        finally:
+            with self._lock:
+                channel.joining -= 1
+        with channel.start_lock:
+            if channel.failure is None and not channel.started:
+                try:
+                    channel.start(self._dev_factory, poll_period)
+                except UnableToStartSubscription as exception:
+                    channel.failure = exception
+                    with self._lock:
+                        # later subscribers get a new channel to try again
+                        if self._channels.get(key) is channel:
+                            self._channels.pop(key)
+        if channel.failure is not None:
+            self.unsubscribe(sub_id)
+            raise channel.failure
+        return sub_id
+
+    def unsubscribe(self, sub_id: SUB_ID):
+        """
+        Remove a subscription, unsubscribing from the device if it was the last one.
+        :param sub_id: the subscription id
+        :return: None
+        """
+        with self._lock:
+            channel = self._subscriptions.pop(sub_id)
+            channel.remove(sub_id)
+            if channel.subscribers or channel.joining:
+                return
+            key = event_key(channel.device_name, channel.attr)
+            if self._channels.get(key) is channel:
+                self._channels.pop(key)
+        channel.stop()
+
+    def get_subscriber_counts(self) -> dict[str, int]:
+        """
+        Get the number of subscribers per device attribute
+        :return: the number of subscribers per event key
+        """
+        with self._lock:
+            return {key: len(channel.subscribers) for key, channel in self._channels.items()}
+
+
+class _SharedResources:
+    """Process wide device factories, pollers and multiplexers per tango host."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.dev_factories: dict[str, RemoteDeviceFactory] = {}
+        self.pollers: dict[str, DeviceAttrPoller] = {}
+        self.multiplexers: dict[str, SubscriptionMultiplexer] = {}
+
+    def dev_factory(self, db_host: str) -> RemoteDeviceFactory:
+        with self._lock:
+            if (dev_factory := self.dev_factories.get(db_host)) is None:
+                dev_factory = RemoteDeviceFactory(db_host)
+                self.dev_factories[db_host] = dev_factory
+            return dev_factory
+
+    def poller(self, db_host: str) -> DeviceAttrPoller:
+        dev_factory = self.dev_factory(db_host)
+        with self._lock:
+            if (poller := self.pollers.get(db_host)) is None:
+                poller = DeviceAttrPoller(dev_factory)
+                self.pollers[db_host] = poller
+            return poller
+
+    def multiplexer(self, db_host: str) -> SubscriptionMultiplexer:
+        dev_factory = self.dev_factory(db_host)
+        with self._lock:
+            if (multiplexer := self.multiplexers.get(db_host)) is None:
+                multiplexer = SubscriptionMultiplexer(dev_factory)
+                self.multiplexers[db_host] = multiplexer
+            return multiplexer
+
+    def reset(self):
+        with self._lock:
+            for poller in self.pollers.values():
+                poller.stop()
+            self.dev_factories.clear()
+            self.pollers.clear()
+            self.multiplexers.clear()
+
+
+_shared_resources = _SharedResources()
+
+
+def get_shared_device_factory(db_host: str) -> RemoteDeviceFactory:
+    """
+    Get the process wide device factory (and proxy cache) for a tango host
+    :param db_host: the tango host
+    :return: the device factory
+    """
+    return _shared_resources.dev_factory(db_host)
+
+
+def get_shared_poller(db_host: str) -> DeviceAttrPoller:
+    """
+    Get the process wide poller for a tango host
+    :param db_host: the tango host
+    :return: the poller
+    """
+    return _shared_resources.poller(db_host)
+
+
+def get_shared_multiplexer(db_host: str) -> SubscriptionMultiplexer:
+    """
+    Get the process wide subscription multiplexer for a tango host
+    :param db_host: the tango host
+    :return: the subscription multiplexer
+    """
+    return _shared_resources.multiplexer(db_host)
+
+
+def reset_shared_resources():
+    """
+    Forget the process wide device factories, pollers and multiplexers (stopping the pollers).
+
+    Existing subscriptions keep using the resources they were created with.
+    :return: None
+    """
+    _shared_resources.reset()
+
+
+class EventsSubscription(BaseSubscription):
+    """A concrete running subscription representing subscriptions to a Tango Device."""
+
+    attr: str
+    device_name: str
+
+    def __init__(
+        self,
+        device_name: str,
+        attr: str,
+        dev_factory: RemoteDeviceFactory,
+        poller: DeviceAttrPoller,
+        poll_period: Union[float, None] = None,
+        multiplexer: Union[SubscriptionMultiplexer, None] = None,
+    ) -> None:
+        """Initialise the object.
+
+        :param device_name: The tango device FQD name
+        :param attr: The attribute of that device to be subscribed to for change events.
+        :param dev_factory: The device factory to use
+        :param poller: The poller to use when polling (USE_POLLING) instead of subscribing
+        :param poll_period: The period in seconds at which the attribute needs to be polled,
+            either by the poller or (if the device does not push change events itself) by the
+            device server, defaults to the poller's rate and 100ms respectively
+        :param multiplexer: The multiplexer sharing tango subscriptions, defaults to a
+            multiplexer private to this subscription
+        :return: None
+        """
+        self.attr = attr
+        self.device_name = device_name
+        self._poller = poller
+        self._poll_period = poll_period
+        self._sub_id: Union[None, int] = None
+        self._dev_factory = dev_factory
+        if multiplexer is None:
+            multiplexer = SubscriptionMultiplexer(dev_factory)
+        self._multiplexer = multiplexer
+        self._failover_sub_id: Union[None, int] = None
+        self.last_channel_event: Union[float, None] = None
+        self.polling_since: Union[float, None] = None
+
+    def start(self, observer: EventsPusher):
+        """Start a subscription for a given subscriber on a tango device.
+
+        :param pusher: the observer to listen for events.
+        :type pusher: EventsPusher
+        :return: None
+        """
+        if os.getenv("USE_POLLING"):
+            try:
+                self._sub_id = self._poller.add_subscription(
+                    self.device_name, self.attr, observer, self._dev_factory, self._poll_period
+                )
+                return
+            except UnableToPollDevice as exception:
+                raise UnableToStartSubscription(
+                    exception.device_name, exception.attr, exception.args
+                ) from exception
+        self._sub_id = self._multiplexer.subscribe(
+            self.device_name,
+            self.attr,
+            cast(EventsPusher, _ChannelPusher(self, observer)),
+            self._poll_period,
+        )
+
+    @property
+    def polling(self) -> bool:
+        """
+        Whether the attribute is polled (because of USE_POLLING or a failover)
+        :return: polling
+        """
+        return bool(os.getenv("USE_POLLING")) or self._failover_sub_id is not None
+
+    def start_polling(self, observer: EventsPusher) -> bool:
+        """
+        Poll the attribute next to the tango subscription (e.g. because its event channel has
+        gone silent) until stop_polling is called.
+        :param observer: the observer to push the polled values onto
+        :return: whether polling was started
+        """
+        if self.polling:
+            return False
+        try:
+            self._failover_sub_id = self._poller.add_subscription(
+                self.device_name, self.attr, observer, self._dev_factory, self._poll_period
+            )
+        except UnableToPollDevice as exception:
+            logging.warning("Unable to poll %s/%s: %s", self.device_name, self.attr, exception)
+            return False
+        self.polling_since = time.time()
+        return True
+
+    def stop_polling(self):
+        """
+        Stop polling started by start_polling
+        :return: None
+        """
+        if self._failover_sub_id is not None:
+            self._poller.remove_subscription(self._failover_sub_id)
+            self._failover_sub_id = None
+            self.polling_since = None
+
+    def stop(self):
+        """
+        Stop a running subscription.
+        :return: None
+        """
+        assert (
+            self._sub_id
         ), "You can not stop a subscription that has not been started, did you call start()?."
         if os.getenv("USE_POLLING"):
             self._poller.remove_subscription(self._sub_id)
             return
-        self._device_proxy.unsubscribe_event(self._sub_id)
+        self.stop_polling()
+        self._multiplexer.unsubscribe(self._sub_id)
+
+
+class _ChannelPusher:
+    """Passes the events of a tango event channel on, noting when the channel was last alive."""
+
+    def __init__(self, subscription: EventsSubscription, observer: EventsPusher) -> None:
+        self._subscription = subscription
+        self._observer = observer
+
+    def push_event(self, event: Any):
+        # error events carry no value and do not show the channel is alive
+        if not getattr(event, "err", False):
+            self._subscription.last_channel_event = time.time()
+        self._observer.push_event(event)
+
+
+class SubscriptionStartReport(NamedTuple):
+    """Timing report of starting the subscriptions of a monitor."""
+
+    wall_time: float
+    # the time in seconds it took to start the subscription per event key
+    start_times: dict[str, float]
+    # the error per event key of the subscriptions that could not be started
+    failed: dict[str, str]
+
+    def slowest(self, count: int = 5) -> list[tuple[str, float]]:
+        """
+        Get the slowest subscriptions to start
+        :param count: the number of subscriptions to return
+        :return: list of (event key, start time in seconds), slowest first
+        """
+        return sorted(self.start_times.items(), key=lambda item: item[1], reverse=True)[:count]
 
 
 STATE = TypeVar("STATE")  # STATE defines the current state of the entity being modeled
@@ -779,6 +2032,8 @@ class EventsReducer(Reducer[STATE], Generic[STATE]):
         reduce_function: EventsReducerFunction[STATE],
         dev_factory: RemoteDeviceFactory,
         poller: DeviceAttrPoller,
+        poll_period: Union[float, None] = None,
+        multiplexer: Union[SubscriptionMultiplexer, None] = None,
     ) -> None:
         """Initialise the object.
 
@@ -786,6 +2041,9 @@ class EventsReducer(Reducer[STATE], Generic[STATE]):
         :param attr_name: The attribute of the device to listen to for events
         :param reduce_function: The user provided reduce function for tango events
         :param dev_factory: The device factory
+        :param poller: The poller to use when polling instead of subscribing
+        :param poll_period: The period in seconds at which the attribute needs to be polled
+        :param multiplexer: The multiplexer sharing tango subscriptions
         :return: None
         """
         self.attr_name = attr_name
@@ -793,6 +2051,8 @@ class EventsReducer(Reducer[STATE], Generic[STATE]):
         self._reduce_function = reduce_function
         self._dev_factory = dev_factory
         self._poller = poller
+        self._poll_period = poll_period
+        self._multiplexer = multiplexer
 
     def reduce(self, state: STATE, event_or_action: GenericEvent) -> STATE:
         """Effects the reduction of the system by running the user provided reduce function.
@@ -810,7 +2070,12 @@ class EventsReducer(Reducer[STATE], Generic[STATE]):
         :return: BaseSubscription
         """
         return EventsSubscription(
-            self.device_name, self.attr_name, self._dev_factory, self._poller
+            self.device_name,
+            self.attr_name,
+            self._dev_factory,
+            self._poller,
+            self._poll_period,
+            self._multiplexer,
         )
 
     @property
@@ -845,6 +2110,301 @@ def explode_from_key(key: str) -> list[str]:
     return key.split(":")
 
 
+SNAPSHOT_VERSION = 1
+
+
+class StateSnapshot(NamedTuple):
+    """The last value of each device attribute of a monitor along with the time it was updated."""
+
+    # the last value and attribute type per event key
+    values: dict[str, tuple[Any, str]]
+    # the time (seconds since the epoch) of the last update per event key
+    updated: dict[str, float]
+    saved: float
+
+
+def _encode_snapshot_value(value: Any) -> Any:
+    if isinstance(value, DevState):
+        return {"DevState": value.name}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return {"array": [_encode_snapshot_value(item) for item in value]}
+    raise TypeError(f"unable to snapshot a value of type {type(value).__name__}")
+
+
+def _decode_snapshot_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        tagged = cast(dict[str, Any], value)
+        if "DevState" in tagged:
+            return getattr(DevState, tagged["DevState"])
+        return [_decode_snapshot_value(item) for item in tagged["array"]]
+    return value
+
+
+def save_snapshot(path: str, snapshot: StateSnapshot):
+    """
+    Save a snapshot as JSON, atomically replacing an existing one. Values that cannot be
+    encoded (anything but None, numbers, strings, DevState and sequences of them) are left out.
+    :param path: the path of the snapshot file
+    :param snapshot: the snapshot
+    :return: None
+    """
+    values: dict[str, Any] = {}
+    for key, (value, attr_type) in snapshot.values.items():
+        try:
+            values[key] = {"value": _encode_snapshot_value(value), "type": attr_type}
+        except TypeError as exception:
+            logging.debug("Not saving %s in the snapshot: %s", key, exception)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "version": SNAPSHOT_VERSION,
+                "saved": snapshot.saved,
+                "updated": snapshot.updated,
+                "values": values,
+            },
+            file,
+        )
+    os.replace(temporary, path)
+
+
+def load_snapshot(path: str) -> Union[StateSnapshot, None]:
+    """
+    Load a snapshot
+    :param path: the path of the snapshot file
+    :return: the snapshot or None if there is no (readable) snapshot of this version
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported version {data.get('version')}")
+        values = {
+            key: (_decode_snapshot_value(item["value"]), str(item["type"]))
+            for key, item in data["values"].items()
+        }
+        updated = {key: float(value) for key, value in data["updated"].items()}
+        return StateSnapshot(values, updated, float(data["saved"]))
+    # pylint: disable-next=broad-except
+    except Exception as exception:
+        logging.warning("Unable to load the snapshot %s: %s", path, exception)
+        return None
+
+
+class _SnapshotDevice:
+    """Stands in for the DeviceProxy of an event restored from a snapshot."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+
+def _snapshot_events(snapshot: StateSnapshot) -> list[EventData]:
+    """
+    Recreate the last event of each device attribute of a snapshot
+    :param snapshot: the snapshot
+    :return: the events, oldest first
+    """
+    events: list[EventData] = []
+    for key in sorted(snapshot.values, key=lambda key: snapshot.updated.get(key, 0.0)):
+        value, attr_type = snapshot.values[key]
+        device_name, attr_name = key.rsplit(":", 1)
+        reception_date = TimeVal.fromtimestamp(snapshot.updated.get(key, snapshot.saved))
+        events.append(
+            EventData(
+                attr_name,
+                DeviceAttribute(value, reception_date, attr_type, attr_name),
+                _SnapshotDevice(device_name),
+                False,
+                [],
+                "change",
+                reception_date,
+            )
+        )
+    return events
+
+
+class _Attribute(NamedTuple):
+    """A step into an attribute (rather than an item) of a state path."""
+
+    name: str
+
+
+StatePath = tuple[Any, ...]
+
+
+def _changed_paths(original: Any, changed: Any, path: StatePath = ()) -> list[StatePath]:
+    """
+    Get the paths of the parts of a deep copy of a state that differ from the original, going
+    into dicts and the attributes of objects, other values are compared as a whole.
+    :param original: the original state
+    :param changed: the (changed) deep copy of the state
+    :param path: the path of the compared values
+    :return: the paths of the changed values
+    """
+    if original is changed:
+        # values deepcopy does not copy (str, int, enums, ...)
+        return []
+    if type(original) is not type(changed):
+        return [path]
+    if isinstance(original, dict):
+        original_dict = cast(dict[Any, Any], original)
+        changed_dict = cast(dict[Any, Any], changed)
+        paths: list[StatePath] = []
+        for key in original_dict.keys() | changed_dict.keys():
+            if key in original_dict and key in changed_dict:
+                paths.extend(_changed_paths(original_dict[key], changed_dict[key], (*path, key)))
+            else:
+                paths.append((*path, key))
+        return paths
+    if hasattr(original, "__dict__") and not isinstance(original, type):
+        return [
+            (*path, _Attribute(name), *rest)
+            for name, *rest in _changed_paths(vars(original), vars(changed))
+        ]
+    try:
+        if bool(original == changed):
+            return []
+    # pylint: disable-next=broad-except
+    except Exception:
+        pass
+    return [path]
+
+
+def _step(value: Any, step: Any) -> Any:
+    return getattr(value, step.name) if isinstance(step, _Attribute) else value[step]
+
+
+def _apply_path(original: Any, changed: Any, path: StatePath):
+    """
+    Copy the value at a (non empty) path from a changed copy of a state into the original
+    :param original: the original state
+    :param changed: the changed copy of the state
+    :param path: the path of the value
+    :return: None
+    """
+    for step in path[:-1]:
+        original = _step(original, step)
+        changed = _step(changed, step)
+    last = path[-1]
+    if isinstance(last, _Attribute):
+        setattr(original, last.name, getattr(changed, last.name))
+    elif last in changed:
+        original[last] = changed[last]
+    else:
+        del original[last]
+
+
+def _merge_shards(state: Any, results: list[tuple[Any, Any]]) -> tuple[Any, list[set[int]]]:
+    """
+    Merge the states reduced by shards (each on its own deep copy of the state) into the state.
+    Shards conflict when one changed a part of the state another one changed (or replaced the
+    state), in which case nothing is merged.
+    :param state: the state the shards started from
+    :param results: the copy each shard started from and the state it returned, per shard
+    :return: the merged state (None on conflict) and the groups of conflicting shards
+    """
+    # the shards that changed a path and the shards that changed something within a path
+    touched: dict[StatePath, set[int]] = defaultdict(set)
+    within: dict[StatePath, set[int]] = defaultdict(set)
+    conflicts: list[set[int]] = []
+    changes: list[tuple[int, list[StatePath]]] = []
+    for index, (start, result) in enumerate(results):
+        paths = [()] if result is not start else _changed_paths(state, result)
+        for path in paths:
+            others = touched.get(path, set()) | within.get(path, set())
+            for length in range(len(path)):
+                others |= touched.get(path[:length], set())
+            if others:
+                conflicts.append({index, *others})
+        for path in paths:
+            touched[path].add(index)
+            for length in range(len(path)):
+                within[path[:length]].add(index)
+        changes.append((index, paths))
+    if conflicts:
+        return None, conflicts
+    merged = state
+    for index, paths in changes:
+        for path in paths:
+            if path:
+                _apply_path(state, results[index][1], path)
+            else:
+                merged = results[index][1]
+    return merged, []
+
+
+class StateCounter:
+    """Number of keys per value for a group of state keys, updated in O(1) per event.
+
+    Use this to keep aggregates (e.g. how many devices are ON) in the state instead of
+    recalculating them from every device state after each event:
+
+    .. code-block::
+       counter = StateCounter({"dev/1:state": "ON", "dev/2:state": "OFF"})
+       counter.update("dev/2:state", "ON")
+       assert counter.all("ON")
+    """
+
+    def __init__(self, values: dict[str, Any]) -> None:
+        """
+        Initialise the object.
+        :param values: the initial value of each key in the group
+        :return: None
+        """
+        self._values = dict(values)
+        self._counts: dict[Any, int] = defaultdict(int)
+        for value in self._values.values():
+            self._counts[value] += 1
+
+    def update(self, key: str, value: Any) -> bool:
+        """
+        Update the value of a key, ignoring keys that are not part of the group.
+        :param key: the key (e.g. the event key)
+        :param value: the new value
+        :return: whether the key is part of the group
+        """
+        if (previous := self._values.get(key, self)) is self:
+            return False
+        if previous != value:
+            self._counts[previous] -= 1
+            self._counts[value] += 1
+            self._values[key] = value
+        return True
+
+    def count(self, value: Any) -> int:
+        """
+        :param value: the value
+        :return: the number of keys having the value
+        """
+        return self._counts.get(value, 0)
+
+    def all(self, value: Any) -> bool:
+        """
+        :param value: the value
+        :return: whether all keys have the value (True for an empty group)
+        """
+        return self.count(value) == len(self._values)
+
+    def any(self, value: Any) -> bool:
+        """
+        :param value: the value
+        :return: whether any key has the value
+        """
+        return self.count(value) > 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
 def get_event_key(event: Union[EventData, BaseAction[Any]]) -> str:
     """_summary_
 
@@ -926,6 +2486,58 @@ class Selector(Generic[STATE, VALUE]):
         return self._selector_function(state)
 
 
+class _Reads:
+    """The state keys read by a selector."""
+
+    __slots__ = ("keys", "everything")
+
+    def __init__(self) -> None:
+        self.keys: set[Any] = set()
+        # set when a whole mapping was read (iterated, compared or returned)
+        self.everything = False
+
+
+class _TrackingView(Mapping[Any, Any]):
+    """Read only view on a (nested) state mapping recording the keys of the values read.
+
+    Nested mappings are returned as views themselves so that only the keys of leaf values
+    (e.g. the event keys of devices_states) are recorded.
+    """
+
+    __slots__ = ("_mapping", "_reads")
+
+    def __init__(self, mapping: Mapping[Any, Any], reads: _Reads) -> None:
+        self._mapping = mapping
+        self._reads = reads
+
+    def __getitem__(self, key: Any) -> Any:
+        try:
+            value = self._mapping[key]
+        except KeyError:
+            self._reads.keys.add(key)
+            raise
+        if isinstance(value, Mapping):
+            return _TrackingView(value, self._reads)
+        self._reads.keys.add(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        self._reads.keys.add(key)
+        return key in self._mapping
+
+    def __iter__(self):
+        self._reads.everything = True
+        return iter(self._mapping)
+
+    def __len__(self) -> int:
+        self._reads.everything = True
+        return len(self._mapping)
+
+    def unwrap(self) -> Mapping[Any, Any]:
+        self._reads.everything = True
+        return self._mapping
+
+
 class Publisher(Generic[STATE, VALUE]):
     """Object used to publish the results of selector functions to a given observe function.
 
@@ -959,6 +2571,37 @@ class Publisher(Generic[STATE, VALUE]):
             self._previous_result = result
             self._observe(result)
 
+    def publish_tracked(self, state: STATE) -> Union[frozenset[Any], None]:
+        """Publish like `publish` while recording the state keys read by the selector.
+
+        :param state: the current state
+        :return: the keys of the values read by the selector or None if the selector read
+            a whole mapping of the state (and therefore depends on all of it)
+        """
+        reads = _Reads()
+        if not isinstance(state, Mapping):
+            self.publish(state)
+            return None
+        result = self._selector.select(cast(STATE, _TrackingView(state, reads)))
+        if isinstance(result, _TrackingView):
+            result = cast(VALUE, result.unwrap())
+        if result != self._previous_result:
+            self._previous_result = result
+            self._observe(result)
+        return None if reads.everything else frozenset(reads.keys)
+
+
+class ReducerTiming(NamedTuple):
+    """Execution time statistics of the reducers of an event key."""
+
+    calls: int
+    total: float
+    longest: float
+
+    @property
+    def average(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
 
 class ReducerSpec(TypedDict):
     """Represents the reduce function to be operated on a given device attribute change event."""
@@ -968,6 +2611,10 @@ class ReducerSpec(TypedDict):
     reduce_function: ReduceFunction[Any]
 
 
+# "single" handles one event at a time, "batch" drains the queue and publishes once per batch
+LoopMode = Literal["single", "batch"]
+
+
 class MonState(EventsPusher, Generic[STATE]):
     """A coordination object responsible for orchestrating the monitoring of events on a provided system.
 
@@ -980,20 +2627,173 @@ class MonState(EventsPusher, Generic[STATE]):
     a change in calculated value.
     """
 
-    def __init__(self, initState: STATE, deployment: TangoDeployment) -> None:
+    def __init__(
+        self,
+        initState: STATE,
+        deployment: TangoDeployment,
+        loop_mode: LoopMode = "single",
+        max_batch_latency: float = 0.05,
+        max_batch_size: int = 1000,
+        coalesce: bool = False,
+        dev_factory: Union[RemoteDeviceFactory, None] = None,
+        poller: Union[DeviceAttrPoller, None] = None,
+        share_resources: bool = False,
+        track_dependencies: bool = False,
+        reducer_workers: int = 1,
+        slow_reducer_threshold: float = 0.1,
+        collect_metrics: bool = False,
+        history: Union[HistoryStore, None] = None,
+        snapshot_path: Union[str, None] = None,
+        snapshot_interval: float = 60.0,
+        max_queue_size: int = 0,
+        overflow: OverflowPolicy = "block",
+    ) -> None:
         """
         Initialise the object
+        :param initState: the initial state of the system
+        :param deployment: the tango deployment to monitor
+        :param loop_mode: "single" handles one event at a time (throttled), "batch" drains
+            all queued events, reduces them in one go and publishes once per batch
+        :param max_batch_latency: (batch mode) the maximum time in seconds to wait for more
+            events after the first event of a batch arrived
+        :param max_batch_size: (batch mode) the maximum number of events in a batch
+        :param coalesce: only keep the newest pending event per device attribute so that
+            reducers do not see intermediate values of flapping attributes
+        :param dev_factory: the device factory (and its proxy cache) to share with other
+            monitors, defaults to a new factory for the deployment's tango host
+        :param poller: the poller used when polling instead of subscribing (USE_POLLING),
+            defaults to a new poller using the device factory
+        :param share_resources: use the process wide device factory, poller and subscription
+            multiplexer of the tango host (unless given explicitly) so that monitors share one
+            poller and one tango subscription per device attribute
+        :param track_dependencies: record the state keys read by each publisher's selectors and
+            after an event only publish the ones depending on the event's key. This requires
+            reducers to only update the state under the key of their event (e.g.
+            state["devices_states"][event.key]); publishers whose selectors read other keys or
+            whole mappings are published after every event
+        :param reducer_workers: (batch mode) the number of threads to reduce a batch on. Events
+            are sharded by event key so that the events of a key are reduced in order by one
+            worker (on its own deep copy of the state, merged back into the state), all shards
+            are reduced before publishing and actions are reduced on their own in between.
+            Keys whose reducers change the same part of the state end up on the same worker
+        :param slow_reducer_threshold: the reduce time in seconds above which the reducers of an
+            event key are reported as slow and (when sharding) moved to a worker of their own
+        :param collect_metrics: keep latency histograms of the stages events go through,
+            see metrics()
+        :param history: record the value of every reduced tango event in this history store,
+            see history
+        :param snapshot_path: warm start from the snapshot at this path (if any) and save
+            snapshots of the last value of each device attribute to it while listening (at
+            most every snapshot_interval) and when listening stops. When listening starts the
+            state is rebuilt by reducing the restored values and published. Restored device
+            attributes are provisional until confirmed by a live event (see get_provisional)
+        :param snapshot_interval: the minimum time in seconds between snapshots
+        :param max_queue_size: the maximum number of pending tango events, 0 for unbounded
+        :param overflow: what to do with a tango event pushed onto a full queue: "block" the
+            producer (for at most a second), "drop_oldest", "drop_newest" or "coalesce" with
+            the pending event of the same key, see get_overflow_count and get_high_water_mark
         :return: None
         """
-        super().__init__()
+        super().__init__(coalesce, max_queue_size, overflow)
         self.state = initState
+        self._loop_mode = loop_mode
+        self._max_batch_latency = max_batch_latency
+        self._max_batch_size = max_batch_size
         self.subscriptions: dict[str, BaseSubscription] = dict({})
         self._publishers: list[Publisher[STATE, Any]] = []
+        self._track_dependencies = track_dependencies
+        self._publisher_order: dict[Publisher[STATE, Any], int] = {}
+        self._publisher_sequence = itertools.count()
+        # event key -> publishers depending on it
+        self._dependants: dict[str, dict[Publisher[STATE, Any], None]] = defaultdict(dict)
+        self._dependencies: dict[Publisher[STATE, Any], frozenset[Any]] = {}
+        # publishers with unknown (not yet published) or untrackable dependencies
+        self._untracked: dict[Publisher[STATE, Any], None] = {}
         self._reducers: dict[str, list[Reducer[STATE]]] = defaultdict(lambda: [])
         self._daemon: Union[Thread, None] = None
         self._running: Event = Event()
-        self._dev_factory = RemoteDeviceFactory(deployment.tango_host)
-        self._poller = DeviceAttrPoller(self._dev_factory)
+        self._reducer_workers = reducer_workers
+        self._reducer_executor: Union[ThreadPoolExecutor, None] = None
+        self._slow_reducer_threshold = slow_reducer_threshold
+        self._reducer_timings: dict[str, ReducerTiming] = {}
+        self._slow_keys: set[str] = set()
+        # event key -> a key of the same group, keys of a group are reduced by the same worker
+        self._shard_groups: dict[str, str] = {}
+        self._slow_groups: set[str] = set()
+        self._shard_conflict_count = 0
+        self._latency_metrics = EventLatencyMetrics() if collect_metrics else None
+        self._history = history
+        self._last_updates: dict[str, float] = {}
+        self._listening_since = time.time()
+        self._error_lock = Lock()
+        self._reducer_error_count = 0
+        self._publisher_error_count = 0
+        self._exporter: Any = None
+        self._watchdog: Any = None
+        self._subscription_start: Union[SubscriptionStartReport, None] = None
+        self._snapshot_path = snapshot_path
+        self._snapshot_interval = snapshot_interval
+        self._next_snapshot = time.monotonic() + snapshot_interval
+        # event key -> the time it was last updated according to the snapshot
+        self._provisional: dict[str, float] = {}
+        # event key -> the last value and attribute type, saved in the snapshots
+        self._last_values: dict[str, tuple[Any, str]] = {}
+        self._restored: Union[StateSnapshot, None] = None
+        if snapshot_path and (snapshot := load_snapshot(snapshot_path)):
+            self._provisional = dict(snapshot.updated)
+            self._last_values = dict(snapshot.values)
+            self._restored = snapshot
+        if share_resources:
+            if dev_factory is None:
+                dev_factory = get_shared_device_factory(deployment.tango_host)
+            if poller is None:
+                poller = get_shared_poller(deployment.tango_host)
+            self._multiplexer = get_shared_multiplexer(deployment.tango_host)
+        if dev_factory is None:
+            dev_factory = RemoteDeviceFactory(deployment.tango_host)
+        self._dev_factory = dev_factory
+        if poller is None:
+            poller = DeviceAttrPoller(self._dev_factory)
+        self._poller = poller
+        if not share_resources:
+            self._multiplexer = SubscriptionMultiplexer(self._dev_factory)
+
+    @property
+    def dev_factory(self) -> RemoteDeviceFactory:
+        """
+        The device factory (and proxy cache) used by the monitor's subscriptions
+        :return: the device factory
+        """
+        return self._dev_factory
+
+    @property
+    def poller(self) -> DeviceAttrPoller:
+        """
+        The poller used by the monitor's subscriptions when polling
+        :return: the poller
+        """
+        return self._poller
+
+    @property
+    def multiplexer(self) -> SubscriptionMultiplexer:
+        """
+        The multiplexer used by the monitor's tango event subscriptions
+        :return: the multiplexer
+        """
+        return self._multiplexer
+
+    def push_event(self, event: GenericEvent):
+        """
+        Push a new event onto the system.
+
+        An action signals an imminent command so any backed off polling is reset first.
+
+        :param event: The event that needs to be pushed.
+        :return: None
+        """
+        if isinstance(event, BaseAction):
+            self._poller.reset_backoff()
+        super().push_event(event)
 
     def _add_generic_reducer(self, reducer: Reducer[STATE]):
         current_reducers = self._reducers[reducer.key]
@@ -1008,16 +2808,25 @@ class MonState(EventsPusher, Generic[STATE]):
         device_name: str,
         attr_name: str,
         reduce_function: EventsReducerFunction[STATE],
+        poll_period: Union[float, None] = None,
     ):
         """Add a reducer function operating on tango device attribute change events.
 
         :param device_name: The FDQ device name
         :param attr_name: The device attribute
         :param reduce_function: The function to update the state of the system when the attribute changes
+        :param poll_period: The period in seconds at which the attribute needs to be polled
+            (e.g. 0.1 for obsState during scans, 10 for adminMode), defaults to the poll rate
         :return: None
         """
         reducer = EventsReducer(
-            device_name, attr_name, reduce_function, self._dev_factory, self._poller
+            device_name,
+            attr_name,
+            reduce_function,
+            self._dev_factory,
+            self._poller,
+            poll_period,
+            self._multiplexer,
         )
         self._add_generic_reducer(reducer)
 
@@ -1059,7 +2868,7 @@ class MonState(EventsPusher, Generic[STATE]):
         :param selector: The selector object to be used for calculating a new value
         :return: None
         """
-        self._publishers.append(Publisher(selector, observe_function))
+        self._add_publisher(Publisher(selector, observe_function))
 
     def add_publishers(self, publishers: list[Publisher[STATE, Any]]):
         """Add a list of publishers to th existing list of publishers.
@@ -1070,73 +2879,612 @@ class MonState(EventsPusher, Generic[STATE]):
         :param publishers: The list of publishers
         :return: None
         """
-        self._publishers = [*self._publishers, *publishers]
+        for publisher in publishers:
+            self._add_publisher(publisher)
 
-    def start_subscriptions(self):
+    def _add_publisher(self, publisher: Publisher[STATE, Any]):
+        self._publishers.append(publisher)
+        self._publisher_order[publisher] = next(self._publisher_sequence)
+        self._untracked[publisher] = None
+
+    def _remove_publisher(self, publisher: Publisher[STATE, Any]):
+        self._publishers.remove(publisher)
+        self._publisher_order.pop(publisher, None)
+        self._untracked.pop(publisher, None)
+        for key in self._dependencies.pop(publisher, ()):
+            self._dependants[key].pop(publisher, None)
+
+    def _update_dependencies(
+        self, publisher: Publisher[STATE, Any], keys: Union[frozenset[Any], None]
+    ):
+        """
+        Index a publisher by the event keys its selectors read.
+
+        Only publishers reading nothing but event keys can be indexed, others remain
+        untracked and are published after every event.
+        :param publisher: the publisher
+        :param keys: the state keys read by the publisher's selectors (None for all)
+        :return: None
+        """
+        previous = self._dependencies.get(publisher)
+        if keys is not None and keys == previous:
+            return
+        for key in self._dependencies.pop(publisher, ()):
+            self._dependants[key].pop(publisher, None)
+        if keys and keys <= self._reducers.keys():
+            self._dependencies[publisher] = keys
+            self._untracked.pop(publisher, None)
+            for key in keys:
+                self._dependants[key][publisher] = None
+        else:
+            self._untracked[publisher] = None
+
+    def _affected_publishers(
+        self, event_keys: Union[set[str], None]
+    ) -> list[Publisher[STATE, Any]]:
+        """
+        Get the publishers (in the order they were added) to publish after events.
+        :param event_keys: the keys of the events or None if every publisher is affected
+        :return: the publishers
+        """
+        if event_keys is None or not self._track_dependencies:
+            return list(self._publishers)
+        affected = dict(self._untracked)
+        for key in event_keys:
+            if dependants := self._dependants.get(key):
+                affected.update(dependants)
+        return sorted(affected, key=self._publisher_order.__getitem__)
+
+    @staticmethod
+    def _event_keys(events: list[GenericEvent]) -> Union[set[str], None]:
+        # actions may update any part of the state
+        if any(isinstance(event, BaseAction) for event in events):
+            return None
+        return {event.key for event in events}
+
+    def _start_subscription(
+        self, key: str, subscription: BaseSubscription
+    ) -> tuple[str, float, Union[str, None]]:
+        start = time.perf_counter()
+        try:
+            subscription.start(self)
+        except UnableToStartSubscription as exception:
+            logging.exception(
+                "Unable to start subscription on %s for %s",
+                exception.device_name,
+                exception.attr,
+            )
+            return key, time.perf_counter() - start, str(exception.args)
+        return key, time.perf_counter() - start, None
+
+    def start_subscriptions(self, max_workers: int = 16) -> SubscriptionStartReport:
         """
         Start the subscriptions by actively starting to produce events on subscribers.
 
+        Subscriptions are started concurrently (each one involves at least one round trip to
+        its device and creating its device proxy on first use) over a bounded thread pool.
+
         Note an unsuccessful subscription that can not be started will cause the subscription and reducer to
         be removed.
-        :return: None
+        :param max_workers: the maximum number of subscriptions started at the same time
+        :return: SubscriptionStartReport
+        """
+        start = time.perf_counter()
+        subscriptions = list(self.subscriptions.items())
+        if max_workers > 1 and len(subscriptions) > 1:
+            with ThreadPoolExecutor(
+                min(max_workers, len(subscriptions)), thread_name_prefix="subscribe"
+            ) as executor:
+                results = list(
+                    executor.map(lambda item: self._start_subscription(*item), subscriptions)
+                )
+        else:
+            results = [self._start_subscription(*item) for item in subscriptions]
+        start_times: dict[str, float] = {}
+        failed: dict[str, str] = {}
+        for key, start_time, error in results:
+            start_times[key] = start_time
+            if error is not None:
+                failed[key] = error
+                self.subscriptions.pop(key)
+                self._reducers.pop(key)
+                self._last_updates.pop(key, None)
+        self._subscription_start = SubscriptionStartReport(
+            time.perf_counter() - start, start_times, failed
+        )
+        return self._subscription_start
+
+    @property
+    def subscription_start(self) -> Union[SubscriptionStartReport, None]:
+        """
+        The timing report of the last start of the subscriptions
+        :return: the report or None if the subscriptions have not been started
+        """
+        return self._subscription_start
+
+    def _run_reducers(self, state: STATE, event: GenericEvent) -> tuple[STATE, Union[float, None]]:
+        """
+        Run the reducers of an event, removing the ones raising an exception.
+        :param state: the current state
+        :param event: the event to reduce
+        :return: the updated state and the time the reducers took (None if there are none)
         """
-        items_to_pop: list[str] = []
-        for key, subscription in self.subscriptions.items():
+        reducers_to_remove: list[int] = []
+        if not (reducers := self._reducers.get(event.key)):
+            return state, None
+        start = time.perf_counter()
+        for index, reducer in enumerate(reducers):
             try:
-                subscription.start(self)
-            except UnableToStartSubscription as exception:
-                logging.exception(
-                    "Unable to start subscription on %s for %s",
-                    exception.device_name,
-                    exception.attr,
+                state = reducer.reduce(state, event)
+            # pylint: disable-next=broad-except
+            except Exception as exception:
+                logging.exception(exception.args)
+                reducers_to_remove.append(index)
+        for index in reversed(reducers_to_remove):
+            reducers.pop(index)
+        if reducers_to_remove:
+            with self._error_lock:
+                self._reducer_error_count += len(reducers_to_remove)
+        return state, time.perf_counter() - start
+
+    def _reduce(self, state: STATE, event: GenericEvent) -> STATE:
+        """
+        Reduce the state for a given event but make it "unbreakable" since the thread must always run.
+
+        Reducers raising an exception are removed.
+        :param state: the current state
+        :param event: the event to reduce
+        :return: the updated state
+        """
+        state, elapsed = self._run_reducers(state, event)
+        if elapsed is not None:
+            self._record_reduce_time(event.key, elapsed)
+        return state
+
+    def _record_reduce_time(self, key: str, elapsed: float):
+        calls, total, longest = self._reducer_timings.get(key, (0, 0.0, 0.0))
+        self._reducer_timings[key] = ReducerTiming(
+            calls + 1, total + elapsed, max(longest, elapsed)
+        )
+        if elapsed > self._slow_reducer_threshold and key not in self._slow_keys:
+            logging.warning("Reducing %s is slow (took %.3fs)", key, elapsed)
+            self._slow_keys.add(key)
+
+    def _shard_group(self, key: str) -> str:
+        # the key representing the group of keys reduced by the same worker
+        root = key
+        while (parent := self._shard_groups.get(root, root)) != root:
+            root = parent
+        if root != key:
+            self._shard_groups[key] = root
+        return root
+
+    def _join_shard_groups(self, keys: set[str]):
+        roots = {self._shard_group(key) for key in keys}
+        root = min(roots)
+        for other in roots:
+            self._shard_groups[other] = root
+        self._shard_groups[root] = root
+
+    def _shard_of(self, key: str) -> int:
+        group = self._shard_group(key)
+        # slow keys get the first worker to themselves so that they do not hold up other keys
+        if key in self._slow_keys or group in self._slow_groups:
+            self._slow_groups.add(group)
+            return 0
+        return 1 + hash(group) % (self._reducer_workers - 1)
+
+    def _record_reduced(self, stamped: StampedEvent):
+        if isinstance(stamped.event, EventData):
+            self._last_updates[stamped.key] = stamped.enqueued
+            self._provisional.pop(stamped.key, None)
+            attr_value = stamped.event.attr_value
+            self._last_values[stamped.key] = (attr_value.value, str(attr_value.type))
+            if self._history is not None:
+                source = stamped.source
+                self._history.record(
+                    stamped.key,
+                    stamped.event.attr_value.value,
+                    stamped.enqueued if source is None else source,
                 )
-                items_to_pop.append(key)
-        for key in items_to_pop:
-            self.subscriptions.pop(key)
-            self._reducers.pop(key)
+
+    def _reduce_stamped(self, state: STATE, stamped: StampedEvent) -> STATE:
+        stamped.reduce_start = time.time()
+        state = self._reduce(state, stamped.event)
+        stamped.reduce_end = time.time()
+        self._record_reduced(stamped)
+        return state
+
+    def _reduce_events(self, state: STATE, events: list[StampedEvent]) -> STATE:
+        for event in events:
+            state = self._reduce_stamped(state, event)
+        return state
+
+    def _reduce_shard(
+        self, state: STATE, events: list[StampedEvent]
+    ) -> tuple[STATE, STATE, list[tuple[str, float]]]:
+        """
+        Reduce the events of a shard (on a reducer worker) on a deep copy of the state.
+        :param state: the current state, only read
+        :param events: the events of the shard
+        :return: the copy of the state, the state returned by the reducers and their timings
+        """
+        start = reduced = copy.deepcopy(state)
+        timings: list[tuple[str, float]] = []
+        for stamped in events:
+            stamped.reduce_start = time.time()
+            reduced, elapsed = self._run_reducers(reduced, stamped.event)
+            stamped.reduce_end = time.time()
+            if elapsed is not None:
+                timings.append((stamped.key, elapsed))
+        return start, reduced, timings
+
+    def _reduce_sharded(self, state: STATE, events: list[StampedEvent]) -> STATE:
+        """
+        Reduce events on the reducer workers, sharded by event key.
+
+        Every shard reduces its events on its own deep copy of the state, the parts of the
+        state they changed are then merged into the state on this (the daemon) thread. When
+        shards changed the same part of the state (e.g. an aggregate over several keys, or the
+        whole state by returning a new one), the events are reduced again one after the other
+        on the state and the keys of those shards are reduced by the same worker from then on.
+        :param state: the current state
+        :param events: the (tango) events to reduce
+        :return: the updated state once all shards have been reduced
+        """
+        shards: dict[int, list[StampedEvent]] = defaultdict(list)
+        for event in events:
+            shards[self._shard_of(event.key)].append(event)
+        if len(shards) < 2 or self._reducer_executor is None:
+            return self._reduce_events(state, events)
+        futures = [
+            self._reducer_executor.submit(self._reduce_shard, state, shard)
+            for shard in shards.values()
+        ]
+        try:
+            # wait for all shards so that publishers only ever see a complete batch
+            results = [future.result() for future in futures]
+        # pylint: disable-next=broad-except
+        except Exception as exception:
+            # e.g. a state that can not be deep copied
+            logging.warning(
+                "Unable to reduce shards in parallel, reducing in order: %s", exception
+            )
+            return self._reduce_events(state, events)
+        merged, conflicts = _merge_shards(
+            state, [(start, reduced) for start, reduced, _ in results]
+        )
+        if conflicts:
+            shard_events = list(shards.values())
+            for conflict in conflicts:
+                self._join_shard_groups(
+                    {event.key for index in conflict for event in shard_events[index]}
+                )
+            self._shard_conflict_count += 1
+            return self._reduce_events(state, events)
+        for _, _, timings in results:
+            for key, elapsed in timings:
+                self._record_reduce_time(key, elapsed)
+        for event in events:
+            self._record_reduced(event)
+        return merged
+
+    def _reduce_batch(self, state: STATE, events: list[StampedEvent]) -> STATE:
+        """
+        Reduce a batch of events, sharded over the reducer workers when there are several.
+        :param state: the current state
+        :param events: the batch of events
+        :return: the updated state
+        """
+        if self._reducer_workers < 2:
+            return self._reduce_events(state, events)
+        pending: list[StampedEvent] = []
+        for event in events:
+            if isinstance(event.event, BaseAction):
+                # actions may update any part of the state so they are reduced on their own
+                state = self._reduce_stamped(self._reduce_sharded(state, pending), event)
+                pending = []
+            else:
+                pending.append(event)
+        return self._reduce_sharded(state, pending)
+
+    def _record_latencies(self, events: list[StampedEvent]):
+        if self._latency_metrics is None:
+            return
+        published = time.time()
+        for event in events:
+            self._latency_metrics.record(
+                event.key,
+                event.source,
+                event.enqueued,
+                event.reduce_start,
+                event.reduce_end,
+                published,
+            )
+
+    @property
+    def history(self) -> Union[HistoryStore, None]:
+        """
+        The store keeping the recent values of the monitored attributes
+        :return: the history store or None if the monitor does not record history
+        """
+        return self._history
+
+    def metrics(self) -> LatencyReport:
+        """
+        Get the latencies (p50/p95/p99) of the stages events went through, overall and per
+        event key: source (tango to queue), queue, reduce, publish and end to end.
+        :return: LatencyReport (empty unless the monitor collects metrics)
+        """
+        if self._latency_metrics is None:
+            return LatencyReport({}, {})
+        return self._latency_metrics.report()
+
+    def get_reducer_error_count(self) -> int:
+        """
+        Get the number of reducers removed because they raised an exception
+        :return: error count
+        """
+        return self._reducer_error_count
+
+    def get_publisher_error_count(self) -> int:
+        """
+        Get the number of publishers removed because they raised an exception
+        :return: error count
+        """
+        return self._publisher_error_count
+
+    def get_staleness(self) -> dict[str, float]:
+        """
+        Get the time since the last update of every monitored device attribute
+        :return: the time in seconds (since listening started if never updated) per event key
+        """
+        now = time.time()
+        keys = [
+            key
+            for key, reducers in self._reducers.items()
+            if any(isinstance(reducer, EventsReducer) for reducer in reducers)
+        ]
+        keys.extend(key for key in list(self._last_updates) if key not in self._reducers)
+        return {key: now - self._last_updates.get(key, self._listening_since) for key in keys}
+
+    def get_last_update(self, key: str) -> Union[float, None]:
+        """
+        Get the time an event of a device attribute was last queued
+        :param key: the event key
+        :return: the time in seconds since the epoch or None if never updated
+        """
+        return self._last_updates.get(key)
+
+    @property
+    def listening_since(self) -> float:
+        """
+        The time listening was started (or the monitor was created if not started yet)
+        :return: the time in seconds since the epoch
+        """
+        return self._listening_since
+
+    def start_watchdog(
+        self,
+        heartbeat: float = 60.0,
+        heartbeats: Union[dict[str, float], None] = None,
+        tick: float = 1.0,
+        failover: bool = True,
+    ) -> Any:
+        """
+        Watch the monitored device attributes for silence: attributes not updated within their
+        heartbeat are flagged as stale and (failover) polled until their event channel delivers
+        events again, see get_liveness.
+        :param heartbeat: the default time in seconds an attribute may be silent
+        :param heartbeats: the time in seconds specific attributes (event keys) may be silent
+        :param tick: the resolution in seconds of the watchdog's timer wheel
+        :param failover: poll stale attributes until their event channel recovers
+        :return: the StalenessWatchdog
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from ska_mid_jupyter_notebooks.monitoring.watchdog import StalenessWatchdog
+
+        if self._watchdog is None:
+            self._watchdog = StalenessWatchdog(self, heartbeat, heartbeats, tick, failover).start()
+        return self._watchdog
+
+    def stop_watchdog(self):
+        """
+        Stop the watchdog, switching failed over attributes back to events
+        :return: None
+        """
+        if self._watchdog:
+            self._watchdog.stop()
+            self._watchdog = None
+
+    def get_liveness(self) -> dict[str, Any]:
+        """
+        Get the liveness (time silent, heartbeat, stale, polling) of every monitored attribute
+        :return: the AttributeLiveness per event key (empty unless the watchdog is started)
+        """
+        if self._watchdog is None:
+            return {}
+        return self._watchdog.summary()
+
+    def start_metrics_exporter(self, port: int = 0, host: str = "0.0.0.0") -> Any:
+        """
+        Serve the monitor's metrics in OpenMetrics text format over HTTP (on /metrics) so they
+        can be scraped (e.g. by Prometheus). Nothing is served (or imported) unless started.
+        :param port: the port to listen on, 0 picks a free port
+        :param host: the interface to listen on
+        :return: the MetricsExporter (see its url)
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from ska_mid_jupyter_notebooks.monitoring.exporter import MetricsExporter
+
+        if self._exporter is None:
+            self._exporter = MetricsExporter(self, host, port).start()
+        return self._exporter
+
+    def stop_metrics_exporter(self):
+        """
+        Stop serving metrics
+        :return: None
+        """
+        if self._exporter:
+            self._exporter.stop()
+            self._exporter = None
+
+    def get_reducer_timings(self) -> dict[str, ReducerTiming]:
+        """
+        Get the execution time statistics of the reducers per event key
+        :return: the timings per event key
+        """
+        return dict(self._reducer_timings)
+
+    def get_slow_reducers(self) -> dict[str, ReducerTiming]:
+        """
+        Get the timings of the event keys whose reducers took longer than the slow reducer
+        threshold
+        :return: the timings per (slow) event key, slowest (on average) first
+        """
+        slow = [(key, self._reducer_timings[key]) for key in list(self._slow_keys)]
+        return dict(sorted(slow, key=lambda item: item[1].average, reverse=True))
+
+    def get_shard_conflict_count(self) -> int:
+        """
+        :return: the number of batches reduced again in order because shards changed the same
+            part of the state
+        """
+        return self._shard_conflict_count
+
+    def _publish(self, state: STATE, event_keys: Union[set[str], None] = None):
+        """
+        Publish results but make it "unbreakable" since the thread must always run.
+
+        Publishers raising an exception are removed.
+        :param state: the current state
+        :param event_keys: (when tracking dependencies) the keys of the events that updated
+            the state, None to publish every publisher
+        :return: None
+        """
+        publishers_to_remove: list[Publisher[STATE, Any]] = []
+        for publisher in self._affected_publishers(event_keys):
+            try:
+                if self._track_dependencies:
+                    self._update_dependencies(publisher, publisher.publish_tracked(state))
+                else:
+                    publisher.publish(state)
+            # pylint: disable-next=broad-except
+            except Exception as exception:
+                logging.exception(exception.args)
+                publishers_to_remove.append(publisher)
+        for publisher in publishers_to_remove:
+            self._remove_publisher(publisher)
+        self._publisher_error_count += len(publishers_to_remove)
+
+    def _publish_restored(self):
+        # rebuild the state by reducing the last event of each device attribute in the
+        # snapshot and publish it once so observers do not wait for the live events
+        if snapshot := self._restored:
+            self._restored = None
+            state = self.state
+            for event in _snapshot_events(snapshot):
+                state = self._reduce_restored(state, event)
+            self.state = state
+            self._publish(state)
+
+    def _reduce_restored(self, state: STATE, event: EventData) -> STATE:
+        # unlike live events, a restored value a reducer can not handle (e.g. a list instead
+        # of an array) is skipped without removing the reducer or counting an error
+        for reducer in list(self._reducers.get(event.key, [])):
+            try:
+                state = reducer.reduce(state, event)
+            # pylint: disable-next=broad-except
+            except Exception as exception:
+                logging.warning("Unable to restore %s: %s", event.key, exception)
+        return state
+
+    def _snapshot_if_due(self):
+        if self._snapshot_path and time.monotonic() >= self._next_snapshot:
+            self.save_snapshot()
+
+    def save_snapshot(self):
+        """
+        Save a snapshot of the state to the snapshot path (if the monitor has one)
+        :return: None
+        """
+        if not self._snapshot_path:
+            return
+        self._next_snapshot = time.monotonic() + self._snapshot_interval
+        try:
+            save_snapshot(
+                self._snapshot_path,
+                StateSnapshot(
+                    dict(self._last_values),
+                    {**self._provisional, **self._last_updates},
+                    time.time(),
+                ),
+            )
+        # pylint: disable-next=broad-except
+        except Exception as exception:
+            logging.warning("Unable to save the snapshot %s: %s", self._snapshot_path, exception)
+
+    def get_provisional(self) -> dict[str, float]:
+        """
+        Get the device attributes whose (warm started) value has not been confirmed by a live
+        event yet
+        :return: the time of the last update according to the snapshot per event key
+        """
+        return dict(self._provisional)
+
+    def is_provisional(self, key: str) -> bool:
+        """
+        Whether the (warm started) value of a device attribute has not been confirmed yet
+        :param key: the event key
+        :return: provisional
+        """
+        return key in self._provisional
 
     def _listening_daemon(self):
         """
         The daemon that listens for events and publishes them
         :return: None
         """
-        counter = 0
         try:
+            self._publish_restored()
             while self._running.is_set():
                 try:
-                    event = self._get()
+                    event = self._get_stamped()
                 except CancelledError:
                     return
-                state = self.state
-                # First reduce the state but make it "unbreakable" since the thread must always run
-                event_key_input = event.key
-                reducers_to_remove: list[int] = []
-                if reducers := self._reducers.get(event_key_input):
-                    for index, reducer in enumerate(reducers):
-                        try:
-                            state = reducer.reduce(state, event)
-                        # pylint: disable-next=broad-except
-                        except Exception as exception:
-                            logging.exception(exception.args)
-                            reducers_to_remove.append(index)
-                    for index in reducers_to_remove:
-                        reducers.pop(index)
-                # Publish results but make it "unbreakable" since the thread must always run
-                publishers_to_remove: list[int] = []
-                for index, publisher in enumerate(self._publishers):
-                    try:
-                        publisher.publish(state)
-                    # pylint: disable-next=broad-except
-                    except Exception as exception:
-                        logging.exception(exception.args)
-                        publishers_to_remove.append(index)
-                for index in publishers_to_remove:
-                    self._publishers.pop(index)
+                state = self._reduce_stamped(self.state, event)
+                self._publish(state, self._event_keys([event.event]))
+                self._record_latencies([event])
                 # Save the state
                 self.state = state
                 self._task_done()
+                self._snapshot_if_due()
                 time.sleep(0.5)
-                counter += 1
+            logging.info("exiting monitoring loop")
+        except Exception as exception:
+            logging.warning("exiting monitoring loop due to an unknown exception")
+            raise exception
+
+    def _batch_listening_daemon(self):
+        """
+        The daemon that drains all queued events, reduces them and publishes once per batch.
+        :return: None
+        """
+        try:
+            self._publish_restored()
+            while self._running.is_set():
+                try:
+                    events = self._get_stamped_batch(self._max_batch_latency, self._max_batch_size)
+                except CancelledError:
+                    return
+                state = self._reduce_batch(self.state, events)
+                self._publish(state, self._event_keys([event.event for event in events]))
+                self._record_latencies(events)
+                # Save the state
+                self.state = state
+                self._task_done(len(events))
+                self._snapshot_if_due()
             logging.info("exiting monitoring loop")
         except Exception as exception:
             logging.warning("exiting monitoring loop due to an unknown exception")
@@ -1147,7 +3495,15 @@ class MonState(EventsPusher, Generic[STATE]):
         Active the monitoring of state by updating and publishing changes in state from incoming events.
         :return: None
         """
-        self._daemon = Thread(target=self._listening_daemon, daemon=True)
+        target = (
+            self._batch_listening_daemon if self._loop_mode == "batch" else self._listening_daemon
+        )
+        if self._reducer_workers > 1 and self._reducer_executor is None:
+            self._reducer_executor = ThreadPoolExecutor(
+                max_workers=self._reducer_workers, thread_name_prefix="reducer"
+            )
+        self._daemon = Thread(target=target, daemon=True)
+        self._listening_since = time.time()
         self._running.set()
         self._daemon.start()
 
@@ -1178,3 +3534,5 @@ class MonState(EventsPusher, Generic[STATE]):
             self._running.clear()
             self.cancel_get()
             self._daemon.join(timeout=timeout)
+            if not self._daemon.is_alive():
+                self.save_snapshot()
@@ -0,0 +1,449 @@
+# pylint: disable=C,R
+"""Wait primitives driven by tango change events, falling back to polling."""
+
+import logging
+import time
+from queue import Empty, SimpleQueue
+from threading import Condition, Event, Lock
+from typing import Any, Callable, Literal, NamedTuple, Sequence, Union
+
+from tango import DevFailed, EventType
+
+
+class Transition(NamedTuple):
+    """A value of a waited on attribute."""
+
+    time: float
+    key: str
+    value: Any
+
+
+class WaitResult(NamedTuple):
+    """The outcome of a wait that succeeded."""
+
+    elapsed: float
+    values: dict[str, Any]
+    trace: list[Transition]
+
+
+class WaitTimeout(TimeoutError):
+    def __init__(self, message: str, values: dict[str, Any], trace: list[Transition]) -> None:
+        super().__init__(message)
+        self.values = values
+        self.trace = trace
+
+
+class EventError(Exception):
+    def __init__(self, key: str, event: Any) -> None:
+        super().__init__(f"Error event received from {key}: {event.errors}")
+        self.key = key
+        self.event = event
+
+
+def attribute_key(device: Any, attr: str) -> str:
+    """
+    Get the key of a device attribute in the values and trace of a wait
+    :param device: the device proxy
+    :param attr: the attribute
+    :return: device:attr
+    """
+    return f"{device.name()}:{attr}"
+
+
+Listener = Callable[[str, Any], None]
+
+
+class _SharedChannel:
+    def __init__(self, key: str, device: Any) -> None:
+        self.key = key
+        self.device = device
+        self.sub_id: Union[int, None] = None
+        self.listeners: list[Listener] = []
+        self.last_event: Any = None
+        self.lock = Lock()
+        # set once the subscription is made or has failed
+        self.ready = Event()
+        self.failure: Union[BaseException, None] = None
+
+    def push_event(self, event: Any):
+        with self.lock:
+            self.last_event = event
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(self.key, event)
+            # pylint: disable-next=broad-except
+            except Exception as exception:
+                logging.warning("Listener of %s raised: %s", self.key, exception)
+
+
+class SubscriptionHub:
+    def __init__(self, event_type: Any = EventType.CHANGE_EVENT) -> None:
+        """
+        Initialises SubscriptionHub class
+
+        Shares one tango event subscription per device attribute between every concurrent
+        listener. The subscription is made for the first listener and removed with the last one,
+        and a listener joining an existing subscription is given its latest event straight away
+        (as tango does on subscription).
+
+        :param event_type: the tango event type to subscribe to
+        :return: None
+        """
+        self._event_type = event_type
+        self._channels: dict[str, _SharedChannel] = {}
+        self._lock = Lock()
+
+    def listen(self, device: Any, attr: str, listener: Listener) -> str:
+        """
+        Add a listener to the events of a device attribute
+        :param device: the device proxy
+        :param attr: the attribute
+        :param listener: called with the attribute key (device:attr) and every event
+        :raises DevFailed: if the attribute can not be subscribed to, also raised to the
+            listeners that joined while the subscription was being made
+        :return: the attribute key to stop listening with
+        """
+        key = attribute_key(device, attr)
+        replayed = None
+        while True:
+            replay = False
+            with self._lock:
+                if (channel := self._channels.get(key)) is None:
+                    channel = self._channels[key] = _SharedChannel(key, device)
+                    channel.listeners.append(listener)
+                    break
+                if channel.ready.is_set():
+                    with channel.lock:
+                        if channel.last_event is replayed:
+                            channel.listeners.append(listener)
+                            return key
+                        replayed = channel.last_event
+                        replay = True
+            if replay:
+                # outside the locks as the listener may block, then again if an event came in
+                # meanwhile so that the listener does not end up with a stale value
+                if replayed is not None:
+                    listener(key, replayed)
+                continue
+            # another listener is subscribing, which involves network round trips, so wait
+            # for it outside of the lock and join the channel (or a new one) once it is done
+            channel.ready.wait()
+            if channel.failure:
+                raise channel.failure
+        try:
+            # tango pushes the current value while subscribing
+            channel.sub_id = device.subscribe_event(attr, self._event_type, channel)
+        except BaseException as exception:
+            channel.failure = exception
+            with self._lock:
+                if self._channels.get(key) is channel:
+                    del self._channels[key]
+            raise
+        finally:
+            channel.ready.set()
+        return key
+
+    def unlisten(self, key: str, listener: Listener):
+        """
+        Remove a listener, unsubscribing when it was the last one of the attribute
+        :param key: the attribute key
+        :param listener: the listener
+        :return: None
+        """
+        with self._lock:
+            if (channel := self._channels.get(key)) is None:
+                return
+            with channel.lock:
+                if listener in channel.listeners:
+                    channel.listeners.remove(listener)
+                if channel.listeners:
+                    return
+            del self._channels[key]
+        try:
+            channel.device.unsubscribe_event(channel.sub_id)
+        except DevFailed as exception:
+            logging.warning("Unable to unsubscribe from %s: %s", key, exception)
+
+    def subscription_count(self) -> int:
+        return len(self._channels)
+
+
+_hubs: dict[Any, SubscriptionHub] = {}
+_hubs_lock = Lock()
+
+
+def get_hub(event_type: Any = EventType.CHANGE_EVENT) -> SubscriptionHub:
+    """
+    Get the process wide subscription hub of an event type
+    :param event_type: the tango event type
+    :return: SubscriptionHub
+    """
+    with _hubs_lock:
+        if (hub := _hubs.get(event_type)) is None:
+            hub = _hubs[event_type] = SubscriptionHub(event_type)
+        return hub
+
+
+def _read(device: Any, attr: str) -> Any:
+    return device.read_attributes([attr])[0].value
+
+
+def wait_for_attributes(
+    attributes: Sequence[tuple[Any, str]],
+    predicate: Callable[[dict[str, Any]], bool],
+    timeout: Union[float, None] = 60.0,
+    poll_interval: float = 1.0,
+    on_transition: Union[Callable[[Transition], None], None] = None,
+    hub: Union[SubscriptionHub, None] = None,
+) -> WaitResult:
+    """
+    Wait until a predicate over the values of device attributes holds
+
+    The change events of every attribute are listened to for the duration of the wait (sharing
+    the subscription with concurrent waits), so the predicate is evaluated as soon as a value
+    changes. Attributes that can not be subscribed
+    to (or whose event channel reports an error) are read every poll interval instead.
+
+    :param attributes: the (device proxy, attribute) pairs to wait on
+    :param predicate: called with the latest value per attribute key (device:attr), once every
+        attribute has a value
+    :param timeout: the maximum time to wait in seconds, None to wait forever
+    :param poll_interval: the time in seconds between reads of polled attributes
+    :param on_transition: called with every new value of an attribute
+    :param hub: the subscription hub to listen with, defaults to the process wide one
+    :raises WaitTimeout: if the predicate does not hold within the timeout
+    :return: WaitResult
+    """
+    hub = hub or get_hub()
+    start = time.monotonic()
+    deadline = None if timeout is None else start + timeout
+    queue: "SimpleQueue[tuple[str, Any, bool]]" = SimpleQueue()
+    devices = {attribute_key(device, attr): (device, attr) for device, attr in attributes}
+    listening: list[str] = []
+    polled: set[str] = set()
+    values: dict[str, Any] = {}
+    trace: list[Transition] = []
+
+    def update(key: str, value: Any):
+        if key in values and values[key] == value:
+            return
+        values[key] = value
+        trace.append(transition := Transition(time.time(), key, value))
+        if on_transition:
+            on_transition(transition)
+
+    def poll():
+        for key in sorted(polled):
+            device, attr = devices[key]
+            try:
+                update(key, _read(device, attr))
+            except DevFailed as exception:
+                logging.warning("Unable to read %s: %s", key, exception)
+
+    def listener(key: str, event: Any):
+        if event.err:
+            queue.put((key, None, True))
+        else:
+            queue.put((key, event.attr_value.value, False))
+
+    try:
+        for key, (device, attr) in devices.items():
+            try:
+                listening.append(hub.listen(device, attr, listener))
+            except DevFailed:
+                logging.info("Unable to subscribe to %s, polling it", key)
+                polled.add(key)
+        poll()
+        next_poll = time.monotonic() + poll_interval
+        while True:
+            now = time.monotonic()
+            if polled and now >= next_poll:
+                poll()
+                next_poll = now + poll_interval
+            if len(values) == len(devices) and predicate(values):
+                return WaitResult(now - start, dict(values), trace)
+            if deadline is not None and now >= deadline:
+                raise WaitTimeout(
+                    f"Timed out waiting after {now - start:.1f} seconds", dict(values), trace
+                )
+            wait = None if deadline is None else deadline - now
+            if polled:
+                wait = next_poll - now if wait is None else min(wait, next_poll - now)
+            try:
+                items = [queue.get(timeout=wait)]
+            except Empty:
+                continue
+            # handle everything that arrived before evaluating the predicate again
+            while True:
+                try:
+                    items.append(queue.get_nowait())
+                except Empty:
+                    break
+            for key, value, err in items:
+                if not err:
+                    update(key, value)
+                elif key not in polled:
+                    logging.info("Event channel of %s failed, polling it", key)
+                    polled.add(key)
+                    next_poll = time.monotonic()
+    finally:
+        for key in listening:
+            hub.unlisten(key, listener)
+
+
+def wait_for_value(
+    device: Any,
+    attr: str,
+    predicate: Callable[[Any], bool],
+    timeout: Union[float, None] = 60.0,
+    poll_interval: float = 1.0,
+    on_transition: Union[Callable[[Transition], None], None] = None,
+    hub: Union[SubscriptionHub, None] = None,
+) -> WaitResult:
+    """
+    Wait until a predicate over the value of a device attribute holds
+    :param device: the device proxy
+    :param attr: the attribute
+    :param predicate: called with the latest value of the attribute
+    :param timeout: the maximum time to wait in seconds, None to wait forever
+    :param poll_interval: the time in seconds between reads if the attribute has to be polled
+    :param on_transition: called with every new value of the attribute
+    :param hub: the subscription hub to listen with, defaults to the process wide one
+    :raises WaitTimeout: if the predicate does not hold within the timeout
+    :return: WaitResult
+    """
+    key = attribute_key(device, attr)
+    return wait_for_attributes(
+        [(device, attr)],
+        lambda values: predicate(values[key]),
+        timeout,
+        poll_interval,
+        on_transition,
+        hub,
+    )
+
+
+class EventCondition(NamedTuple):
+    """An attribute of a device reaching an expected value."""
+
+    device: Any
+    attr: str
+    # the expected value, or a predicate over the value
+    value: Any
+
+    def matches(self, value: Any) -> bool:
+        if callable(self.value):
+            return bool(self.value(value))
+        # str covers e.g. DevState values expected by name
+        return bool(value == self.value) or str(value) == str(self.value)
+
+
+class ConditionArrival(NamedTuple):
+    """When the expected value of a condition arrived."""
+
+    condition: EventCondition
+    # when the event was received in seconds since the epoch, None if it never was
+    received: Union[float, None]
+    # the timestamp the device gave the value in seconds since the epoch
+    source_time: Union[float, None]
+
+    @property
+    def latency(self) -> Union[float, None]:
+        if self.received is None or self.source_time is None:
+            return None
+        return self.received - self.source_time
+
+
+class ConditionsResult(NamedTuple):
+    """The outcome of waiting on a set of conditions."""
+
+    satisfied: bool
+    elapsed: float
+    arrivals: list[ConditionArrival]
+
+    def pending(self) -> list[EventCondition]:
+        return [arrival.condition for arrival in self.arrivals if arrival.received is None]
+
+
+def _source_time(event: Any) -> Union[float, None]:
+    timestamp = getattr(event.attr_value, "time", None)
+    return timestamp.totime() if hasattr(timestamp, "totime") else None
+
+
+def wait_for_conditions(
+    conditions: Sequence[Union[EventCondition, tuple[Any, str, Any]]],
+    mode: Literal["all", "any"] = "all",
+    timeout: Union[float, None] = 150.0,
+    hub: Union[SubscriptionHub, None] = None,
+    on_event: Union[Callable[[Any], None], None] = None,
+    break_on_error: bool = False,
+) -> ConditionsResult:
+    """
+    Wait until all (or any) of a set of device attributes have reached their expected values
+
+    A condition is met by the first event carrying its expected value (including the event
+    given on subscription) and stays met. The thread blocks on a condition variable in between
+    events, and every attribute is listened to through one shared subscription however many
+    conditions and concurrent waits are on it.
+
+    :param conditions: the (device proxy, attribute, expected value or predicate) conditions
+    :param mode: "all" to wait for every condition, "any" for the first one
+    :param timeout: the maximum time to wait in seconds, None to wait forever
+    :param hub: the subscription hub to listen with, defaults to the process wide one
+    :param on_event: called with every event received
+    :param break_on_error: stop waiting as soon as an error event is received instead of
+        ignoring it
+    :raises DevFailed: if an attribute can not be subscribed to
+    :raises EventError: on the first error event if break_on_error is set
+    :return: ConditionsResult, not satisfied if the timeout expired
+    """
+    hub = hub or get_hub()
+    expected = [EventCondition(*condition) for condition in conditions]
+    received: list[Union[float, None]] = [None] * len(expected)
+    source_times: list[Union[float, None]] = [None] * len(expected)
+    by_key: dict[str, list[int]] = {}
+    for index, condition in enumerate(expected):
+        by_key.setdefault(attribute_key(condition.device, condition.attr), []).append(index)
+    arrived = Condition()
+    errors: list[EventError] = []
+    start = time.monotonic()
+
+    def listener(key: str, event: Any):
+        now = time.time()
+        if on_event:
+            on_event(event)
+        if event.err:
+            if break_on_error:
+                with arrived:
+                    errors.append(EventError(key, event))
+                    arrived.notify()
+            return
+        with arrived:
+            for index in by_key[key]:
+                if received[index] is None and expected[index].matches(event.attr_value.value):
+                    received[index] = now
+                    source_times[index] = _source_time(event)
+            arrived.notify()
+
+    def is_satisfied() -> bool:
+        met = (timestamp is not None for timestamp in received)
+        return all(met) if mode == "all" else any(met)
+
+    listening: list[str] = []
+    try:
+        for indices in by_key.values():
+            condition = expected[indices[0]]
+            listening.append(hub.listen(condition.device, condition.attr, listener))
+        with arrived:
+            satisfied = arrived.wait_for(lambda: bool(errors) or is_satisfied(), timeout)
+            if errors:
+                raise errors[0]
+            arrivals = [
+                ConditionArrival(condition, received[index], source_times[index])
+                for index, condition in enumerate(expected)
+            ]
+    finally:
+        for key in listening:
+            hub.unlisten(key, listener)
+    return ConditionsResult(satisfied, time.monotonic() - start, arrivals)
@@ -0,0 +1,249 @@
+# pylint: disable=C,R
+"""A watchdog flagging monitored attributes that went silent and failing them over to polling."""
+
+import logging
+import math
+import time
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Any, NamedTuple, Union
+
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import EventsSubscription
+
+if TYPE_CHECKING:
+    from ska_mid_jupyter_notebooks.monitoring.statemonitoring import MonState
+
+
+class TimerWheel:
+    def __init__(self, tick: float = 1.0, slots: int = 512) -> None:
+        """
+        Initialises TimerWheel class
+
+        A hashed timing wheel: a timer lands in the slot of its deadline tick (modulo the number
+        of slots) so scheduling is O(1) and advancing the wheel only visits the slots of the
+        elapsed ticks. Timers more than one turn away stay in their slot until their tick.
+
+        :param tick: the resolution of the wheel in seconds
+        :param slots: the number of slots of the wheel
+        :return: None
+        """
+        self._tick = tick
+        # the due tick per key per slot
+        self._slots: list[dict[str, int]] = [{} for _ in range(slots)]
+        self._slot_of: dict[str, int] = {}
+        self._current = math.floor(time.time() / tick)
+        self._lock = Lock()
+
+    def schedule(self, key: str, deadline: float):
+        """
+        Schedule (or reschedule) the timer of a key
+        :param key: the key
+        :param deadline: the time the timer is due in seconds since the epoch
+        :return: None
+        """
+        with self._lock:
+            self._cancel(key)
+            target = max(math.ceil(deadline / self._tick), self._current + 1)
+            slot = target % len(self._slots)
+            self._slots[slot][key] = target
+            self._slot_of[key] = slot
+
+    def _cancel(self, key: str):
+        if (slot := self._slot_of.pop(key, None)) is not None:
+            self._slots[slot].pop(key, None)
+
+    def cancel(self, key: str):
+        """
+        Cancel the timer of a key
+        :param key: the key
+        :return: None
+        """
+        with self._lock:
+            self._cancel(key)
+
+    def advance(self, now: float) -> list[str]:
+        """
+        Advance the wheel to the current time
+        :param now: the current time in seconds since the epoch
+        :return: the keys whose timers are due
+        """
+        due: list[str] = []
+        with self._lock:
+            target = math.floor(now / self._tick)
+            # no need to go around more than once
+            start = max(self._current + 1, target - len(self._slots) + 1)
+            for tick in range(start, target + 1):
+                slot = self._slots[tick % len(self._slots)]
+                for key, due_tick in list(slot.items()):
+                    if due_tick <= target:
+                        slot.pop(key)
+                        self._slot_of.pop(key, None)
+                        due.append(key)
+            self._current = max(self._current, target)
+        return due
+
+
+class AttributeLiveness(NamedTuple):
+    """The liveness of a monitored attribute."""
+
+    key: str
+    # seconds since the last update (or since listening started if never updated)
+    silent_for: float
+    heartbeat: float
+    stale: bool
+    polling: bool
+
+
+class StalenessWatchdog:
+    def __init__(
+        self,
+        monitor: "MonState[Any]",
+        heartbeat: float = 60.0,
+        heartbeats: Union[dict[str, float], None] = None,
+        tick: float = 1.0,
+        failover: bool = True,
+    ) -> None:
+        """
+        Initialises StalenessWatchdog class
+
+        Every monitored attribute has a timer on a single timer wheel that is due one heartbeat
+        after its last update. When it fires and the attribute has been updated in the meantime
+        it is simply rescheduled, otherwise the attribute is flagged as stale and (failover)
+        its subscription is switched to polling. A polled attribute is switched back as soon as
+        its tango event channel delivers an event again. The monitored attributes are looked up
+        on every tick so that attributes added later are watched and the timers of removed ones
+        are cancelled.
+
+        :param monitor: the monitor to watch
+        :param heartbeat: the default time in seconds an attribute may be silent
+        :param heartbeats: the time in seconds specific attributes (event keys) may be silent
+        :param tick: the resolution of the timer wheel in seconds
+        :param failover: poll stale attributes until their event channel recovers
+        :return: None
+        """
+        self._monitor = monitor
+        self._heartbeat = heartbeat
+        self._heartbeats = heartbeats or {}
+        self._tick = tick
+        self._failover = failover
+        self._wheel = TimerWheel(tick)
+        self._stale: set[str] = set()
+        self._watched: set[str] = set()
+        self._failovers = 0
+        self._stopped = Event()
+        self._thread: Union[Thread, None] = None
+
+    def heartbeat_of(self, key: str) -> float:
+        return self._heartbeats.get(key, self._heartbeat)
+
+    def _last_update(self, key: str) -> float:
+        return self._monitor.get_last_update(key) or self._monitor.listening_since
+
+    def _subscription(self, key: str) -> Union[EventsSubscription, None]:
+        subscription = self._monitor.subscriptions.get(key)
+        return subscription if isinstance(subscription, EventsSubscription) else None
+
+    def _update_watched(self):
+        keys = set(self._monitor.get_staleness())
+        for key in keys - self._watched:
+            self._wheel.schedule(key, self._last_update(key) + self.heartbeat_of(key))
+        for key in self._watched - keys:
+            self._wheel.cancel(key)
+            if key in self._stale:
+                self._stale.discard(key)
+                if subscription := self._subscription(key):
+                    subscription.stop_polling()
+        self._watched = keys
+
+    def start(self) -> "StalenessWatchdog":
+        """
+        Start watching the monitored attributes (on a background thread)
+        :return: self
+        """
+        self._update_watched()
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop watching and switch failed over subscriptions back to events
+        :return: None
+        """
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        for key in list(self._stale):
+            if subscription := self._subscription(key):
+                subscription.stop_polling()
+
+    def _run(self):
+        while not self._stopped.wait(self._tick):
+            now = time.time()
+            try:
+                self._update_watched()
+            # pylint: disable-next=broad-except
+            except Exception as exception:
+                logging.warning("Unable to update the watched attributes: %s", exception)
+            for key in self._wheel.advance(now):
+                if key not in self._watched:
+                    continue
+                try:
+                    self._check(key, now)
+                # pylint: disable-next=broad-except
+                except Exception as exception:
+                    logging.warning("Unable to check the liveness of %s: %s", key, exception)
+                    self._wheel.schedule(key, now + self.heartbeat_of(key))
+
+    def _check(self, key: str, now: float):
+        heartbeat = self.heartbeat_of(key)
+        subscription = self._subscription(key)
+        if subscription and subscription.polling_since is not None:
+            # failed over, switch back once the event channel is alive again
+            if (subscription.last_channel_event or 0) > subscription.polling_since:
+                subscription.stop_polling()
+                self._stale.discard(key)
+                logging.info("Event channel of %s recovered, stopped polling", key)
+            self._wheel.schedule(key, now + heartbeat)
+            return
+        deadline = self._last_update(key) + heartbeat
+        if deadline > now:
+            self._stale.discard(key)
+            self._wheel.schedule(key, deadline)
+            return
+        if key not in self._stale:
+            logging.warning("%s has not been updated for %.1fs", key, now - deadline + heartbeat)
+            self._stale.add(key)
+        if self._failover and subscription and subscription.start_polling(self._monitor):
+            self._failovers += 1
+            logging.warning("Polling %s until its event channel recovers", key)
+        self._wheel.schedule(key, now + heartbeat)
+
+    @property
+    def failover_count(self) -> int:
+        return self._failovers
+
+    def summary(self) -> dict[str, AttributeLiveness]:
+        """
+        Get the liveness of every watched attribute
+        :return: the liveness per event key
+        """
+        result: dict[str, AttributeLiveness] = {}
+        for key, silent_for in self._monitor.get_staleness().items():
+            subscription = self._subscription(key)
+            result[key] = AttributeLiveness(
+                key,
+                silent_for,
+                self.heartbeat_of(key),
+                key in self._stale,
+                bool(subscription and subscription.polling),
+            )
+        return result
+
+    def stale_keys(self) -> list[str]:
+        """
+        Get the attributes that have been silent for longer than their heartbeat
+        :return: the event keys
+        """
+        return sorted(self._stale)
@@ -0,0 +1,655 @@
+# pylint: disable=C,R
+"""Benchmark the state monitoring core against synthetic event storms.
+
+Four suites are available:
+
+- loop: the MonState event loop modes with a synthetic reducer per device attribute
+- telescope: MonState with the reducers and selectors of TelescopeModel, fed by stand in
+  devices pushing change events through the subscription multiplexer
+- poller: the poll cycles of DeviceAttrPoller reading stand in devices
+- dispatch: the overhead of accessing device attributes, commands and proxy methods through
+  TangoDeviceProxy, compared with resolving every name with dir() of the proxy
+
+Events are spread over the device attributes with Zipf distributed rates and a fraction of
+the attributes flap (toggle between two values on every update). Results are printed and can
+be written as JSON to track regressions between releases.
+"""
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Any, Iterator, NamedTuple, cast
+
+from tango.time_val import TimeVal
+
+from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment, TangoDeviceProxy
+from ska_mid_jupyter_notebooks.monitoring.metrics import LatencyReport
+from ska_mid_jupyter_notebooks.monitoring.standins import (
+    StandInDeviceFactory,
+    StandInTangoProxy,
+    SyntheticDevice,
+)
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
+    BaseSubscription,
+    DeviceAttribute,
+    DeviceAttrPoller,
+    EventData,
+    EventsPusher,
+    LoopMode,
+    MonState,
+    PollCycleReport,
+    Reducer,
+    Selector,
+    event_key,
+    explode_from_key,
+)
+from ska_mid_jupyter_notebooks.sut.state import TelescopeDeviceModel, get_telescope_state
+
+SUITES = ["loop", "telescope", "poller", "dispatch"]
+
+parser = argparse.ArgumentParser(description="Benchmarks the state monitoring core")
+parser.add_argument(
+    "-s",
+    "--suites",
+    nargs="+",
+    default=SUITES,
+    choices=SUITES,
+    help="the benchmark suites to run",
+)
+parser.add_argument(
+    "-n",
+    "--events",
+    type=int,
+    default=5000,
+    help="the number of synthetic events to push onto the monitor",
+)
+parser.add_argument(
+    "-d",
+    "--devices",
+    type=int,
+    default=60,
+    help="the number of synthetic devices producing events (loop and poller suites)",
+)
+parser.add_argument(
+    "-a",
+    "--attributes",
+    type=int,
+    default=1,
+    help="the number of attributes per synthetic device (loop and poller suites)",
+)
+parser.add_argument(
+    "--dishes",
+    type=int,
+    default=4,
+    help="the number of dishes of the telescope device model (telescope suite)",
+)
+parser.add_argument(
+    "-z",
+    "--zipf",
+    type=float,
+    default=1.1,
+    help="the exponent of the Zipf distribution of the update rates over the attributes",
+)
+parser.add_argument(
+    "-f",
+    "--flapping",
+    type=float,
+    default=0.05,
+    help="the fraction of (the most frequently updated) attributes that flap",
+)
+parser.add_argument(
+    "-r",
+    "--rate",
+    type=float,
+    default=0.0,
+    help="the total rate in events per second to push at, 0 pushes a single burst",
+)
+parser.add_argument(
+    "-t",
+    "--timeout",
+    type=float,
+    default=5.0,
+    help="the maximum time in seconds to spend on each benchmark",
+)
+parser.add_argument(
+    "-l",
+    "--max-batch-latency",
+    type=float,
+    default=0.05,
+    help="the maximum batch latency in seconds used for the batch loop mode",
+)
+parser.add_argument(
+    "-m",
+    "--modes",
+    nargs="+",
+    default=["single", "batch"],
+    choices=["single", "batch"],
+    help="the loop modes to benchmark (loop suite)",
+)
+parser.add_argument(
+    "--poll-cycles",
+    type=int,
+    default=20,
+    help="the number of poll cycles to measure (poller suite)",
+)
+parser.add_argument(
+    "--poll-rate",
+    type=float,
+    default=0.05,
+    help="the poll period in seconds (poller suite)",
+)
+parser.add_argument(
+    "--read-delay",
+    type=float,
+    default=0.001,
+    help="the time in seconds a stand in device takes to read its attributes",
+)
+parser.add_argument(
+    "--accesses",
+    type=int,
+    default=100000,
+    help="the number of device accesses to measure (dispatch suite)",
+)
+parser.add_argument("--seed", type=int, default=0, help="the seed of the event storm")
+parser.add_argument(
+    "-j",
+    "--json",
+    default=None,
+    help="write the results as JSON to this file ('-' for stdout)",
+)
+
+
+VALUES: dict[str, list[Any]] = {
+    "state": ["ON", "OFF", "ALARM", "FAULT", "STANDBY"],
+    "obsstate": [0, 1, 2, 3, 4, 5],
+}
+FLAPPING_VALUES: dict[str, tuple[Any, Any]] = {"state": ("ON", "ALARM"), "obsstate": (4, 5)}
+
+
+class _DirTangoDeviceProxy(TangoDeviceProxy):
+    """TangoDeviceProxy resolving every name with dir() of the proxy, as it used to."""
+
+    def __getattr__(self, name: str):
+        if name in dir(self._device_proxy):
+            return getattr(self._device_proxy, name)
+        return self.__getattribute__(name)
+
+
+class EventStorm:
+    def __init__(
+        self, keys: list[str], zipf: float = 1.1, flapping: float = 0.05, seed: int = 0
+    ) -> None:
+        """
+        Initialises EventStorm class
+
+        The keys are ranked in a random order and the update rate of the key of rank k is
+        proportional to 1 / k ** zipf. The highest ranked fraction (flapping) of the keys flap,
+        i.e. toggle between two values, while the others step through their possible values.
+
+        :param keys: the event keys (device:attr) to generate events for
+        :param zipf: the exponent of the Zipf distribution
+        :param flapping: the fraction of keys that flap
+        :param seed: the seed of the random generator
+        :return: None
+        """
+        self._random = random.Random(seed)
+        self.keys = list(keys)
+        self._random.shuffle(self.keys)
+        weights = [1 / rank**zipf for rank in range(1, len(self.keys) + 1)]
+        total = sum(weights)
+        self.weights = [weight / total for weight in weights]
+        self.flapping = set(self.keys[: round(len(self.keys) * flapping)])
+        self._values: dict[str, Iterator[Any]] = {}
+
+    def rate(self, key: str, total_rate: float) -> float:
+        """
+        Get the update rate of a key
+        :param key: the event key
+        :param total_rate: the total rate over all keys
+        :return: the rate in events per second
+        """
+        return self.weights[self.keys.index(key)] * total_rate
+
+    def next_value(self, key: str) -> Any:
+        """
+        Get the next value of a key
+        :param key: the event key
+        :return: the value
+        """
+        if (values := self._values.get(key)) is None:
+            attr = explode_from_key(key)[-1]
+            if key in self.flapping:
+                choices = list(FLAPPING_VALUES.get(attr, FLAPPING_VALUES["state"]))
+            else:
+                choices = VALUES.get(attr, VALUES["state"])
+            values = self._values[key] = itertools.cycle(choices)
+        return next(values)
+
+    def events(self, n_events: int) -> Iterator[tuple[str, str, Any]]:
+        """
+        Generate a stream of changes
+        :param n_events: the number of changes
+        :return: iterator of (device name, attribute, value)
+        """
+        for key in self._random.choices(self.keys, self.weights, k=n_events):
+            device_name, attr = explode_from_key(key)
+            yield device_name, attr, self.next_value(key)
+
+
+def synthetic_keys(n_devices: int, n_attributes: int) -> list[str]:
+    attrs = ["state", "obsstate", *[f"attr{index}" for index in range(2, n_attributes)]]
+    return [
+        event_key(f"bench/device/{device}", attr)
+        for device in range(n_devices)
+        for attr in attrs[:n_attributes]
+    ]
+
+
+def _paced(items: Iterator[Any], rate: float) -> Iterator[Any]:
+    # yields items at the given rate (as fast as possible for a rate of 0)
+    start = time.perf_counter()
+    for index, item in enumerate(items):
+        if rate and (delay := start + index / rate - time.perf_counter()) > 0:
+            time.sleep(delay)
+        yield item
+
+
+def _latencies(report: LatencyReport) -> dict[str, dict[str, float]]:
+    return {stage: summary._asdict() for stage, summary in report.stages.items()}
+
+
+class _NoSubscription(BaseSubscription):
+    def start(self, pusher: EventsPusher):
+        pass
+
+
+class _SyntheticReducer(Reducer[Any]):
+    def __init__(self, key: str, counter: list[int]) -> None:
+        self._key = key
+        self._counter = counter
+
+    def reduce(self, state: Any, event_or_action: Any) -> Any:
+        event = cast(EventData, event_or_action)
+        state["devices_states"][event.key] = event.attr_value.value
+        self._counter[0] += 1
+        return state
+
+    def generate_subscription(self) -> BaseSubscription:
+        return _NoSubscription()
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+
+class BenchmarkResult(NamedTuple):
+    suite: str
+    name: str
+    processed: int
+    elapsed: float
+    latencies: dict[str, dict[str, float]]
+    extra: dict[str, Any]
+
+    @property
+    def events_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def to_json(self) -> dict[str, Any]:
+        return {**self._asdict(), "events_per_second": self.events_per_second}
+
+
+def run_benchmark(
+    loop_mode: LoopMode,
+    n_events: int,
+    n_devices: int,
+    timeout: float,
+    max_batch_latency: float = 0.05,
+    n_attributes: int = 1,
+    zipf: float = 1.1,
+    flapping: float = 0.05,
+    seed: int = 0,
+) -> BenchmarkResult:
+    """
+    Push a burst of synthetic events onto a monitor and measure how fast they are handled.
+    :param loop_mode: the MonState loop mode to benchmark
+    :param n_events: the number of events in the burst
+    :param n_devices: the number of devices producing events
+    :param timeout: the maximum time in seconds to wait for the burst to be handled
+    :param max_batch_latency: the maximum batch latency (batch mode only)
+    :param n_attributes: the number of attributes per device
+    :param zipf: the exponent of the Zipf distribution of the update rates
+    :param flapping: the fraction of attributes that flap
+    :param seed: the seed of the event storm
+    :return: BenchmarkResult
+    """
+    storm = EventStorm(synthetic_keys(n_devices, n_attributes), zipf, flapping, seed)
+    devices: dict[str, SyntheticDevice] = {}
+    init_state = {"devices_states": {key: "UNKNOWN" for key in storm.keys}}
+    monitor = MonState(
+        init_state,
+        TangoDeployment("benchmark"),
+        loop_mode=loop_mode,
+        max_batch_latency=max_batch_latency,
+        collect_metrics=True,
+    )
+    counter = [0]
+    monitor.add_reducers([_SyntheticReducer(key, counter) for key in storm.keys])
+    for key in storm.keys:
+        monitor.add_observer(
+            lambda _: None,
+            Selector(lambda state, key=key: state["devices_states"][key]),
+        )
+    for device_name, attr, value in storm.events(n_events):
+        device = devices.setdefault(device_name, SyntheticDevice(device_name))
+        event_value = DeviceAttribute(value, time.time(), "DevString", attr)
+        monitor.push_event(
+            EventData(attr, event_value, device, False, [], "change", TimeVal.now())
+        )
+    start = time.perf_counter()
+    monitor.start_listening()
+    try:
+        while counter[0] < n_events and time.perf_counter() - start < timeout:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+    finally:
+        monitor.stop_listening(timeout)
+    return BenchmarkResult(
+        "loop", loop_mode, counter[0], elapsed, _latencies(monitor.metrics()), {}
+    )
+
+
+def run_telescope_benchmark(
+    n_events: int,
+    n_dishes: int,
+    timeout: float,
+    rate: float = 0.0,
+    zipf: float = 1.1,
+    flapping: float = 0.05,
+    seed: int = 0,
+) -> BenchmarkResult:
+    """
+    Push an event storm through stand in devices onto the monitor of a TelescopeModel (with its
+    reducers, aggregate selectors and observers) and measure how fast it is handled.
+    :param n_events: the number of events in the storm
+    :param n_dishes: the number of dishes of the telescope device model
+    :param timeout: the maximum time in seconds to wait for the storm to be handled
+    :param rate: the total rate in events per second, 0 pushes a single burst
+    :param zipf: the exponent of the Zipf distribution of the update rates
+    :param flapping: the fraction of attributes that flap
+    :param seed: the seed of the event storm
+    :return: BenchmarkResult
+    """
+    factory = StandInDeviceFactory()
+    device_model = TelescopeDeviceModel([f"{index:0>3}" for index in range(1, n_dishes + 1)], 1)
+    telescope = get_telescope_state(
+        device_model,
+        TangoDeployment("benchmark"),
+        factory,
+        loop_mode="batch",
+        coalesce=True,
+        track_dependencies=True,
+        collect_metrics=True,
+    )
+    monitor = telescope.state_monitor
+    telescope.subscribe_to_subarray_resource_state(lambda _: None)
+    telescope.subscribe_to_subarray_configurational_state(lambda _: None)
+    telescope.subscribe_to_subarray_scanning_state(lambda _: None)
+    telescope.subscribe_to_subarrays_obsstate(lambda _: None)
+    telescope.activate()
+    storm = EventStorm(list(telescope.state["devices_states"]), zipf, flapping, seed)
+    try:
+        monitor.block_until_empty()
+        handled_before = monitor.get_handled_count()
+        start = time.perf_counter()
+        for device_name, attr, value in _paced(storm.events(n_events), rate):
+            factory.get_device(device_name).emit(attr, value)
+        while monitor.get_queue_depth() and time.perf_counter() - start < timeout:
+            time.sleep(0.001)
+        monitor.block_until_empty()
+        elapsed = time.perf_counter() - start
+    finally:
+        monitor.stop_listening(timeout)
+    return BenchmarkResult(
+        "telescope",
+        f"{len(storm.keys)} attributes",
+        n_events,
+        elapsed,
+        _latencies(monitor.metrics()),
+        {
+            "handled": monitor.get_handled_count() - handled_before,
+            "coalesced": monitor.get_coalesced_count(),
+            "flapping": len(storm.flapping),
+        },
+    )
+
+
+def run_poller_benchmark(
+    n_devices: int,
+    n_attributes: int,
+    n_cycles: int,
+    timeout: float,
+    poll_rate: float = 0.05,
+    read_delay: float = 0.001,
+    zipf: float = 1.1,
+    flapping: float = 0.05,
+    seed: int = 0,
+) -> BenchmarkResult:
+    """
+    Poll stand in devices whose attributes change with Zipf distributed rates and measure the
+    poll cycles.
+    :param n_devices: the number of devices
+    :param n_attributes: the number of attributes per device
+    :param n_cycles: the number of poll cycles to measure
+    :param timeout: the maximum time in seconds to spend measuring
+    :param poll_rate: the poll period in seconds
+    :param read_delay: the time in seconds a device takes to read its attributes
+    :param zipf: the exponent of the Zipf distribution of the change rates
+    :param flapping: the fraction of attributes that flap
+    :param seed: the seed of the event storm
+    :return: BenchmarkResult
+    """
+    storm = EventStorm(synthetic_keys(n_devices, n_attributes), zipf, flapping, seed)
+    # the top ranked attribute changes on every read
+    changes = random.Random(seed)
+    top_weight = storm.weights[0]
+    change_probability = {
+        key: weight / top_weight for key, weight in zip(storm.keys, storm.weights)
+    }
+    values: dict[str, Any] = {}
+
+    def on_read(device_name: str, attr: str) -> Any:
+        key = event_key(device_name, attr)
+        if key not in values or changes.random() < change_probability[key]:
+            values[key] = storm.next_value(key)
+        return values[key]
+
+    factory = StandInDeviceFactory(read_delay)
+    poller = DeviceAttrPoller(factory, poll_rate=poll_rate)
+    pusher = EventsPusher()
+    cycles: list[PollCycleReport] = []
+    try:
+        for key in storm.keys:
+            device_name, attr = explode_from_key(key)
+            factory.get_device(device_name).on_read = on_read
+            poller.add_subscription(device_name, attr, pusher)
+        events_before = pusher.get_queue_depth()
+        start = time.perf_counter()
+        while len(cycles) < n_cycles and time.perf_counter() - start < timeout:
+            if (cycle := poller.last_cycle) and (not cycles or cycle is not cycles[-1]):
+                cycles.append(cycle)
+            time.sleep(poll_rate / 10)
+        elapsed = time.perf_counter() - start
+    finally:
+        poller.stop()
+    wall_times = sorted(cycle.wall_time for cycle in cycles)
+    reads = sum(len(cycle.read_times) for cycle in cycles)
+    return BenchmarkResult(
+        "poller",
+        f"{n_devices}x{n_attributes} attributes",
+        reads,
+        elapsed,
+        {},
+        {
+            "cycles": len(cycles),
+            "events": pusher.get_queue_depth() - events_before,
+            "wall_time_mean": sum(wall_times) / len(wall_times) if wall_times else 0.0,
+            "wall_time_p95": (
+                wall_times[min(len(wall_times) - 1, int(len(wall_times) * 0.95))]
+                if wall_times
+                else 0.0
+            ),
+            "wall_time_max": wall_times[-1] if wall_times else 0.0,
+            "schedule_lag_mean": poller.get_average_schedule_lag() or 0.0,
+            "timed_out": sum(len(cycle.timed_out) for cycle in cycles),
+            "failed": sum(len(cycle.failed) for cycle in cycles),
+        },
+    )
+
+
+def run_dispatch_benchmark(
+    n_accesses: int, read_delay: float = 0.001, max_dir_accesses: int = 1000
+) -> list[BenchmarkResult]:
+    """
+    Measure the time it takes to access attributes, commands and proxy methods of a device
+    through TangoDeviceProxy, and through a wrapper resolving every name with dir()
+    :param n_accesses: the number of accesses to measure
+    :param read_delay: the time in seconds the device takes to list its attributes or commands
+    :param max_dir_accesses: the maximum number of accesses to measure with dir(), which
+        introspects the device twice per access
+    :return: the BenchmarkResult of both wrappers
+    """
+    attributes = ["State", "obsState", "healthState", *[f"attr{index}" for index in range(40)]]
+    commands = ["On", "Off", "Configure", *[f"Command{index}" for index in range(20)]]
+    names = ["obsState", "On", "name", "read_attributes", "healthState", "Configure"]
+    results: list[BenchmarkResult] = []
+    for name, wrapper_class, accesses in [
+        ("dir", _DirTangoDeviceProxy, min(n_accesses, max_dir_accesses)),
+        ("cached", TangoDeviceProxy, n_accesses),
+    ]:
+        device = StandInTangoProxy("benchmark/dispatch/1", attributes, commands, read_delay)
+        wrapper = wrapper_class(device)
+        start = time.perf_counter()
+        for index in range(accesses):
+            getattr(wrapper, names[index % len(names)])
+        elapsed = time.perf_counter() - start
+        results.append(
+            BenchmarkResult(
+                "dispatch",
+                name,
+                accesses,
+                elapsed,
+                {},
+                {
+                    "per_access_seconds": elapsed / accesses,
+                    "introspections": device.introspections,
+                },
+            )
+        )
+    return results
+
+
+def _version() -> str:
+    try:
+        return metadata.version("ska-mid-jupyter-notebooks")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _print(result: BenchmarkResult):
+    unit = "accesses" if result.suite == "dispatch" else "events"
+    print(
+        f"{result.suite:>9} {result.name:>20}: {result.processed:>8} {unit} in "
+        f"{result.elapsed:8.3f}s = {result.events_per_second:12.1f} {unit}/s"
+    )
+    if end_to_end := result.latencies.get("end_to_end"):
+        print(
+            f"{'':>31}end to end p50 {end_to_end['p50'] * 1000:8.2f}ms "
+            f"p95 {end_to_end['p95'] * 1000:8.2f}ms p99 {end_to_end['p99'] * 1000:8.2f}ms"
+        )
+    if result.suite == "dispatch":
+        print(
+            f"{'':>31}{result.extra['per_access_seconds'] * 1e9:10.1f}ns per access, "
+            f"{result.extra['introspections']} introspections"
+        )
+    if result.suite == "poller":
+        print(
+            f"{'':>31}{result.extra['cycles']} cycles, wall time mean "
+            f"{result.extra['wall_time_mean'] * 1000:8.2f}ms "
+            f"max {result.extra['wall_time_max'] * 1000:8.2f}ms"
+        )
+
+
+def _main(args: argparse.Namespace):
+    results: list[BenchmarkResult] = []
+    storm = {"zipf": args.zipf, "flapping": args.flapping, "seed": args.seed}
+    if "loop" in args.suites:
+        for mode in cast(list[LoopMode], args.modes):
+            results.append(
+                run_benchmark(
+                    mode,
+                    args.events,
+                    args.devices,
+                    args.timeout,
+                    args.max_batch_latency,
+                    args.attributes,
+                    **storm,
+                )
+            )
+    if "telescope" in args.suites:
+        results.append(
+            run_telescope_benchmark(args.events, args.dishes, args.timeout, args.rate, **storm)
+        )
+    if "poller" in args.suites:
+        results.append(
+            run_poller_benchmark(
+                args.devices,
+                args.attributes,
+                args.poll_cycles,
+                args.timeout,
+                args.poll_rate,
+                args.read_delay,
+                **storm,
+            )
+        )
+    if "dispatch" in args.suites:
+        results.extend(run_dispatch_benchmark(args.accesses, args.read_delay))
+    for result in results:
+        _print(result)
+    dispatch_results = {result.name: result for result in results if result.suite == "dispatch"}
+    if dispatch_results.get("cached") and dispatch_results["cached"].elapsed:
+        speedup = (
+            dispatch_results["dir"].extra["per_access_seconds"]
+            / dispatch_results["cached"].extra["per_access_seconds"]
+        )
+        print(f"speedup cached vs dir dispatch: {speedup:.0f}x")
+    loop_results = [result for result in results if result.suite == "loop"]
+    if len(loop_results) > 1 and loop_results[0].events_per_second:
+        speedup = loop_results[-1].events_per_second / loop_results[0].events_per_second
+        print(f"speedup {loop_results[-1].name} vs {loop_results[0].name}: {speedup:.1f}x")
+    if args.json:
+        report = {
+            "version": _version(),
+            "python": platform.python_version(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": vars(args),
+            "results": [result.to_json() for result in results],
+        }
+        if args.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.json, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+
+
+def main():
+    _main(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,16 @@ from threading import Event
 from typing import Callable, List, Literal, NamedTuple, TypedDict, Union, cast
 
 from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment
+from ska_mid_jupyter_notebooks.monitoring.history import HistoryStore
 from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
-    DeviceAttrPoller,
     EventData,
     EventsReducer,
+    LoopMode,
     MonState,
     Reducer,
     RemoteDeviceFactory,
     Selector,
+    StateCounter,
     event_key,
     explode_from_key,
 )
@@ -22,8 +24,14 @@ DeviceDevState = Literal["ON", "ERROR", "DISABLE", "OFF", "UNKNOWN"]
 DeviceState = Union[DeviceDevState, "SubarrayObsState"]
 
 
+# the tmc devices "state" and the subarray devices "obsstate"
+AggregateGroup = Literal["tmc_devices_state", "subarrays_obsstate"]
+
+
 class TelescopeState(TypedDict):
     devices_states: dict[str, DeviceState]
+    # incrementally counted device states per aggregate group
+    aggregates: dict[AggregateGroup, StateCounter]
 
 
 SubarrayObsState = Literal[
@@ -118,10 +126,17 @@ class TelescopeModel:
         self._deployment = deployment
         # add device state reducers
         keys = [key for key in state_monitor.state["devices_states"].keys()]
-        dev_factory = RemoteDeviceFactory(self._deployment.tango_host)
-        poller = DeviceAttrPoller(dev_factory)
+        dev_factory = state_monitor.dev_factory
+        poller = state_monitor.poller
         reducers = [
-            EventsReducer(device, attr, self._reducer_set_device_attribute, dev_factory, poller)
+            EventsReducer(
+                device,
+                attr,
+                self._reducer_set_device_attribute,
+                dev_factory,
+                poller,
+                multiplexer=state_monitor.multiplexer,
+            )
             for device, attr in [explode_from_key(key) for key in keys]
         ]
         self.state_monitor.add_reducers(cast(list[Reducer[TelescopeState]], reducers))
@@ -132,9 +147,24 @@ class TelescopeModel:
         """Get the last poll latency"""
         return self.state_monitor.get_last_poll_latency()
 
+    def get_coalesced_count(self):
+        """Get the number of events replaced by a newer event for the same attribute"""
+        return self.state_monitor.get_coalesced_count()
+
+    def get_dropped_count(self):
+        """Get the number of dropped events"""
+        return self.state_monitor.get_dropped_count()
+
     def get_average_poll_latency(self):
         """Get the average poll latency"""
-        return self.state_monitor.get_last_poll_latency()
+        return self.state_monitor.get_average_poll_latency()
+
+    def metrics(self):
+        """
+        Get the latencies of the stages events go through (tango, queue, reducers, publishers),
+        empty unless the telescope state was created with collect_metrics
+        """
+        return self.state_monitor.metrics()
 
     @property
     def listening_state(self):
@@ -155,9 +185,7 @@ class TelescopeModel:
         :param observe_function: observe function
         """
 
-        input_telescope_agg_state_selector = self._generate_select_all_devices_agg_state(
-            self._device_model
-        )
+        input_telescope_agg_state_selector = self._generate_select_all_devices_agg_state()
         input_central_node_tel_state_selector = self._generate_select_device_attr(
             "ska_mid/tm_central/central_node", "telescopestate"
         )
@@ -214,43 +242,34 @@ class TelescopeModel:
         :return: None
         """
 
-        input_subarray_obsstates = [
-            self._generate_select_device_attr(device, "obsstate")
-            for device in self._device_model.subarray_devices()
-        ]
-
         def select_agg_subarray_resource_state(
-            *obsstates: SubarrayObsState,
+            state: TelescopeState,
         ) -> SubarrayResourceState:
             """
-            Select the subarray resource state based on the subarray observation states
-            :param obsstates: subarray observation states
+            Select the subarray resource state based on the subarray observation state counts
+            :param state: telescope state
             :return: SubarrayResourceState
             """
-            if all([obsstate == "EMPTY" for obsstate in obsstates]):
+            obsstates = state["aggregates"]["subarrays_obsstate"]
+            if obsstates.all("EMPTY"):
                 return "EMPTY"
-            elif all([obsstate == "IDLE" for obsstate in obsstates]):
+            elif obsstates.all("IDLE"):
                 return "COMPOSED"
-            elif any([obsstate == "RESOURCING" for obsstate in obsstates]):
+            elif obsstates.any("RESOURCING"):
                 return "RESOURCING"
             # if it is already passed COMPOSED
             elif any(
                 [
-                    any(
-                        [
-                            obsstate == "READY",
-                            obsstate == "CONFIGURING",
-                            obsstate == "SCANNING",
-                        ]
-                    )
-                    for obsstate in obsstates
+                    obsstates.any("READY"),
+                    obsstates.any("CONFIGURING"),
+                    obsstates.any("SCANNING"),
                 ]
             ):
                 return "COMPOSED"
             return "EMPTY"
 
         subarray_resource_state_selector = Selector[TelescopeState, SubarrayResourceState](
-            select_agg_subarray_resource_state, *input_subarray_obsstates
+            select_agg_subarray_resource_state
         )
         self.state_monitor.add_observer(observe_function, subarray_resource_state_selector)
 
@@ -263,30 +282,28 @@ class TelescopeModel:
         :param observe_function: observe function
         :return: None
         """
-        input_subarray_obsstates = [
-            self._generate_select_device_attr(device, "obsstate")
-            for device in self._device_model.subarray_devices()
-        ]
 
         def select_agg_subarray_config_state(
-            *obsstates: SubarrayObsState,
+            state: TelescopeState,
         ) -> SubarrayConfigurationState:
             """
-            Select the subarray configurational state based on the subarray observation states
-            :param obsstates: subarray observation states
+            Select the subarray configurational state based on the subarray observation state
+            counts
+            :param state: telescope state
             :return: SubarrayConfigurationState
             """
-            if any([obsstate == "CONFIGURING" for obsstate in obsstates]):
+            obsstates = state["aggregates"]["subarrays_obsstate"]
+            if obsstates.any("CONFIGURING"):
                 return "CONFIGURING"
-            elif all([obsstate == "READY" for obsstate in obsstates]):
+            elif obsstates.all("READY"):
                 return "READY"
             # if it is already passed READY
-            elif any([obsstate == "SCANNING" for obsstate in obsstates]):
+            elif obsstates.any("SCANNING"):
                 return "READY"
             return "NOT_CONFIGURED"
 
         subarray_resource_state_selector = Selector[TelescopeState, SubarrayConfigurationState](
-            select_agg_subarray_config_state, *input_subarray_obsstates
+            select_agg_subarray_config_state
         )
 
         self.state_monitor.add_observer(observe_function, subarray_resource_state_selector)
@@ -300,27 +317,24 @@ class TelescopeModel:
         :param observe_function: observe function
         :return: None
         """
-        input_subarray_obsstates = [
-            self._generate_select_device_attr(device, "obsstate")
-            for device in self._device_model.subarray_devices()
-        ]
 
         def select_agg_subarray_config_state(
-            *obsstates: SubarrayObsState,
+            state: TelescopeState,
         ) -> SubarrayScanningState:
             """
-            Select the subarray scanning state based on the subarray observation states
-            :param obsstates: subarray observation states
+            Select the subarray scanning state based on the subarray observation state counts
+            :param state: telescope state
             :return: SubarrayScanningState
             """
-            if any([obsstate == "SCANNING" for obsstate in obsstates]):
+            obsstates = state["aggregates"]["subarrays_obsstate"]
+            if obsstates.any("SCANNING"):
                 return "SCANNING"
-            if all([obsstate == "READY" for obsstate in obsstates]):
+            if obsstates.all("READY"):
                 return "READY"
             return "NOT_SCANNING"
 
         subarray_resource_state_selector = Selector[TelescopeState, SubarrayScanningState](
-            select_agg_subarray_config_state, *input_subarray_obsstates
+            select_agg_subarray_config_state
         )
 
         self.state_monitor.add_observer(observe_function, subarray_resource_state_selector)
@@ -358,13 +372,17 @@ class TelescopeModel:
 
         self.state_monitor.add_observer(observe_function, subarray_resource_state_selector)
 
-    def activate(self):
+    def activate(self, metrics_port: Union[int, None] = None):
         """
         Activate the state monitor
+        :param metrics_port: if given, serve the monitor's metrics for scraping on this port
+            (0 picks a free port, see state_monitor.start_metrics_exporter)
         :return: None
         """
         self.state_monitor.start_subscriptions()
         self.state_monitor.start_listening()
+        if metrics_port is not None:
+            self.state_monitor.start_metrics_exporter(metrics_port)
 
         # reducers
 
@@ -385,6 +403,8 @@ class TelescopeModel:
             else:
                 value = "UNKNOWN"
         state["devices_states"][event.key] = cast(DeviceState, str(value))
+        for counter in state["aggregates"].values():
+            counter.update(event.key, str(value))
         return state
 
     # factory functions for selectors
@@ -435,47 +455,91 @@ class TelescopeModel:
     @classmethod
     def _generate_select_all_devices_agg_state(
         cls,
-        device_model: TelescopeDeviceModel,
     ) -> Selector[TelescopeState, TelescopeAggState]:
         """
-        Generate a selector for a device attribute
+        Generate a selector for the aggregate state of the tmc devices
         :return selector
         """
-        input_selectors = [
-            cls._generate_select_device_attr(device, "state")
-            for device in device_model.tmc_devices()
-        ]
 
         def select_telescope_state(
-            *states: TelescopeAggState,
+            state: TelescopeState,
         ) -> TelescopeAggState:
             """
-            Select the telescope state based on the states of the devices
-            :param states: states of the devices
+            Select the telescope state based on the state counts of the devices
+            :param state: telescope state
             :return: TelescopeAggState
             """
-            if all([state == "ON" for state in states]):
+            states = state["aggregates"]["tmc_devices_state"]
+            if states.all("ON"):
                 return "ON"
-            elif any([state == "ERROR" for state in states]):
+            elif states.any("ERROR"):
                 return "ERROR"
-            elif any([state == "OFFLINE" for state in states]):
+            elif states.any("OFFLINE"):
                 return "OFFLINE"
-            elif all([state == "OFF" for state in states]):
+            elif states.all("OFF"):
                 return "OFF"
             else:
                 return "UNKNOWN"
 
-        return Selector[TelescopeState, TelescopeAggState](
-            select_telescope_state, *input_selectors
-        )
+        return Selector[TelescopeState, TelescopeAggState](select_telescope_state)
+
+    @classmethod
+    def generate_aggregates(
+        cls,
+        device_model: TelescopeDeviceModel,
+        devices_states: dict[str, DeviceState],
+    ) -> dict[AggregateGroup, StateCounter]:
+        """
+        Generate the state counters used by the aggregate selectors
+        :param device_model: the telescope device model
+        :param devices_states: the (initial) device states
+        :return: the state counter per aggregate group
+        """
+        tmc_keys = [event_key(device, "state") for device in device_model.tmc_devices()]
+        subarray_keys = [
+            event_key(device, "obsstate") for device in device_model.subarray_devices()
+        ]
+        return {
+            "tmc_devices_state": StateCounter({key: devices_states[key] for key in tmc_keys}),
+            "subarrays_obsstate": StateCounter(
+                {key: devices_states[key] for key in subarray_keys}
+            ),
+        }
 
 
 # run this after setting execution mode
 def get_telescope_state(
     device_model: TelescopeDeviceModel,
     deployment: TangoDeployment,
+    dev_factory: Union[RemoteDeviceFactory, None] = None,
+    history: Union[HistoryStore, None] = None,
+    snapshot_path: Union[str, None] = None,
+    loop_mode: LoopMode = "single",
+    coalesce: bool = False,
+    share_resources: bool = False,
+    track_dependencies: bool = False,
+    collect_metrics: bool = False,
 ) -> TelescopeModel:
-    """Get TMC mid telescope state"""
+    """Get TMC mid telescope state
+
+    :param device_model: the telescope device model
+    :param deployment: the tango deployment
+    :param dev_factory: the device factory to create the device proxies with (e.g. a stand in
+        for benchmarks), defaults to a factory of the deployment's tango host
+    :param history: record the device states in this history store (e.g. to find out how long
+        a subarray was CONFIGURING)
+    :param snapshot_path: warm start from (and save snapshots to) this file so that a
+        restarted kernel has (provisional) device states as soon as it is activated
+    :param loop_mode: the loop mode of the monitor, "batch" reduces all queued events in one go
+        and publishes once per batch (see MonState)
+    :param coalesce: only keep the newest pending event per device attribute (see MonState)
+    :param share_resources: use the process wide device factory (unless given), poller and
+        subscription multiplexer of the tango host (see MonState)
+    :param track_dependencies: only publish the selectors depending on the device attribute of
+        an event (see MonState)
+    :param collect_metrics: keep latency histograms of the stages events go through, see
+        TelescopeModel.metrics
+    """
     tmc_devices_states = {
         event_key(device, "state"): "UNKNOWN" for device in device_model.tm_devices()
     }
@@ -493,16 +557,29 @@ def get_telescope_state(
         event_key(device, "obsstate"): "UNKNOWN" for device in device_model.subarray_devices()
     }
 
+    devices_states = cast(
+        dict[str, DeviceState],
+        {
+            **tmc_devices_states,
+            **csp_device_states,
+            **subarray_device_obs_states,
+            **sdp_device_state,
+        },
+    )
     init_state = TelescopeState(
-        devices_states=cast(
-            dict[str, DeviceState],
-            {
-                **tmc_devices_states,
-                **csp_device_states,
-                **subarray_device_obs_states,
-                **sdp_device_state,
-            },
-        ),
+        devices_states=devices_states,
+        aggregates=TelescopeModel.generate_aggregates(device_model, devices_states),
+    )
+    monitor_state = MonState(
+        init_state,
+        deployment,
+        loop_mode=loop_mode,
+        coalesce=coalesce,
+        dev_factory=dev_factory,
+        share_resources=share_resources,
+        track_dependencies=track_dependencies,
+        collect_metrics=collect_metrics,
+        history=history,
+        snapshot_path=snapshot_path,
     )
-    monitor_state = MonState(init_state, deployment)
     return TelescopeModel(monitor_state, device_model, deployment)
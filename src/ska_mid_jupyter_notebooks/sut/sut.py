@@ -11,6 +11,7 @@ from ska_mid_jupyter_notebooks.cluster.cluster import (
     TangoDeployment,
     TangoDeviceProxy,
 )
+from ska_mid_jupyter_notebooks.monitoring.waiting import wait_for_value
 
 
 class TMCCentralNode(TangoDeviceProxy):
@@ -105,59 +106,61 @@ class TangoSUTDeployment(TangoDeployment):
 
     @property
     def tmc_central_node(self) -> TMCCentralNode:
-        return TMCCentralNode(self)
+        return self.cached_device(TMCCentralNode)
 
     @property
     def tmc_subarray(self) -> TMCSubarrayNode:
-        return TMCSubarrayNode(self)
+        return self.cached_device(TMCSubarrayNode)
 
     @property
     def tmc_dish_leafnode_001(self) -> DishLeafNode001:
-        return DishLeafNode001(self)
+        return self.cached_device(DishLeafNode001)
 
     @property
     def tmc_dish_leafnode_036(self) -> DishLeafNode036:
-        return DishLeafNode036(self)
+        return self.cached_device(DishLeafNode036)
 
     @property
     def tmc_csp_master_leaf_node(self) -> TMCCSPMasterLeafNode:
-        return TMCCSPMasterLeafNode(self)
+        return self.cached_device(TMCCSPMasterLeafNode)
 
     @property
     def csp_subarray(self) -> CSPSubarray:
-        return CSPSubarray(self)
+        return self.cached_device(CSPSubarray)
 
     @property
     def csp_controller(self) -> CSPController:
-        return CSPController(self)
+        return self.cached_device(CSPController)
 
     @property
     def cbf_subarray(self) -> CBFSubarray:
-        return CBFSubarray(self)
+        return self.cached_device(CBFSubarray)
 
     @property
     def cbf_controller(self) -> CBFController:
-        return CBFController(self)
+        return self.cached_device(CBFController)
 
     @property
     def sdp_controller(self) -> SDPController:
-        return SDPController(self)
+        return self.cached_device(SDPController)
 
     @property
     def sdp_subarray(self) -> SDPSubarray:
-        return SDPSubarray(self)
+        return self.cached_device(SDPSubarray)
 
     def load_dish_vcc_config(self):
         self.switch_csp_to_online()
         central_node = self.tmc_central_node
 
-        def is_dish_vcc_config_set(sleep_time: int) -> bool:
-            print(
-                f"TMC Central Node isDishVccConfigSet={central_node.isDishVccConfigSet} after {sleep_time}s"
-            )
-            return bool(central_node.isDishVccConfigSet)
-
-        wait_for_state(is_dish_vcc_config_set, max_sleep=360)
+        wait_for_value(
+            central_node,
+            "isDishVccConfigSet",
+            bool,
+            timeout=360,
+            on_transition=lambda transition: print(
+                f"TMC Central Node isDishVccConfigSet={transition.value}"
+            ),
+        )
         dish_cfg_json = json.dumps(
             {
                 "interface": "https://schema.skao.int/ska-mid-cbf-initsysparam/1.0",
@@ -189,13 +192,15 @@ class TangoSUTDeployment(TangoDeployment):
         )
         csp_controller.write_attribute("adminMode", 0)
 
-        def csp_off(total_sleep: int) -> bool:
-            print(
-                f"CSP Controller: adminMode={csp_controller.admin_mode}; State={csp_controller.State()} after {total_sleep}s."
-            )
-            return str(csp_controller.State()) == "OFF"
-
-        wait_for_state(csp_off, max_sleep=360)
+        wait_for_value(
+            csp_controller,
+            "State",
+            lambda state: str(state) == "OFF",
+            timeout=360,
+            on_transition=lambda transition: print(
+                f"CSP Controller: adminMode={csp_controller.admin_mode}; State={transition.value}"
+            ),
+        )
         print(
             f"CSP Controller: adminMode={csp_controller.admin_mode}; State={csp_controller.State()}"
         )
@@ -285,6 +290,9 @@ def wait_for_state(is_ready: Callable[[int], bool], max_sleep=60):
     """
     Wait for the DeviceProxy to reach the expected state.
 
+    This sleeps between checks, prefer waiting on change events with
+    ska_mid_jupyter_notebooks.monitoring.waiting.wait_for_value when the state is an attribute.
+
     :param device_proxy: the DeviceProxy
     :type device_proxy: AbstractDeviceProxy
     :param state: the DevState to reach
@@ -2,12 +2,11 @@
 from typing import Any, Callable, NamedTuple, TypedDict, cast
 
 from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
-    DeviceAttrPoller,
     EventData,
     EventsReducer,
+    LoopMode,
     MonState,
     Reducer,
-    RemoteDeviceFactory,
     Selector,
     event_key,
 )
@@ -40,18 +39,42 @@ class TestEquipmentModel:
         "mid-itf/skysimctl/4",
     ]
 
-    def __init__(self, test_equipment: TangoTestEquipment) -> None:
+    def __init__(
+        self,
+        test_equipment: TangoTestEquipment,
+        loop_mode: LoopMode = "single",
+        coalesce: bool = False,
+        share_resources: bool = False,
+        track_dependencies: bool = False,
+        collect_metrics: bool = False,
+    ) -> None:
         """
         Initialises TestEquipmentModel class
         :param test_equipment: TangoTestEquipment
+        :param loop_mode: the loop mode of the state monitor (see MonState)
+        :param coalesce: only keep the newest pending event per device attribute (see MonState)
+        :param share_resources: use the process wide device factory, poller and subscription
+            multiplexer of the tango host (see MonState)
+        :param track_dependencies: only publish the selectors depending on the device
+            attribute of an event (see MonState)
+        :param collect_metrics: keep latency histograms of the stages events go through, see
+            metrics()
         :return: None
         """
-        self._dev_factory = RemoteDeviceFactory(test_equipment.tango_host)
         init_state = EquipmentState(
             devices_states={f"{device}:state": "UNKNOWN" for device in test_equipment.devices}
         )
-        self.state_monitor: MonState[EquipmentState] = MonState(init_state, test_equipment)
-        poller = DeviceAttrPoller(self._dev_factory)
+        self.state_monitor: MonState[EquipmentState] = MonState(
+            init_state,
+            test_equipment,
+            loop_mode=loop_mode,
+            coalesce=coalesce,
+            share_resources=share_resources,
+            track_dependencies=track_dependencies,
+            collect_metrics=collect_metrics,
+        )
+        self._dev_factory = self.state_monitor.dev_factory
+        poller = self.state_monitor.poller
         reducers = [
             EventsReducer(
                 device,
@@ -59,6 +82,7 @@ class TestEquipmentModel:
                 self._reducer_set_device_attribute,
                 self._dev_factory,
                 poller=poller,
+                multiplexer=self.state_monitor.multiplexer,
             )
             for device in test_equipment.devices
         ]
@@ -72,12 +96,33 @@ class TestEquipmentModel:
         """
         return self.state_monitor.get_last_poll_latency()
 
+    def get_coalesced_count(self):
+        """
+        Get the number of events replaced by a newer event for the same attribute
+        :return: coalesced count
+        """
+        return self.state_monitor.get_coalesced_count()
+
+    def get_dropped_count(self):
+        """
+        Get the number of dropped events
+        :return: dropped count
+        """
+        return self.state_monitor.get_dropped_count()
+
     def get_average_poll_latency(self):
         """
         Get average poll latency
         :return: average poll latency
         """
-        return self.state_monitor.get_last_poll_latency()
+        return self.state_monitor.get_average_poll_latency()
+
+    def metrics(self):
+        """
+        Get the latencies of the stages events go through (tango, queue, reducers, publishers)
+        :return: LatencyReport (empty unless the model was created with collect_metrics)
+        """
+        return self.state_monitor.metrics()
 
     @property
     def listening_state(self):
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from typing import Any
+from unittest import mock
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment
+from ska_mid_jupyter_notebooks.monitoring.asyncmonitoring import (
+    AsyncAttrPoller,
+    AsyncDeviceFactory,
+    AsyncMonState,
+)
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
+    ActionProducer,
+    DeviceAttribute,
+    EventData,
+    Selector,
+)
+
+
+def select_foo(state: dict[str, str]) -> str:
+    return state["foo"]
+
+
+def test_async_monitor_waits_for_selected_value():
+    async def run():
+        monitor = AsyncMonState({"foo": "OFF"}, TangoDeployment("test"))
+        controller = ActionProducer[str]()
+
+        def reducer_set_foo(state: dict[str, str], action: str):
+            state["foo"] = action
+            return state
+
+        observed: list[str] = []
+        monitor.add_action_reducer(controller, reducer_set_foo)
+        monitor.add_observer(observed.append, Selector(select_foo))
+        await monitor.start_subscriptions()
+        monitor.start_listening()
+        try:
+            waiting = asyncio.create_task(monitor.wait_for(select_foo, "ON", timeout=5))
+            # actions pushed from other threads end up on the loop
+            thread = threading.Thread(target=controller.push_action, args=("ON",))
+            thread.start()
+            assert_that(await waiting).is_equal_to("ON")
+            thread.join()
+            assert_that(observed).is_equal_to(["ON"])
+            with pytest.raises(TimeoutError):  # the builtin one on python 3.10 too
+                await monitor.wait_for(select_foo, "OFF", timeout=0.05)
+        finally:
+            await monitor.stop_listening()
+        assert_that(monitor.listening_state).is_equal_to("Aborted")
+
+    asyncio.run(run())
+
+
+class StandInAsyncDevice:
+    def __init__(self, values: dict[str, Any]) -> None:
+        self.values = values
+        self.reads: list[list[str]] = []
+
+    def name(self) -> str:
+        return "dev/1"
+
+    async def read_attributes(self, attrs: list[str]) -> list[DeviceAttribute]:
+        self.reads.append(attrs)
+        return [DeviceAttribute(self.values[attr], "", "", attr) for attr in attrs]
+
+
+def test_async_poller_pushes_changed_values_only():
+    async def run():
+        device = StandInAsyncDevice({"state": "ON", "obsstate": 0})
+        factory = mock.Mock(spec=AsyncDeviceFactory)
+        factory.get_device = mock.AsyncMock(return_value=device)
+        poller = AsyncAttrPoller(factory, poll_rate=0.01)
+        pusher = mock.Mock()
+        await poller.add_subscription("dev/1", "state", pusher)
+        await poller.add_subscription("dev/1", "obsstate", pusher)
+        try:
+            while len(device.reads) < 3:
+                await asyncio.sleep(0.01)
+        finally:
+            poller.stop()
+        # both attributes are polled in one call
+        assert_that(device.reads[-1]).contains_only("state", "obsstate")
+        events: list[EventData] = [call.args[0] for call in pusher.push_event.call_args_list]
+        assert_that([event.attr_name for event in events]).contains_only("state", "obsstate")
+        assert_that(events).is_length(2)
+
+    asyncio.run(run())
+
+
+def test_async_poller_keeps_polling_after_an_unexpected_error():
+    async def run():
+        device = StandInAsyncDevice({"state": "ON"})
+        factory = mock.Mock(spec=AsyncDeviceFactory)
+        failures = [RuntimeError("boom")]
+
+        async def get_device(_: str):
+            if failures:
+                raise failures.pop()
+            return device
+
+        factory.get_device = mock.AsyncMock(side_effect=get_device)
+        poller = AsyncAttrPoller(factory, poll_rate=0.01)
+        pusher = mock.Mock()
+        await poller.add_subscription("dev/1", "state", pusher)
+        try:
+            for _ in range(200):
+                if pusher.push_event.called:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            poller.stop()
+        # the poll after the failed read went through
+        assert_that(failures).is_empty()
+        pusher.push_event.assert_called()
+
+    asyncio.run(run())
+
+
+def test_async_poller_pushes_the_current_value_to_new_subscribers():
+    async def run():
+        device = StandInAsyncDevice({"state": "ON"})
+        factory = mock.Mock(spec=AsyncDeviceFactory)
+        factory.get_device = mock.AsyncMock(return_value=device)
+        poller = AsyncAttrPoller(factory, poll_rate=0.01)
+        first, second = mock.Mock(), mock.Mock()
+        try:
+            first_id = await poller.add_subscription("dev/1", "state", first)
+            while len(device.reads) < 3:
+                await asyncio.sleep(0.01)
+            # the value did not change but the new subscriber has not seen it yet
+            second_id = await poller.add_subscription("dev/1", "state", second)
+            assert_that(second.push_event.call_args.args[0].attr_value.value).is_equal_to("ON")
+            first.push_event.assert_called_once()
+            poller.remove_subscription(first_id)
+            poller.remove_subscription(second_id)
+            assert_that(poller._values).is_empty()
+        finally:
+            poller.stop()
+
+    asyncio.run(run())
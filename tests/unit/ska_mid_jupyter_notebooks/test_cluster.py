@@ -0,0 +1,82 @@
+import os
+from unittest import mock
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_jupyter_notebooks.cluster.cluster import (
+    Environment,
+    TangoDeviceProxy,
+    clear_device_metadata,
+    get_device_metadata,
+)
+from ska_mid_jupyter_notebooks.monitoring.standins import StandInTangoProxy
+from ska_mid_jupyter_notebooks.sut.sut import TangoSUTDeployment
+
+
+def _device_proxy(fqdn: str) -> mock.Mock:
+    device_proxy = mock.Mock()
+    device_proxy.dev_name.return_value = fqdn.split("/", 1)[1]
+    device_proxy.get_db_host.return_value = "databaseds"
+    device_proxy.get_db_port.return_value = "10000"
+    device_proxy.info.return_value.dev_class = (
+        "SubarrayNode" if "subarray" in fqdn else "CentralNode"
+    )
+    device_proxy.get_attribute_list.return_value = ["obsState", "State"]
+    device_proxy.get_command_list.return_value = ["On", "Off"]
+    return device_proxy
+
+
+@mock.patch.dict(os.environ)
+@mock.patch("ska_mid_jupyter_notebooks.cluster.cluster.DeviceProxy", side_effect=_device_proxy)
+def test_device_wrappers_are_cached_and_introspected_lazily(device_proxy_class: mock.Mock):
+    clear_device_metadata()
+    sut = TangoSUTDeployment("main", Environment.CI, namespace_override="test")
+    central_node = sut.tmc_central_node
+    assert_that(sut.tmc_central_node).is_same_as(central_node)
+    assert_that(device_proxy_class.call_count).is_equal_to(1)
+    # no introspection until it is needed
+    central_node._device_proxy.get_attribute_list.assert_not_called()
+    assert_that(central_node.metadata.commands).is_equal_to({"On", "Off"})
+
+    # the metadata of a device class is shared by the wrappers of its devices
+    tmc_subarray = sut.tmc_subarray
+    csp_subarray = sut.csp_subarray
+    assert_that(tmc_subarray.metadata).is_same_as(csp_subarray.metadata)
+    calls = [
+        wrapper._device_proxy.get_attribute_list.call_count
+        for wrapper in (tmc_subarray, csp_subarray)
+    ]
+    assert_that(sum(calls)).is_equal_to(1)
+
+    sut.clear_device_cache()
+    assert_that(sut.tmc_central_node).is_not_same_as(central_node)
+
+
+def test_dispatch_does_not_introspect_on_every_access():
+    clear_device_metadata()
+    device = StandInTangoProxy("dev/a/1", ["obsState"], ["On"])
+    wrapper = TangoDeviceProxy(device)
+    device.values["obsState"] = 2
+    assert_that(wrapper.obsState).is_equal_to(2)
+    # attributes are read on every access
+    device.values["obsState"] = 4
+    assert_that(wrapper.obsState).is_equal_to(4)
+    # commands and proxy methods are bound on the wrapper
+    assert_that(wrapper.On).is_same_as(wrapper.On)
+    assert_that(wrapper.name()).is_equal_to("dev/a/1")
+    assert_that(vars(wrapper)).contains_key("On", "name")
+    with pytest.raises(AttributeError):
+        wrapper.Off
+    assert_that(device.introspections).is_equal_to(2)
+
+
+def test_device_metadata_is_kept_apart_per_tango_host():
+    clear_device_metadata()
+    first = StandInTangoProxy("dev/a/1", ["obsState"], ["On"], tango_host="first:10000")
+    second = StandInTangoProxy(
+        "dev/a/1", ["State"], ["Off"], tango_host="second:10000", dev_class="Other"
+    )
+    assert_that(get_device_metadata(first).attributes).is_equal_to({"obsState"})
+    assert_that(get_device_metadata(second).dev_class).is_equal_to("Other")
+    assert_that(get_device_metadata(second).commands).is_equal_to({"Off"})
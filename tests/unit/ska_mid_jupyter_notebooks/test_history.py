@@ -0,0 +1,115 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+from assertpy import assert_that
+from tango import DevState
+from tango.time_val import TimeVal
+
+from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment
+from ska_mid_jupyter_notebooks.monitoring.history import HistoryStore
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
+    DeviceAttribute,
+    EventData,
+    MonState,
+)
+
+
+def test_ring_buffer_keeps_latest_values_as_views():
+    store = HistoryStore(capacity=4)
+    for index in range(10):
+        store.record("dish/1:pointing", index * 0.5, float(index))
+    view = store.view("dish/1:pointing")
+    assert_that(view.times.tolist()).is_equal_to([6.0, 7.0, 8.0, 9.0])
+    assert_that(view.values.tolist()).is_equal_to([3.0, 3.5, 4.0, 4.5])
+    # a view on the buffer rather than a copy
+    assert_that(np.shares_memory(view.values, store.view("dish/1:pointing").values)).is_true()
+    with pytest.raises(ValueError):
+        view.values[0] = 0
+    assert_that(store.view("dish/1:pointing", 6.5, 8.0).values.tolist()).is_equal_to([3.5, 4.0])
+    # once full the next append overwrites the oldest entry of the view
+    store.record("dish/1:pointing", 5.0, 10.0)
+    assert_that(view.values.tolist()).is_equal_to([5.0, 3.5, 4.0, 4.5])
+
+
+def test_state_history_durations():
+    store = HistoryStore()
+    for timestamp, state in [(0.0, "IDLE"), (2.0, "CONFIGURING"), (5.0, "READY")]:
+        store.record("csp/subarray/01:obsstate", state, timestamp)
+    store.record("csp/subarray/01:state", DevState.ON, 1.0)
+    view = store.view("csp/subarray/01:obsstate")
+    assert_that(view.decoded()).is_equal_to(["IDLE", "CONFIGURING", "READY"])
+    assert_that(view.durations(end=6.0)).is_equal_to(
+        {"IDLE": 2.0, "CONFIGURING": 3.0, "READY": 1.0}
+    )
+    assert_that(store.get("csp/subarray/01:state").latest()).is_equal_to((1.0, "ON"))
+
+
+def test_memory_budget_rejects_new_keys():
+    store = HistoryStore(capacity=10, capacities={"big:attr": 100}, memory_budget=2000)
+    store.record("small:attr", 1, 0.0)
+    store.record("big:attr", 1, 0.0)
+    assert_that(store.keys()).is_equal_to(["small:attr"])
+    assert_that(store.rejected_keys).is_equal_to(["big:attr"])
+    assert_that(store.nbytes).is_equal_to(2 * 10 * 16)
+    assert_that(store.view("big:attr")).is_length(0)
+
+
+def test_numeric_arrays_are_kept_as_rows():
+    store = HistoryStore(capacity=8)
+    for index in range(10000):
+        store.record("dish/1:achievedPointing", np.array([index, 10.0, 20.0]), float(index))
+    # a value of another width does not fit the columns
+    store.record("dish/1:achievedPointing", [1.0, 2.0], 10000.0)
+    view = store.view("dish/1:achievedPointing", 9998.0)
+    assert_that(view.values.shape).is_equal_to((3, 3))
+    assert_that(view.values[:2].tolist()).is_equal_to([[9998.0, 10.0, 20.0], [9999.0, 10.0, 20.0]])
+    assert_that(np.isnan(view.values[2]).all()).is_true()
+    assert_that(store.nbytes).is_equal_to(2 * 8 * 8 * (1 + 3))
+
+
+def test_labels_count_against_the_budget():
+    store = HistoryStore(capacity=8, max_labels=3)
+    for index in range(10000):
+        store.record("dev/a/1:status", f"status {index}", float(index))
+        store.record("dev/a/1:obsstate", ["IDLE", "READY"][index % 2], float(index))
+    # too many distinct values
+    assert_that(store.rejected_keys).is_equal_to(["dev/a/1:status"])
+    assert_that(store.keys()).is_equal_to(["dev/a/1:obsstate"])
+    assert_that(store.view("dev/a/1:obsstate").decoded()[-2:]).is_equal_to(["IDLE", "READY"])
+    assert_that(store.nbytes).is_less_than(2 * 2 * 8 * 16 + 1000)
+
+    budget = 2 * 8 * 16 + 100
+    store = HistoryStore(capacity=8, memory_budget=budget)
+    for index in range(100):
+        store.record("dev/a/1:status", f"status {index}", float(index))
+    assert_that(store.rejected_keys).is_equal_to(["dev/a/1:status"])
+    assert_that(store.nbytes).is_less_than_or_equal_to(budget)
+
+
+def test_monitor_records_history():
+    device = mock.Mock()
+    device.name.return_value = "dev/a/1"
+    store = HistoryStore()
+    monitor = MonState({}, TangoDeployment("test"), loop_mode="batch", history=store)
+    monitor.add_events_reducer("dev/a/1", "temperature", lambda state, _: state)
+    for index, value in enumerate([20.0, 21.5]):
+        monitor.push_event(
+            EventData(
+                "temperature",
+                DeviceAttribute(value, "time", "DevDouble", "temperature"),
+                device,
+                False,
+                [],
+                "change",
+                TimeVal.fromtimestamp(100.0 + index),
+            )
+        )
+    try:
+        monitor.start_listening()
+        monitor.block_until_empty()
+    finally:
+        monitor.stop_listening(10)
+    view = store.view("dev/a/1:temperature")
+    assert_that(view.values.tolist()).is_equal_to([20.0, 21.5])
+    assert_that(view.times.tolist()).is_equal_to([100.0, 101.0])
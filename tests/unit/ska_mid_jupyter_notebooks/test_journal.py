@@ -0,0 +1,143 @@
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from assertpy import assert_that
+from tango import DevState
+from tango.time_val import TimeVal
+
+from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment
+from ska_mid_jupyter_notebooks.monitoring.journal import (
+    EventJournal,
+    read_journal,
+    replay_journal,
+)
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
+    BaseAction,
+    DeviceAttribute,
+    EventData,
+    EventsPusher,
+    MonState,
+)
+
+
+def make_event(device_name: str, attr: str, value: object, source: float) -> EventData:
+    device = mock.Mock()
+    device.name.return_value = device_name
+    return EventData(
+        attr,
+        DeviceAttribute(value, "time", "DevDouble", attr),
+        device,
+        False,
+        [],
+        "change",
+        TimeVal.fromtimestamp(source),
+    )
+
+
+def test_journal_records_pushed_events(tmp_path: Path):
+    path = str(tmp_path / "events.journal")
+    journal = EventJournal(path, flush_interval=0.01)
+    pusher = EventsPusher()
+    pusher.attach_journal(journal)
+    values = [DevState.ON, 1.5, 7, "text", None, True, [1, 2], [["a", 0.5], [DevState.OFF], []]]
+    for index, value in enumerate(values):
+        pusher.push_event(make_event("dev/a/1", f"attr{index}", value, 100.0 + index))
+    # actions are not journaled
+    pusher.push_event(BaseAction("ignored"))
+    journal.close()
+    records = list(read_journal(path))
+    assert_that([record.value for record in records]).is_equal_to(values)
+    assert_that(records[0].key).is_equal_to("dev/a/1:attr0")
+    assert_that(records[1].source).is_close_to(101.0, 1e-6)
+    assert_that(records[1].attr_type).is_equal_to("DevDouble")
+    assert_that(journal.records_written).is_equal_to(len(values))
+
+
+def test_journal_skips_events_dropped_on_overflow(tmp_path: Path):
+    path = str(tmp_path / "events.journal")
+    journal = EventJournal(path)
+    pusher = EventsPusher(max_queue_size=2, overflow="drop_newest")
+    pusher.attach_journal(journal)
+    for index in range(3):
+        pusher.push_event(make_event("dev/a/1", f"attr{index}", index, 100.0 + index))
+    journal.close()
+    assert_that([record.value for record in read_journal(path)]).is_equal_to([0, 1])
+    assert_that(pusher.get_overflow_count()).is_equal_to(1)
+
+
+def test_journal_rejects_values_it_cannot_encode(tmp_path: Path):
+    path = str(tmp_path / "events.journal")
+    journal = EventJournal(path)
+    journal.append(make_event("dev/a/1", "blob", object(), 1.0), 1.0)
+    journal.append(make_event("dev/a/1", "pair", (1, 2), 2.0), 2.0)
+    journal.close()
+    assert_that([record.value for record in read_journal(path)]).is_equal_to([[1, 2]])
+    assert_that(journal.records_failed).is_equal_to(1)
+    assert_that(journal.records_written).is_equal_to(1)
+
+
+def test_journal_flush_and_writer_keep_the_order(tmp_path: Path):
+    path = str(tmp_path / "events.journal")
+    journal = EventJournal(path, flush_interval=0.0001)
+    stop = threading.Event()
+
+    def flush():
+        while not stop.is_set():
+            journal.flush()
+
+    flushers = [threading.Thread(target=flush) for _ in range(4)]
+    for flusher in flushers:
+        flusher.start()
+    try:
+        for index in range(2000):
+            journal.append(make_event("dev/a/1", "count", index, index), index)
+    finally:
+        stop.set()
+        for flusher in flushers:
+            flusher.join()
+    journal.close()
+    assert_that([record.value for record in read_journal(path)]).is_equal_to(list(range(2000)))
+
+
+def test_read_journal_ignores_truncated_record(tmp_path: Path):
+    path = str(tmp_path / "events.journal")
+    journal = EventJournal(path)
+    journal.append(make_event("dev/a/1", "state", DevState.ON, 1.0), 1.0)
+    journal.append(make_event("dev/a/1", "state", DevState.OFF, 2.0), 2.0)
+    journal.close()
+    with open(path, "r+b") as file:
+        file.truncate(Path(path).stat().st_size - 1)
+    assert_that([record.value for record in read_journal(path)]).is_equal_to([DevState.ON])
+
+
+def test_replay_journal_into_fresh_monitor(tmp_path: Path):
+    path = str(tmp_path / "events.journal")
+    journal = EventJournal(path)
+    now = time.time()
+    for index in range(5):
+        journal.append(make_event("dev/a/1", "count", index, now + index), now + index)
+    journal.close()
+
+    def reducer_set_count(state: dict[str, int], event: EventData):
+        state["count"] = event.attr_value.value
+        state["updates"] += 1
+        return state
+
+    monitor = MonState({"count": -1, "updates": 0}, TangoDeployment("test"))
+    monitor.add_events_reducer("dev/a/1", "count", reducer_set_count)
+    try:
+        monitor.start_listening()
+        # as fast as possible
+        assert_that(replay_journal(path, monitor, speed=None)).is_equal_to(5)
+        monitor.block_until_empty()
+    finally:
+        monitor.stop_listening(10)
+    assert_that(monitor.state).is_equal_to({"count": 4, "updates": 5})
+
+    # the recorded 4 seconds at 100 times the speed
+    pusher = EventsPusher()
+    start = time.monotonic()
+    assert_that(replay_journal(path, pusher, speed=100)).is_equal_to(5)
+    assert_that(time.monotonic() - start).is_between(0.035, 1.0)
@@ -0,0 +1,37 @@
+from assertpy import assert_that
+
+from ska_mid_jupyter_notebooks.monitoring.metrics import EventLatencyMetrics, LatencyHistogram
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.record(0.001)
+    for _ in range(10):
+        histogram.record(0.5)
+    summary = histogram.summary()
+    assert_that(summary.count).is_equal_to(100)
+    assert_that(summary.p50).is_close_to(0.001, 0.0002)
+    assert_that(summary.p95).is_close_to(0.5, 0.1)
+    assert_that(summary.max).is_equal_to(0.5)
+    assert_that(summary.mean).is_close_to(0.0509, 0.0001)
+
+
+def test_latency_histogram_uses_fixed_memory():
+    histogram = LatencyHistogram()
+    buckets = len(histogram._counts)  # pylint: disable=protected-access
+    for index in range(10000):
+        histogram.record(index * 1e-4)
+    assert_that(histogram._counts).is_length(buckets)  # pylint: disable=protected-access
+
+
+def test_event_latency_metrics_per_stage_and_key():
+    metrics = EventLatencyMetrics()
+    metrics.record("dev/1:state", 10.0, 10.1, 10.3, 10.4, 10.5)
+    metrics.record("dev/2:state", None, 20.0, 20.0, 21.0, 21.0)
+    report = metrics.report()
+    assert_that(report.stages["source"].count).is_equal_to(1)
+    assert_that(report.stages["end_to_end"].count).is_equal_to(2)
+    assert_that(report.keys["dev/1:state"]["queue"].max).is_close_to(0.2, 1e-9)
+    assert_that(report.keys["dev/2:state"]).does_not_contain_key("source")
+    assert_that(report.slowest_keys("reduce", 1)[0][0]).is_equal_to("dev/2:state")
@@ -1,19 +1,47 @@
+import json
+import threading
+import time
+import urllib.request
 from enum import Enum
+from pathlib import Path
 from typing import Any, Callable, cast
 from unittest import mock
 
 import pytest
 from assertpy import assert_that
+from tango import DevError, DevFailed, DevState
+from tango.time_val import TimeVal
 
 from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment
+from ska_mid_jupyter_notebooks.monitoring.standins import StandInDeviceFactory
 from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
     STATE,
     ActionProducer,
+    BaseAction,
+    CoalescingQueue,
     DeviceAttribute,
+    DeviceAttrPoller,
     EventData,
     EventsPusher,
     MonState,
+    OverflowPolicy,
+    RemoteDeviceFactory,
     Selector,
+    StateCounter,
+    StateSnapshot,
+    SubscriptionMultiplexer,
+    UnableToStartSubscription,
+    get_shared_multiplexer,
+    get_shared_poller,
+    load_snapshot,
+    reset_shared_resources,
+    save_snapshot,
+)
+from ska_mid_jupyter_notebooks.sut.state import (
+    TelescopeDeviceModel,
+    TelescopeModel,
+    TelescopeState,
+    get_telescope_state,
 )
 
 
@@ -147,3 +175,730 @@ def test_state_monitoring_of_actions(mock_observer: Observer):
         assert_that(mock_observer.result).is_equal_to(ControlActions.OFF.value)
     finally:
         monitor.stop_listening(10)
+
+
+def test_state_monitoring_batch_mode_publishes_once_per_batch(
+    mock_provider: Provider, mock_device: mock.Mock
+):
+    init_state = {"foo": {"bar": "foo"}}
+    monitor = MonState(init_state, TangoDeployment("test"), loop_mode="batch")
+    observed: list[str] = []
+
+    def reducer_set_foo_bar_to_value(state: dict[str, dict[str, str]], event: EventData):
+        state["foo"]["bar"] = event.attr_value.value
+        return state
+
+    def select_foo_bar(state: dict[str, dict[str, str]]) -> str:
+        return state["foo"]["bar"]
+
+    monitor.add_events_reducer("mock_device", "mock_attr", reducer_set_foo_bar_to_value)
+    monitor.add_observer(observed.append, Selector(select_foo_bar))
+    monitor.start_subscriptions()
+    for value in ["first", "second", "last"]:
+        mock_provider.push_event(
+            EventData(
+                "mock_attr",
+                DeviceAttribute(value, "time", "type", "mock_attr"),
+                mock_device,
+                False,
+                "errors",
+                "event",
+                "reception_date",
+            )
+        )
+    try:
+        monitor.start_listening()
+        monitor.block_until_empty()
+        assert_that(observed).is_equal_to(["last"])
+    finally:
+        monitor.stop_listening(10)
+
+
+def test_coalescing_events_pusher_keeps_newest_event_per_key(mock_device: mock.Mock):
+    pusher = EventsPusher(coalesce=True)
+    other_device = mock.Mock()
+    other_device.name.return_value = "other_device"
+    for device, value in [
+        (mock_device, "first"),
+        (other_device, "other"),
+        (mock_device, "second"),
+        (mock_device, "last"),
+    ]:
+        pusher.push_event(
+            EventData(
+                "mock_attr",
+                DeviceAttribute(value, "time", "type", "mock_attr"),
+                device,
+                False,
+                "errors",
+                "event",
+                "reception_date",
+            )
+        )
+    assert_that(pusher.get_coalesced_count()).is_equal_to(2)
+    events = pusher._get_batch(0, 10)  # pylint: disable=protected-access
+    assert_that([event.attr_value.value for event in events]).is_equal_to(["last", "other"])
+    pusher._task_done(len(events))  # pylint: disable=protected-access
+    pusher.block_until_empty()
+
+
+def _wait_for_poll_cycle(poller: DeviceAttrPoller, attr_count: int):
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if (cycle := poller.last_cycle) and len(cycle.read_times) == attr_count:
+            return cycle
+        time.sleep(0.05)
+    raise TimeoutError("no complete poll cycle")
+
+
+def test_poller_reads_devices_concurrently():
+    delays = {"dev/a/1": 0.1, "dev/b/1": 0.1, "dev/c/1": 0.1, "dev/d/1": 0.3}
+    poller = DeviceAttrPoller(StandInDeviceFactory(delays=delays), poll_rate=0.05, max_workers=4)
+    pusher = EventsPusher()
+    try:
+        for device_name in delays:
+            poller.add_subscription(device_name, "state", pusher)
+        cycle = _wait_for_poll_cycle(poller, len(delays))
+        assert_that(cycle.wall_time).is_less_than(sum(delays.values()) - 0.1)
+        assert_that(poller.get_slowest_attributes(1)[0][0]).is_equal_to("dev/d/1/state")
+    finally:
+        poller.stop()
+
+
+def test_poller_reads_attributes_of_a_device_in_one_call():
+    factory = StandInDeviceFactory(delays={"dev/a/1": 0})
+    poller = DeviceAttrPoller(factory, poll_rate=0.05)
+    pusher = EventsPusher()
+    try:
+        for attr in ["state", "obsstate", "telescopestate"]:
+            poller.add_subscription("dev/a/1", attr, pusher)
+        _wait_for_poll_cycle(poller, 3)
+        assert_that(factory.devices["dev/a/1"].read_attributes_calls).contains(
+            ["state", "obsstate", "telescopestate"]
+        )
+    finally:
+        poller.stop()
+
+
+def test_poller_completes_cycles_when_a_read_raises_unexpectedly():
+    factory = StandInDeviceFactory(delays={"dev/a/1": 0, "dev/b/1": 0})
+    broken = factory.devices["dev/b/1"]
+    poller = DeviceAttrPoller(factory, poll_rate=0.05)
+    pusher = EventsPusher()
+    try:
+        for device_name in factory.devices:
+            poller.add_subscription(device_name, "state", pusher)
+        with mock.patch.object(broken, "read_attributes", side_effect=ValueError("broken")):
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                if (cycle := poller.last_cycle) and cycle.failed:
+                    break
+                time.sleep(0.05)
+            assert_that(poller.last_cycle.failed).is_equal_to(["dev/b/1/state"])
+            assert_that(poller.last_cycle.read_times).contains_only("dev/a/1/state")
+    finally:
+        poller.stop()
+
+
+def test_poller_stop_ends_the_polling_thread_and_its_thread_pool():
+    factory = StandInDeviceFactory(delays={"dev/a/1": 0})
+    poller = DeviceAttrPoller(factory, poll_rate=0.05)
+    poller.add_subscription("dev/a/1", "state", EventsPusher())
+    _wait_for_poll_cycle(poller, 1)
+    poller.stop()
+    poller._thread.join(5)
+    assert_that(poller._thread.is_alive()).is_false()
+    with pytest.raises(RuntimeError):
+        poller._executor.submit(lambda: None)
+    # a poller that never polled is stopped too
+    idle = DeviceAttrPoller(factory)
+    idle.stop()
+    with pytest.raises(RuntimeError):
+        idle._executor.submit(lambda: None)
+    # and so are the shared pollers when the shared resources are reset
+    shared = get_shared_poller("test:10000")
+    reset_shared_resources()
+    with pytest.raises(RuntimeError):
+        shared._executor.submit(lambda: None)
+
+
+def test_device_factory_keeps_polling_proxies_apart():
+    with mock.patch(
+        "ska_mid_jupyter_notebooks.monitoring.statemonitoring.DeviceProxy"
+    ) as mock_device_proxy:
+        mock_device_proxy.side_effect = lambda fqdn: mock.Mock(fqdn=fqdn)
+        factory = RemoteDeviceFactory("host:10000")
+        shared = factory.get_device("dev/a/1")
+        polling = factory.get_polling_device("dev/a/1", 3.0)
+        assert_that(polling).is_not_same_as(shared)
+        assert_that(polling.fqdn).is_equal_to("tango://host:10000/dev/a/1")
+        assert_that(factory.get_polling_device("dev/a/1", 3.0)).is_same_as(polling)
+        polling.set_timeout_millis.assert_called_once_with(3000)
+        shared.set_timeout_millis.assert_not_called()
+        factory.invalidate("dev/a/1")
+        assert_that(factory.get_polling_device("dev/a/1", 3.0)).is_not_same_as(polling)
+        assert_that(factory.get_device("dev/a/1")).is_not_same_as(shared)
+
+
+def test_device_factory_caches_proxies():
+    with mock.patch(
+        "ska_mid_jupyter_notebooks.monitoring.statemonitoring.DeviceProxy"
+    ) as mock_device_proxy:
+        mock_device_proxy.side_effect = lambda fqdn: mock.Mock(fqdn=fqdn)
+        factory = RemoteDeviceFactory("host:10000", max_size=2)
+        first = factory.get_device("dev/a/1")
+        assert_that(factory.get_device("dev/a/1")).is_same_as(first)
+        factory.get_device("dev/b/1")
+        factory.get_device("dev/c/1")
+        assert_that(factory.get_device("dev/a/1")).is_not_same_as(first)
+        stats = factory.get_cache_stats()
+        assert_that(stats.hits).is_equal_to(1)
+        assert_that(stats.misses).is_equal_to(4)
+        assert_that(stats.evictions).is_equal_to(2)
+        assert_that(stats.size).is_equal_to(2)
+
+
+def test_device_factory_invalidates_proxy_on_connection_error():
+    with mock.patch(
+        "ska_mid_jupyter_notebooks.monitoring.statemonitoring.DeviceProxy"
+    ) as mock_device_proxy:
+        mock_device_proxy.side_effect = lambda fqdn: mock.Mock(fqdn=fqdn)
+        factory = RemoteDeviceFactory("host:10000")
+        first = factory.get_device("dev/a/1")
+        error = DevError()
+        error.reason = "API_AttrNotFound"
+        factory.invalidate_on_connection_error("dev/a/1", DevFailed(error))
+        assert_that(factory.get_device("dev/a/1")).is_same_as(first)
+        error.reason = "API_CantConnectToDevice"
+        factory.invalidate_on_connection_error("dev/a/1", DevFailed(error))
+        assert_that(factory.get_device("dev/a/1")).is_not_same_as(first)
+        assert_that(factory.get_cache_stats().invalidations).is_equal_to(1)
+
+
+def test_poller_polls_each_subscription_at_its_own_period():
+    factory = StandInDeviceFactory(delays={"dev/fast/1": 0, "dev/slow/1": 0})
+    poller = DeviceAttrPoller(factory, poll_rate=3600)
+    pusher = EventsPusher()
+    try:
+        poller.add_subscription("dev/fast/1", "obsstate", pusher, period=0.05)
+        poller.add_subscription("dev/slow/1", "adminmode", pusher)
+        time.sleep(0.5)
+        assert_that(len(factory.devices["dev/fast/1"].read_attributes_calls)).is_greater_than(4)
+        assert_that(factory.devices["dev/slow/1"].read_attributes_calls).is_empty()
+        lag = poller.get_average_schedule_lag()
+        assert lag is not None
+        assert_that(lag).is_less_than(0.05)
+    finally:
+        poller.stop()
+
+
+def test_adaptive_poller_backs_off_unchanged_attributes():
+    factory = StandInDeviceFactory(delays={"dev/a/1": 0})
+    poller = DeviceAttrPoller(factory, adaptive=True, max_period=0.16)
+    pusher = EventsPusher()
+    try:
+        poller.add_subscription("dev/a/1", "adminmode", pusher, period=0.01)
+        time.sleep(0.6)
+        # without backing off this would have been around 60 reads
+        assert_that(len(factory.devices["dev/a/1"].read_attributes_calls)).is_less_than(15)
+        assert_that(poller.get_poll_intervals()).is_equal_to({"dev/a/1/adminmode": 0.16})
+        poller.reset_backoff()
+        assert_that(poller.get_poll_intervals()).is_equal_to({"dev/a/1/adminmode": 0.01})
+    finally:
+        poller.stop()
+
+
+def test_multiplexer_fails_every_subscriber_waiting_on_a_failed_start():
+    started = threading.Event()
+    release = threading.Event()
+
+    def get_device(_: str):
+        if not started.is_set():
+            started.set()
+            release.wait(5)
+            raise DevFailed()
+        return mock.Mock()
+
+    dev_factory = mock.Mock()
+    dev_factory.get_device.side_effect = get_device
+    multiplexer = SubscriptionMultiplexer(dev_factory)
+    errors: list[Exception] = []
+
+    def subscribe():
+        try:
+            multiplexer.subscribe("dev/a/1", "state", EventsPusher())
+        except UnableToStartSubscription as exception:
+            errors.append(exception)
+
+    threads = [threading.Thread(target=subscribe) for _ in range(2)]
+    threads[0].start()
+    started.wait(5)
+    threads[1].start()
+    # the second subscriber joins the channel and waits for it to start
+    while multiplexer.get_subscriber_counts() != {"dev/a/1:state": 2}:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert_that(errors).is_length(2)
+    # the second subscriber did not start the dropped channel again
+    assert_that(dev_factory.get_device.call_count).is_equal_to(1)
+    assert_that(multiplexer.get_subscriber_counts()).is_empty()
+
+
+def test_multiplexer_shares_one_subscription_per_device_attribute(
+    mock_device: mock.Mock, mock_provider: Provider, mock_event: EventData
+):
+    multiplexer = SubscriptionMultiplexer(RemoteDeviceFactory("test"))
+    first, second = EventsPusher(), EventsPusher()
+    first_id = multiplexer.subscribe("mock_device", "mock_attr", first)
+    mock_provider.push_event(mock_event)
+    second_id = multiplexer.subscribe("mock_device", "mock_attr", second)
+    mock_device.subscribe_event.assert_called_once()
+    assert_that(multiplexer.get_subscriber_counts()).is_equal_to({"mock_device:mock_attr": 2})
+    # the late subscriber gets the last event replayed
+    assert_that(second._get()).is_equal_to(mock_event)
+    assert_that(first._get()).is_equal_to(mock_event)
+    multiplexer.unsubscribe(first_id)
+    mock_device.unsubscribe_event.assert_not_called()
+    multiplexer.unsubscribe(second_id)
+    mock_device.unsubscribe_event.assert_called_once()
+    assert_that(multiplexer.get_subscriber_counts()).is_empty()
+
+
+def test_dependency_tracking_only_publishes_affected_selectors(
+    mock_provider: Provider, mock_event: EventData, mock_observer: Observer
+):
+    init_state = {
+        "devices_states": {"mock_device:mock_attr": "foo", "mock_device:other_attr": "foo"}
+    }
+    monitor = MonState(
+        init_state, TangoDeployment("test"), loop_mode="batch", track_dependencies=True
+    )
+
+    def reducer_set_device_attr(state: dict[str, dict[str, str]], event: EventData):
+        state["devices_states"][event.key] = event.attr_value.value
+        return state
+
+    def select_mock_attr(state: dict[str, dict[str, str]]) -> str:
+        return state["devices_states"]["mock_device:mock_attr"]
+
+    select_other_attr = mock.Mock(
+        side_effect=lambda state: state["devices_states"]["mock_device:other_attr"]
+    )
+    select_all = mock.Mock(side_effect=lambda state: len(state["devices_states"]))
+
+    monitor.add_events_reducer("mock_device", "mock_attr", reducer_set_device_attr)
+    monitor.add_events_reducer("mock_device", "other_attr", reducer_set_device_attr)
+    monitor.add_observer(mock_observer.observe_function, Selector(select_mock_attr))
+    monitor.add_observer(lambda _: None, Selector(select_other_attr))
+    monitor.add_observer(lambda _: None, Selector(select_all))
+    monitor.start_subscriptions()
+    try:
+        monitor.start_listening()
+        mock_provider.push_event(mock_event)
+        monitor.block_until_empty()
+        # the first publish records the dependencies
+        assert_that(select_other_attr.call_count).is_equal_to(1)
+        assert_that(select_all.call_count).is_equal_to(1)
+        mock_provider.push_event(mock_event)
+        monitor.block_until_empty()
+        assert_that(mock_observer.result).is_equal_to("value")
+        assert_that(select_other_attr.call_count).is_equal_to(1)
+        # iterating the state depends on everything
+        assert_that(select_all.call_count).is_equal_to(2)
+    finally:
+        monitor.stop_listening(1)
+
+
+def test_state_counter_counts_values_incrementally():
+    counter = StateCounter({"dev/1:state": "OFF", "dev/2:state": "OFF"})
+    assert_that(counter.all("OFF")).is_true()
+    assert_that(counter.update("dev/1:state", "ON")).is_true()
+    assert_that(counter.update("dev/3:state", "ON")).is_false()
+    assert_that(counter.count("ON")).is_equal_to(1)
+    assert_that(counter.any("ON")).is_true()
+    assert_that(counter.all("OFF")).is_false()
+    counter.update("dev/2:state", "ON")
+    assert_that(counter.all("ON")).is_true()
+    assert_that(counter.count("OFF")).is_equal_to(0)
+
+
+def test_telescope_agg_state_is_selected_from_counts():
+    device_model = TelescopeDeviceModel(["001"], 1)
+    devices_states = {
+        **{f"{device}:state": "OFF" for device in device_model.tmc_devices()},
+        **{f"{device}:obsstate": "UNKNOWN" for device in device_model.subarray_devices()},
+    }
+    state = TelescopeState(
+        devices_states=cast(Any, devices_states),
+        aggregates=TelescopeModel.generate_aggregates(device_model, cast(Any, devices_states)),
+    )
+    selector = TelescopeModel._generate_select_all_devices_agg_state()
+    assert_that(selector.select(state)).is_equal_to("OFF")
+
+    def event(device: str, attr: str, value: Any) -> EventData:
+        device_proxy = mock.Mock()
+        device_proxy.name.return_value = device
+        return EventData(
+            attr, DeviceAttribute(value, "", "", attr), device_proxy, False, [], "", ""
+        )
+
+    for device in device_model.tmc_devices():
+        state = TelescopeModel._reducer_set_device_attribute(state, event(device, "state", "ON"))
+    assert_that(selector.select(state)).is_equal_to("ON")
+    state = TelescopeModel._reducer_set_device_attribute(
+        state, event("mid-csp/control/0", "state", "ERROR")
+    )
+    assert_that(selector.select(state)).is_equal_to("ERROR")
+
+
+def test_telescope_state_keeps_the_monitor_defaults_unless_asked():
+    device_model = TelescopeDeviceModel(["001"], 1)
+    deployment = TangoDeployment("test")
+    monitor = get_telescope_state(device_model, deployment, StandInDeviceFactory()).state_monitor
+    assert_that(monitor._loop_mode).is_equal_to("single")
+    assert_that(isinstance(monitor._events, CoalescingQueue)).is_false()
+    assert_that(monitor.multiplexer).is_not_same_as(get_shared_multiplexer(deployment.tango_host))
+    assert_that(monitor._track_dependencies).is_false()
+    assert_that(monitor._latency_metrics).is_none()
+    monitor = get_telescope_state(
+        device_model,
+        deployment,
+        StandInDeviceFactory(),
+        loop_mode="batch",
+        coalesce=True,
+        share_resources=True,
+        track_dependencies=True,
+        collect_metrics=True,
+    ).state_monitor
+    try:
+        assert_that(monitor._loop_mode).is_equal_to("batch")
+        assert_that(monitor._events).is_instance_of(CoalescingQueue)
+        assert_that(monitor.multiplexer).is_same_as(get_shared_multiplexer(deployment.tango_host))
+        assert_that(monitor._track_dependencies).is_true()
+        assert_that(monitor._latency_metrics).is_not_none()
+    finally:
+        reset_shared_resources()
+
+
+def test_sharded_reducers_keep_per_key_order_and_report_slow_reducers():
+    init_state: dict[str, list[Any]] = {"dev/1:fast": [], "dev/2:slow": []}
+    monitor = MonState(
+        init_state,
+        TangoDeployment("test"),
+        loop_mode="batch",
+        reducer_workers=3,
+        slow_reducer_threshold=0.05,
+    )
+
+    def reducer_append_value(state: dict[str, list[Any]], event: EventData):
+        if event.attr_name == "slow":
+            time.sleep(0.1)
+        state[event.key].append(event.attr_value.value)
+        return state
+
+    published: list[tuple[int, int]] = []
+    monitor.add_events_reducer("dev/1", "fast", reducer_append_value)
+    monitor.add_events_reducer("dev/2", "slow", reducer_append_value)
+    monitor.add_observer(
+        published.append,
+        Selector(lambda state: (len(state["dev/1:fast"]), len(state["dev/2:slow"]))),
+    )
+
+    def event(device: str, attr: str, value: int) -> EventData:
+        device_proxy = mock.Mock()
+        device_proxy.name.return_value = device
+        return EventData(
+            attr, DeviceAttribute(value, "", "", attr), device_proxy, False, [], "", ""
+        )
+
+    for value in range(5):
+        monitor.push_event(event("dev/1", "fast", value))
+        monitor.push_event(event("dev/2", "slow", value))
+    try:
+        monitor.start_listening()
+        monitor.block_until_empty()
+    finally:
+        monitor.stop_listening(10)
+    assert_that(monitor.state["dev/1:fast"]).is_equal_to(list(range(5)))
+    assert_that(monitor.state["dev/2:slow"]).is_equal_to(list(range(5)))
+    # publishers only see complete batches
+    assert_that(published).is_equal_to([(5, 5)])
+    assert_that(monitor.get_slow_reducers()).contains_only("dev/2:slow")
+    assert_that(monitor.get_reducer_timings()["dev/2:slow"].calls).is_equal_to(5)
+
+
+def test_sharded_reducers_sharing_or_replacing_the_state():
+    devices = [f"dev/{index}" for index in range(8)]
+    counter = StateCounter({f"{device}:state": "OFF" for device in devices})
+    init_state: dict[str, Any] = {"counter": counter, "mode": None}
+    monitor = MonState(init_state, TangoDeployment("test"), loop_mode="batch", reducer_workers=5)
+
+    def reducer_count_state(state: dict[str, Any], event: EventData):
+        state["counter"].update(event.key, event.attr_value.value)
+        state[event.key] = event.attr_value.value
+        return state
+
+    def reducer_replace_state(state: dict[str, Any], event: EventData):
+        replaced = dict(state)
+        time.sleep(0.05)
+        replaced["mode"] = event.attr_value.value
+        return replaced
+
+    for device in devices:
+        monitor.add_events_reducer(device, "state", reducer_count_state)
+    monitor.add_events_reducer("dev/mode", "mode", reducer_replace_state)
+
+    def event(device: str, attr: str, value: str) -> EventData:
+        device_proxy = mock.Mock()
+        device_proxy.name.return_value = device
+        return EventData(
+            attr, DeviceAttribute(value, "", "", attr), device_proxy, False, [], "", ""
+        )
+
+    monitor.push_event(event("dev/mode", "mode", "MAINTENANCE"))
+    for device in devices:
+        monitor.push_event(event(device, "state", "ON"))
+    try:
+        monitor.start_listening()
+        monitor.block_until_empty()
+    finally:
+        monitor.stop_listening(10)
+    assert_that(monitor.state["mode"]).is_equal_to("MAINTENANCE")
+    for device in devices:
+        assert_that(monitor.state).contains_entry({f"{device}:state": "ON"})
+    assert_that(monitor.state["counter"].all("ON")).is_true()
+    assert_that(monitor.get_shard_conflict_count()).is_equal_to(1)
+
+
+def test_average_poll_latency_is_the_average_gap():
+    pusher = EventsPusher()
+    pusher._polling_keep_alive_timestamps.extend([0.0, 1.0, 3.0])  # pylint: disable=W0212
+    assert_that(pusher.get_average_poll_latency()).is_equal_to(1.5)
+
+
+def test_monitor_collects_latency_metrics(mock_event: EventData):
+    monitor = MonState(
+        {"foo": "bar"}, TangoDeployment("test"), loop_mode="batch", collect_metrics=True
+    )
+    monitor.add_events_reducer("mock_device", "mock_attr", lambda state, _: state)
+    monitor.push_event(mock_event._replace(reception_date=TimeVal.fromtimestamp(time.time() - 1)))
+    try:
+        monitor.start_listening()
+        monitor.block_until_empty()
+    finally:
+        monitor.stop_listening(10)
+    report = monitor.metrics()
+    assert_that(report.stages["source"].count).is_equal_to(1)
+    assert_that(report.stages["source"].max).is_greater_than_or_equal_to(1.0)
+    assert_that(report.keys["mock_device:mock_attr"]["end_to_end"].count).is_equal_to(1)
+
+
+def test_metrics_exporter_serves_openmetrics(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("USE_POLLING", "1")
+    dev_factory = StandInDeviceFactory(delays={"dev/a/1": 0.0})
+    poller = DeviceAttrPoller(dev_factory, poll_rate=0.05)
+    monitor = MonState(
+        {"devices_states": {}},
+        TangoDeployment("test"),
+        loop_mode="batch",
+        dev_factory=dev_factory,
+        poller=poller,
+        collect_metrics=True,
+    )
+
+    def reducer_set_device_state(state: dict[str, Any], event: EventData):
+        state["devices_states"][event.key] = event.attr_value.value
+        return state
+
+    monitor.add_events_reducer("dev/a/1", "state", reducer_set_device_state)
+    monitor.start_subscriptions()
+    monitor.start_listening()
+    exporter = monitor.start_metrics_exporter(port=0, host="127.0.0.1")
+    try:
+        _wait_for_poll_cycle(poller, 1)
+        monitor.block_until_empty()
+        with urllib.request.urlopen(exporter.url, timeout=5) as response:
+            content_type = response.headers["Content-Type"]
+            body = response.read().decode()
+    finally:
+        monitor.stop_metrics_exporter()
+        monitor.stop_listening(10)
+        poller.stop()
+    assert_that(content_type).starts_with("application/openmetrics-text")
+    lines = body.splitlines()
+    assert_that(lines[-1]).is_equal_to("# EOF")
+    events_total = next(line for line in lines if line.startswith("ska_mid_monitor_events_total"))
+    assert_that(int(events_total.split()[1])).is_greater_than(0)
+    assert_that(lines).contains("ska_mid_monitor_queue_depth 0")
+    assert_that(lines).contains("ska_mid_monitor_reducer_errors_total 0")
+    assert_that(body).contains('ska_mid_monitor_attribute_staleness_seconds{device="dev/a/1",')
+    assert_that(body).contains("ska_mid_monitor_poll_cycle_seconds ")
+    assert_that(body).contains('ska_mid_monitor_latency_seconds{stage="reduce",quantile="0.99"}')
+    # polled events are stamped with the poll time
+    assert_that(monitor.metrics().stages["source"].max).is_less_than(5)
+
+
+def test_subscriptions_are_started_concurrently_with_timings():
+    monitor = MonState({}, TangoDeployment("test"))
+    devices = [f"dev/a/{index}" for index in range(8)]
+    for device_name in [*devices, "dev/missing/1"]:
+        monitor.add_events_reducer(device_name, "state", lambda state, _: state)
+
+    def subscribe(device_name: str, attr: str, *_: Any) -> int:
+        time.sleep(0.1)
+        if device_name == "dev/missing/1":
+            raise UnableToStartSubscription(device_name, attr, "not defined")
+        return 1
+
+    with mock.patch.object(monitor.multiplexer, "subscribe", side_effect=subscribe):
+        report = monitor.start_subscriptions(max_workers=9)
+    assert_that(report.wall_time).is_less_than(0.5)
+    assert_that(report.start_times).is_length(9)
+    assert_that(report.slowest(1)[0][1]).is_greater_than_or_equal_to(0.1)
+    assert_that(report.failed).contains_only("dev/missing/1:state")
+    assert_that(monitor.subscriptions).does_not_contain_key("dev/missing/1:state")
+    assert_that(monitor.subscription_start).is_equal_to(report)
+
+
+def test_monitor_warm_starts_from_snapshot(mock_event: EventData, tmp_path: Path):
+    snapshot_path = str(tmp_path / "state.snapshot")
+
+    def reducer_set_foo(state: dict[str, str], event: EventData):
+        state["foo"] = event.attr_value.value
+        return state
+
+    def create_monitor() -> MonState[dict[str, str]]:
+        monitor = MonState(
+            {"foo": "UNKNOWN", "bar": "UNKNOWN"},
+            TangoDeployment("test"),
+            loop_mode="batch",
+            snapshot_path=snapshot_path,
+        )
+        monitor.add_events_reducer("mock_device", "mock_attr", reducer_set_foo)
+        return monitor
+
+    monitor = create_monitor()
+    monitor.push_event(mock_event)
+    try:
+        monitor.start_listening()
+        monitor.block_until_empty()
+    finally:
+        monitor.stop_listening(10)
+
+    # no pickled objects, only the values and update times of the device attributes
+    with open(snapshot_path, encoding="utf-8") as file:
+        saved = json.load(file)
+    assert_that(saved["version"]).is_equal_to(1)
+    assert_that(saved["values"]).is_equal_to(
+        {"mock_device:mock_attr": {"value": "value", "type": "type"}}
+    )
+
+    # as if the kernel restarted
+    monitor = create_monitor()
+    assert_that(monitor.get_provisional()).contains_only("mock_device:mock_attr")
+    observer = Observer()
+    monitor.add_observer(observer.observe_function, Selector(lambda state: state["foo"]))
+    try:
+        monitor.start_listening()
+        # the restored state is published without waiting for events
+        deadline = time.time() + 5
+        while observer.result is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert_that(observer.result).is_equal_to("value")
+        monitor.push_event(mock_event)
+        monitor.block_until_empty()
+        assert_that(monitor.is_provisional("mock_device:mock_attr")).is_false()
+    finally:
+        monitor.stop_listening(10)
+
+
+def test_restored_values_do_not_remove_reducers(mock_event: EventData, tmp_path: Path):
+    snapshot_path = str(tmp_path / "state.snapshot")
+    # a value the reducer does not expect
+    save_snapshot(
+        snapshot_path,
+        StateSnapshot({"mock_device:mock_attr": ([1, 2], "type")}, {}, time.time()),
+    )
+
+    def reducer_set_foo(state: dict[str, str], event: EventData):
+        state["foo"] = event.attr_value.value.upper()
+        return state
+
+    monitor = MonState(
+        {"foo": "UNKNOWN"}, TangoDeployment("test"), loop_mode="batch", snapshot_path=snapshot_path
+    )
+    monitor.add_events_reducer("mock_device", "mock_attr", reducer_set_foo)
+    try:
+        monitor.start_listening()
+        monitor.push_event(mock_event)
+        monitor.block_until_empty()
+    finally:
+        monitor.stop_listening(10)
+    assert_that(monitor.get_reducer_error_count()).is_zero()
+    assert_that(monitor.state).is_equal_to({"foo": "VALUE"})
+
+
+def test_snapshot_round_trips_tango_values(tmp_path: Path):
+    snapshot_path = str(tmp_path / "state.snapshot")
+    values = {
+        "dev/a/1:state": (DevState.ON, "DevState"),
+        "dev/a/1:pointing": ((1.5, 2.5), "DevDouble"),
+        "dev/a/1:obsmode": (None, "DevString"),
+        "dev/a/1:opaque": (object(), "DevEncoded"),
+    }
+    save_snapshot(snapshot_path, StateSnapshot(values, {"dev/a/1:state": 1.0}, 2.0))
+    snapshot = load_snapshot(snapshot_path)
+    assert snapshot
+    assert_that(snapshot.values).is_equal_to(
+        {
+            "dev/a/1:state": (DevState.ON, "DevState"),
+            "dev/a/1:pointing": ([1.5, 2.5], "DevDouble"),
+            "dev/a/1:obsmode": (None, "DevString"),
+        }
+    )
+    assert_that(snapshot.values["dev/a/1:state"][0]).is_instance_of(DevState)
+    assert_that(snapshot.updated).is_equal_to({"dev/a/1:state": 1.0})
+
+
+def _pending_values(pusher: EventsPusher) -> list[Any]:
+    values: list[Any] = []
+    while pusher.get_queue_depth():
+        event = pusher._get(0)  # pylint: disable=W0212
+        values.append(getattr(getattr(event, "attr_value", None), "value", event))
+    return values
+
+
+@pytest.mark.parametrize(
+    "overflow, expected",
+    [
+        ("drop_oldest", ["b", "c", "action"]),
+        ("drop_newest", ["a", "b", "action"]),
+        ("coalesce", ["a", "c", "action"]),
+        ("block", ["a", "b", "action"]),
+    ],
+)
+def test_bounded_events_pusher_overflow_policies(
+    mock_event: EventData, overflow: OverflowPolicy, expected: list[Any]
+):
+    pusher = EventsPusher(max_queue_size=2, overflow=overflow, block_timeout=0.05)
+
+    def event(attr: str, value: str) -> EventData:
+        return mock_event._replace(attr_value=DeviceAttribute(value, "time", "type", attr))
+
+    start = time.time()
+    pusher.push_event(event("attr1", "a"))
+    pusher.push_event(event("attr2", "b"))
+    # full: the new event is handled according to the policy
+    pusher.push_event(event("attr2", "c"))
+    # actions are never dropped
+    action = BaseAction("action")
+    pusher.push_event(action)
+    if overflow == "block":
+        assert_that(time.time() - start).is_greater_than_or_equal_to(0.05)
+    assert_that(pusher.get_high_water_mark()).is_equal_to(3)
+    assert_that(pusher.get_overflow_count()).is_equal_to(0 if overflow == "coalesce" else 1)
+    values = _pending_values(pusher)
+    assert_that(values[:-1]).is_equal_to(expected[:-1])
+    assert_that(values[-1]).is_same_as(action)
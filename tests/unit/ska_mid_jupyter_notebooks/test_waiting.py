@@ -0,0 +1,221 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+from assertpy import assert_that
+from tango import DevFailed
+
+from ska_mid_jupyter_notebooks.monitoring.standins import StandInDevice
+from ska_mid_jupyter_notebooks.monitoring.waiting import (
+    EventError,
+    SubscriptionHub,
+    WaitTimeout,
+    wait_for_attributes,
+    wait_for_conditions,
+    wait_for_value,
+)
+
+
+def _emit_later(device: StandInDevice, changes: list[tuple[str, object]], delay: float = 0.05):
+    def emit():
+        for attr, value in changes:
+            device.emit(attr, value)
+
+    timer = threading.Timer(delay, emit)
+    timer.start()
+    return timer
+
+
+def test_waits_on_change_events_of_several_devices():
+    csp = StandInDevice("csp/subarray/01")
+    sdp = StandInDevice("sdp/subarray/01")
+    csp.values["obsState"] = sdp.values["obsState"] = 0
+    _emit_later(csp, [("obsState", 1), ("obsState", 2)])
+    _emit_later(sdp, [("obsState", 2)], delay=0.1)
+    result = wait_for_attributes(
+        [(csp, "obsState"), (sdp, "obsState")],
+        lambda values: set(values.values()) == {2},
+        timeout=5,
+    )
+    assert_that(result.values).is_equal_to(
+        {"csp/subarray/01:obsState": 2, "sdp/subarray/01:obsState": 2}
+    )
+    assert_that([(transition.key, transition.value) for transition in result.trace]).contains(
+        ("csp/subarray/01:obsState", 1), ("csp/subarray/01:obsState", 2)
+    )
+    assert_that(result.trace).is_length(5)
+    # unsubscribed once done
+    assert_that(csp._subscribers).is_empty()
+    assert_that(sdp._subscribers).is_empty()
+
+
+def test_timeout_keeps_the_trace():
+    device = StandInDevice("mid-dish/dish-manager/SKA001")
+    device.values["dishMode"] = 3
+    with pytest.raises(WaitTimeout) as error:
+        wait_for_value(device, "dishMode", lambda mode: mode == 7, timeout=0.1)
+    assert_that(error.value.values).is_equal_to({"mid-dish/dish-manager/SKA001:dishMode": 3})
+    assert_that(error.value.trace).is_length(1)
+    assert_that(device._subscribers).is_empty()
+
+
+def test_falls_back_to_polling():
+    device = StandInDevice("mid-csp/control/0")
+    device.subscribe_event = mock.Mock(side_effect=DevFailed())
+    device.values["State"] = "ON"
+    reads = iter(["ON", "ON", "OFF"])
+    device.on_read = lambda *_: next(reads)
+    result = wait_for_value(
+        device, "State", lambda state: state == "OFF", timeout=5, poll_interval=0.01
+    )
+    assert_that([transition.value for transition in result.trace]).is_equal_to(["ON", "OFF"])
+
+
+def test_concurrent_condition_waits_share_subscriptions():
+    hub = SubscriptionHub()
+    dish = StandInDevice("mid-dish/dish-manager/SKA001")
+    subarray = StandInDevice("ska_mid/tm_subarray_node/1")
+    dish.values["dishMode"] = 3
+    subarray.values["obsState"] = 0
+    conditions = [(dish, "dishMode", 7), (subarray, "obsState", 2)]
+    with ThreadPoolExecutor(3) as executor:
+        waits = [
+            executor.submit(wait_for_conditions, conditions, "all", 5, hub),
+            executor.submit(wait_for_conditions, conditions, "all", 5, hub),
+            executor.submit(wait_for_conditions, conditions, "any", 5, hub),
+        ]
+        while hub.subscription_count() < 2:
+            time.sleep(0.01)
+        dish.emit("dishMode", 7)
+        assert_that(waits[2].result().satisfied).is_true()
+        assert_that(waits[2].result().pending()).is_length(1)
+        # one subscription per attribute however many waits are on it
+        assert_that(dish._subscribers).is_length(1)
+        subarray.emit("obsState", 2)
+        results = [wait.result() for wait in waits[:2]]
+    for result in results:
+        assert_that(result.satisfied).is_true()
+        dish_arrival, subarray_arrival = result.arrivals
+        assert_that(dish_arrival.received).is_less_than_or_equal_to(subarray_arrival.received)
+        assert_that(dish_arrival.latency).is_not_none()
+    assert_that(hub.subscription_count()).is_zero()
+    assert_that(dish._subscribers).is_empty()
+
+
+def test_conditions_timeout():
+    device = StandInDevice("mid-csp/control/0")
+    result = wait_for_conditions(
+        [(device, "State", "OFF"), (device, "State", "ON")], timeout=0.05, hub=SubscriptionHub()
+    )
+    assert_that(result.satisfied).is_false()
+    assert_that([condition.value for condition in result.pending()]).is_equal_to(["OFF"])
+    assert_that(result.arrivals[1].received).is_not_none()
+
+
+def test_conditions_break_on_error_events():
+    device = StandInDevice("mid-csp/control/0")
+    device.values["State"] = "ON"
+    error_event = device._event("State")._replace(err=True, errors=["API_EventTimeout"])
+
+    def push_error():
+        for _, callback in list(device._subscribers.values()):
+            callback.push_event(error_event)
+
+    threading.Timer(0.05, push_error).start()
+    start = time.monotonic()
+    with pytest.raises(EventError) as error:
+        wait_for_conditions(
+            [(device, "State", "OFF")], timeout=5, hub=SubscriptionHub(), break_on_error=True
+        )
+    assert_that(time.monotonic() - start).is_less_than(1)
+    assert_that(error.value.key).is_equal_to("mid-csp/control/0:State")
+    assert_that(error.value.event).is_same_as(error_event)
+    assert_that(device._subscribers).is_empty()
+
+    # ignored by default
+    threading.Timer(0.05, push_error).start()
+    result = wait_for_conditions([(device, "State", "OFF")], timeout=0.2, hub=SubscriptionHub())
+    assert_that(result.satisfied).is_false()
+
+
+def test_hub_subscribes_outside_of_its_lock():
+    hub = SubscriptionHub()
+    slow = StandInDevice("dev/slow/1")
+    fast = StandInDevice("dev/fast/1")
+    subscribing = threading.Event()
+    release = threading.Event()
+    subscribe_event = slow.subscribe_event
+
+    def slow_subscribe(*args: object) -> int:
+        subscribing.set()
+        release.wait(5)
+        return subscribe_event(*args)
+
+    slow.subscribe_event = slow_subscribe
+    events: list[tuple[str, object]] = []
+
+    def listener(key: str, event: object):
+        events.append((key, event.attr_value.value))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(hub.listen, slow, "State", listener)
+        assert_that(subscribing.wait(5)).is_true()
+        joining = executor.submit(hub.listen, slow, "State", listener)
+        # other attributes are not held up by the slow subscription
+        hub.listen(fast, "State", listener)
+        assert_that(joining.done()).is_false()
+        release.set()
+        first.result(5)
+        joining.result(5)
+    assert_that(events).contains(("dev/fast/1:State", "ON"))
+    assert_that([key for key, _ in events].count("dev/slow/1:State")).is_equal_to(2)
+    assert_that(slow._subscribers).is_length(1)
+
+
+def test_hub_replays_the_latest_event_to_joining_listeners():
+    hub = SubscriptionHub()
+    device = StandInDevice("dev/a/1")
+    hub.listen(device, "State", lambda *_: None)
+    values: list[object] = []
+    emitted = threading.Event()
+
+    def joining(key: str, event: object):
+        if not emitted.is_set():
+            emitted.set()
+            # an event comes in while the latest one is replayed
+            device.emit("State", "OFF")
+        values.append(event.attr_value.value)
+
+    hub.listen(device, "State", joining)
+    device.emit("State", "STANDBY")
+    assert_that(values).is_equal_to(["ON", "OFF", "STANDBY"])
+
+
+def test_hub_fails_every_listener_waiting_on_a_failed_subscription():
+    hub = SubscriptionHub()
+    device = StandInDevice("dev/missing/1")
+    subscribing = threading.Event()
+    release = threading.Event()
+    attempts: list[str] = []
+
+    def failing_subscribe(attr: str, *_: object) -> int:
+        attempts.append(attr)
+        subscribing.set()
+        release.wait(5)
+        raise DevFailed()
+
+    device.subscribe_event = failing_subscribe
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(hub.listen, device, "State", lambda *_: None)
+        assert_that(subscribing.wait(5)).is_true()
+        joining = executor.submit(hub.listen, device, "State", lambda *_: None)
+        time.sleep(0.05)
+        release.set()
+        for future in (first, joining):
+            with pytest.raises(DevFailed):
+                future.result(5)
+    # the listener that joined did not try again
+    assert_that(attempts).is_length(1)
+    assert_that(hub.subscription_count()).is_zero()
@@ -0,0 +1,112 @@
+import time
+from typing import Any, Callable
+from unittest import mock
+
+from assertpy import assert_that
+
+from ska_mid_jupyter_notebooks.cluster.cluster import TangoDeployment
+from ska_mid_jupyter_notebooks.monitoring.standins import StandInDeviceFactory
+from ska_mid_jupyter_notebooks.monitoring.statemonitoring import (
+    DeviceAttrPoller,
+    EventData,
+    MonState,
+    UnableToStartSubscription,
+)
+from ska_mid_jupyter_notebooks.monitoring.watchdog import TimerWheel
+
+
+def test_timer_wheel_fires_due_timers_only():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    now = time.time()
+    wheel.schedule("soon", now + 2)
+    # further away than one turn of the wheel
+    wheel.schedule("later", now + 20)
+    wheel.schedule("cancelled", now + 2)
+    wheel.cancel("cancelled")
+    assert_that(wheel.advance(now + 1)).is_empty()
+    assert_that(wheel.advance(now + 3)).is_equal_to(["soon"])
+    assert_that(wheel.advance(now + 10)).is_empty()
+    assert_that(wheel.advance(now + 21)).is_equal_to(["later"])
+
+
+def _wait_until(condition: Callable[[], Any], timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert_that(time.time()).is_less_than(deadline)
+        time.sleep(0.01)
+
+
+def test_watchdog_fails_silent_attributes_over_to_polling_and_back():
+    factory = StandInDeviceFactory()
+    device = factory.get_device("dev/a/1")
+    device.values["temperature"] = 20.0
+    monitor = MonState(
+        {"temperature": 0.0},
+        TangoDeployment("test"),
+        dev_factory=factory,
+        poller=DeviceAttrPoller(factory, poll_rate=0.02),
+    )
+
+    def reducer_set_temperature(state: dict[str, float], event: EventData):
+        state["temperature"] = event.attr_value.value
+        return state
+
+    key = "dev/a/1:temperature"
+    monitor.add_events_reducer("dev/a/1", "temperature", reducer_set_temperature)
+    monitor.start_subscriptions()
+    monitor.start_listening()
+    watchdog = monitor.start_watchdog(heartbeat=0.1, tick=0.02)
+    try:
+        # the event channel stays silent
+        _wait_until(lambda: monitor.get_liveness()[key].polling)
+        assert_that(monitor.get_liveness()[key].stale).is_true()
+        assert_that(watchdog.failover_count).is_equal_to(1)
+        # changes are picked up by polling
+        device.values["temperature"] = 21.0
+        _wait_until(lambda: monitor.state["temperature"] == 21.0)
+        # the event channel recovers
+        device.emit("temperature", 22.0)
+        _wait_until(lambda: not monitor.get_liveness()[key].polling)
+        assert_that(monitor.get_liveness()[key].stale).is_false()
+    finally:
+        monitor.stop_watchdog()
+        monitor.stop_listening(10)
+
+
+def test_watchdog_follows_attributes_added_and_dropped_after_it_started():
+    factory = StandInDeviceFactory()
+    factory.get_device("dev/a/1").values["temperature"] = 20.0
+    monitor = MonState(
+        {"temperature": 0.0},
+        TangoDeployment("test"),
+        dev_factory=factory,
+        poller=DeviceAttrPoller(factory, poll_rate=0.02),
+    )
+
+    def reducer_set_temperature(state: dict[str, float], event: EventData):
+        state["temperature"] = event.attr_value.value
+        return state
+
+    monitor.start_listening()
+    watchdog = monitor.start_watchdog(heartbeat=0.1, tick=0.02)
+    subscribe = monitor.multiplexer.subscribe
+
+    def subscribe_or_fail(device_name: str, attr: str, *args: Any) -> int:
+        if device_name == "dev/missing/1":
+            raise UnableToStartSubscription(device_name, attr, "not defined")
+        return subscribe(device_name, attr, *args)
+
+    try:
+        monitor.add_events_reducer("dev/a/1", "temperature", reducer_set_temperature)
+        monitor.add_events_reducer("dev/missing/1", "state", reducer_set_temperature)
+        _wait_until(lambda: "dev/missing/1:state" in watchdog._watched)
+        with mock.patch.object(monitor.multiplexer, "subscribe", side_effect=subscribe_or_fail):
+            monitor.start_subscriptions()
+        # the attribute added after the start is watched
+        _wait_until(lambda: monitor.get_liveness()["dev/a/1:temperature"].polling)
+        # and the one that could not be subscribed to is not anymore
+        _wait_until(lambda: "dev/missing/1:state" not in watchdog._watched)
+        assert_that(watchdog.stale_keys()).is_equal_to(["dev/a/1:temperature"])
+    finally:
+        monitor.stop_watchdog()
+        monitor.stop_listening(10)